@@ -6,28 +6,40 @@ Last updated: 3/13/26
 
 Uses db for users (get_user_by_username, create_user, user_exists_by_username),
 list_gear, list_friends, list_trips_for_user. Session stores user_id and caches
-user, gear, friends, trips (and optionally trip_dashboard). SECRET_KEY from env;
-SESSION_PERMANENT with 1-day lifetime; cookie HttpOnly, SameSite=Lax, Secure on RENDER.
-Helpers: require_auth() (session or DB), refresh_session_cache(), invalidate_trip_dashboard_cache().
+user, gear, friends, trips; login only stores the user, and each collection is loaded on first
+use by its GET endpoint (session_gear/session_friends/session_trips). SECRET_KEY from env;
+SESSION_PERMANENT with 1-day lifetime; cookie HttpOnly, SameSite=Lax, Secure on RENDER. Login and
+signup move the session to a fresh id first (_rotate_session_id) so a planted id is never authenticated.
+Helpers: require_auth() (session or DB), refresh_session_cache(), and incremental cache updates
+(cache_add/replace/remove_gear, _trip, cache_add/remove_friend) that patch one cached row after a
+mutation instead of re-reading all three collections. Trip dashboards are cached server-side in
+db.trip_dashboard, not in the session.
+Passwords are hashed and checked in auth.passwords' bounded process pool; signup and login answer
+503 with Retry-After when it is saturated, and login re-hashes passwords stored at an old cost. Both
+hand the request's DB connection back to the pool (db.release_connection) before waiting on the pool.
 Routes: POST /api/signup, POST /api/login, POST /api/logout, GET /api/me.
 """
 import os
-from flask import Flask, request, jsonify, session
-from flask_bcrypt import Bcrypt
+import secrets
+
+from flask import Flask, current_app, request, jsonify, session
 from datetime import timedelta
 
 from db import (
     get_user_by_id,
     get_user_by_username,
     create_user,
+    update_user_password_hash,
     user_exists_by_username,
     list_gear,
     list_friends,
     list_trips_for_user,
+    release_connection,
 )
 
+from auth.passwords import PasswordHasherBusy, check_password, hash_password, needs_rehash
+
 app = Flask(__name__)
-bcrypt = Bcrypt(app)
 
 # --- App config: secret key and session ---
 app.config["SECRET_KEY"] = os.getenv(
@@ -76,31 +88,144 @@ def _serialize_trip(t):
     return out
 
 
-def _populate_session_cache(user):
-    """Store user, friends, gear, and trips in session (call on login/signup)."""
-    uid = user["id"]
+def _serialize_friend(f):
+    """Convert one friend row ({id, username, created_at}) to a JSON-serializable dict for session."""
+    ca = f.get("created_at")
+    return {"id": f["id"], "username": f["username"], "created_at": ca.isoformat() if hasattr(ca, "isoformat") else ca}
+
+
+def _serialize_friends(rows):
+    return [_serialize_friend(f) for f in rows]
+
+
+_COLLECTION_LOADERS = {
+    "gear": lambda uid: _serialize_gear(list_gear(uid)),
+    "friends": lambda uid: _serialize_friends(list_friends(uid)),
+    "trips": lambda uid: [_serialize_trip(t) for t in list_trips_for_user(uid)],
+}
+
+
+def _rotate_session_id():
+    """Move the session to a fresh id before a user is bound to it, so an id planted on the client
+    before login (session fixation) never becomes authenticated. The old server-side record is
+    deleted and the session emptied. Flask-Session 0.6 has no regenerate(); saving an empty, modified
+    session under the old id is how each of its backends deletes a record. No-op for the cookie session."""
+    interface = current_app.session_interface
+    if getattr(session, "sid", None) is None:
+        return
+    old = interface.session_class(sid=session.sid, permanent=session.permanent)
+    old.modified = True
+    interface.save_session(current_app, old, current_app.response_class())  # throwaway response
+    session.clear()
+    session.sid = secrets.token_urlsafe(interface.sid_length)
+
+
+def _populate_session_cache(user, new_user=False):
+    """Store the user in session (call on login/signup). No queries: gear, friends and trips are
+    loaded on first access; a just-created user starts with empty collections."""
     session["user"] = {"id": user["id"], "username": user["username"]}
-    session["user_id"] = uid
-    session["gear"] = _serialize_gear(list_gear(uid))
-    session["friends"] = [{"id": f["id"], "username": f["username"]} for f in list_friends(uid)]
-    session["trips"] = [_serialize_trip(t) for t in list_trips_for_user(uid)]
+    session["user_id"] = user["id"]
+    for key in _COLLECTION_LOADERS:
+        if new_user:
+            session[key] = []
+        else:
+            session.pop(key, None)
+    session.pop("trip_dashboard", None)  # left over from the old per-session dashboard cache
+
+
+def _session_collection(key, user_id):
+    items = session.get(key)
+    if items is None:
+        items = _COLLECTION_LOADERS[key](user_id)
+        session[key] = items
+    return items
+
+
+def session_gear(user_id):
+    """Return the user's cached gear list, loading only gear from the DB if not cached yet."""
+    return _session_collection("gear", user_id)
+
+
+def session_friends(user_id):
+    """Return the user's cached friends list, loading only friends from the DB if not cached yet."""
+    return _session_collection("friends", user_id)
+
+
+def session_trips(user_id):
+    """Return the user's cached trips list, loading only trips from the DB if not cached yet."""
+    return _session_collection("trips", user_id)
 
 
 def refresh_session_cache(user_id):
-    """Refresh session cache for gear, friends, and trips (call after mutations)."""
-    session["gear"] = _serialize_gear(list_gear(user_id))
-    session["friends"] = [{"id": f["id"], "username": f["username"]} for f in list_friends(user_id)]
-    session["trips"] = [_serialize_trip(t) for t in list_trips_for_user(user_id)]
-
-
-def invalidate_trip_dashboard_cache(trip_id=None):
-    """Invalidate cached dashboard for one trip or all trips. Call after trip mutations."""
-    if trip_id is not None:
-        dash = session.get("trip_dashboard") or {}
-        dash.pop(str(trip_id), None)
-        session["trip_dashboard"] = dash
+    """Refresh session cache for gear, friends, and trips (e.g. after bulk changes; single-row mutations use the cache_* helpers)."""
+    for key, load in _COLLECTION_LOADERS.items():
+        session[key] = load(user_id)
+
+
+def _cache_put(key, row, newest_first=False):
+    """Replace the cached row with the same id, or add it. Collections that have not been loaded are
+    left alone (they are read from the DB on next access). Reassigns the list so the session store
+    sees the change."""
+    items = session.get(key)
+    if items is None:
+        return
+    items = list(items)
+    for i, existing in enumerate(items):
+        if existing["id"] == row["id"]:
+            items[i] = row
+            break
     else:
-        session["trip_dashboard"] = {}
+        items.append(row)
+        if newest_first:
+            # Match the DB helpers' ORDER BY created_at DESC
+            items.sort(key=lambda r: r.get("created_at") or "", reverse=True)
+    session[key] = items
+
+
+def _cache_remove(key, row_id):
+    """Drop the cached row with id row_id, if the collection is loaded."""
+    items = session.get(key)
+    if items is None:
+        return
+    session[key] = [r for r in items if r["id"] != row_id]
+
+
+def cache_add_gear(item):
+    """Add one gear row (as returned by get_gear_item) to the session gear cache."""
+    _cache_put("gear", _serialize_gear([item])[0], newest_first=True)
+
+
+def cache_replace_gear(item):
+    """Replace one cached gear row with its updated version (as returned by get_gear_item)."""
+    _cache_put("gear", _serialize_gear([item])[0], newest_first=True)
+
+
+def cache_remove_gear(gear_id):
+    _cache_remove("gear", gear_id)
+
+
+def cache_add_trip(trip):
+    """Add one trip row (as returned by get_trip) to the session trips cache."""
+    _cache_put("trips", _serialize_trip(trip), newest_first=True)
+
+
+def cache_replace_trip(trip):
+    """Replace one cached trip with its updated version (as returned by get_trip)."""
+    _cache_put("trips", _serialize_trip(trip), newest_first=True)
+
+
+def cache_remove_trip(trip_id):
+    _cache_remove("trips", trip_id)
+
+
+def cache_add_friend(friend):
+    """Add one friend (as returned by accept_friend_request) to the session friends cache, in
+    list_friends order."""
+    _cache_put("friends", _serialize_friend(friend), newest_first=True)
+
+
+def cache_remove_friend(friend_user_id):
+    _cache_remove("friends", friend_user_id)
 
 
 def require_auth():
@@ -117,12 +242,17 @@ def require_auth():
     return user
 
 
+def _busy(e):
+    """503 response for a saturated password hasher."""
+    return jsonify(error=str(e)), 503, {"Retry-After": "1"}
+
+
 # ----------------------
 # SIGNUP
 # ----------------------
 @app.post("/api/signup")
 def signup():
-    """Create user with bcrypt hash, set session, populate cache; 400 if missing/invalid, 409 if username taken."""
+    """Create user with bcrypt hash, set session and empty caches; 400 if missing/invalid, 409 if username taken."""
     data = request.get_json(silent=True) or {}
 
     username = (data.get("username") or "").strip()
@@ -134,12 +264,17 @@ def signup():
     if user_exists_by_username(username):
         return jsonify(error="Username already exists"), 409
 
-    pw_hash = bcrypt.generate_password_hash(password).decode("utf-8")
+    release_connection()  # don't hold a pooled connection while queued for the hasher
+    try:
+        pw_hash = hash_password(password)
+    except PasswordHasherBusy as e:
+        return _busy(e)
     user = create_user(username, pw_hash)
 
+    _rotate_session_id()
     session["user_id"] = user["id"]
     session.permanent = True
-    _populate_session_cache(user)
+    _populate_session_cache(user, new_user=True)
 
     return jsonify(
         ok=True,
@@ -152,7 +287,7 @@ def signup():
 # ----------------------
 @app.post("/api/login")
 def login_route():
-    """Validate username/password, set session and cache; 401 on invalid credentials."""
+    """Validate username/password and set session (collections load lazily); 401 on invalid credentials."""
     data = request.get_json(silent=True) or {}
 
     username = (data.get("username") or "").strip()
@@ -165,9 +300,23 @@ def login_route():
     if not user:
         return jsonify(error="Invalid credentials"), 401
 
-    if not bcrypt.check_password_hash(user["password_hash"], password):
-        return jsonify(error="Invalid credentials"), 401
-
+    release_connection()  # don't hold a pooled connection while queued for the hasher
+    try:
+        if not check_password(user["password_hash"], password):
+            return jsonify(error="Invalid credentials"), 401
+    except PasswordHasherBusy as e:
+        return _busy(e)
+
+    if needs_rehash(user["password_hash"]):
+        # Cost changed (BCRYPT_LOG_ROUNDS); upgrade while we have the plaintext. Best effort.
+        try:
+            new_hash = hash_password(password)
+        except PasswordHasherBusy:
+            new_hash = None
+        if new_hash:
+            update_user_password_hash(user["id"], new_hash)
+
+    _rotate_session_id()
     session["user_id"] = user["id"]
     session.permanent = True
     _populate_session_cache({"id": user["id"], "username": user["username"]})
@@ -0,0 +1,143 @@
+"""
+TrailFeathers - Password hashing off the request thread: bcrypt runs in a small, bounded process pool.
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+bcrypt is deliberately CPU-bound (~250ms at cost 12), so a login burst hashed inline pins every
+Gunicorn worker and stalls unrelated API requests. hash_password() and check_password() send the
+work to a process pool (one per Gunicorn worker process, created on first use) and wait for it;
+at most PASSWORD_HASH_MAX_PENDING hashes may be queued or running per worker, beyond that they raise
+PasswordHasherBusy and the route answers 503 with Retry-After.
+
+Env: BCRYPT_LOG_ROUNDS (cost for new hashes, default 12), PASSWORD_HASH_WORKERS (processes, default
+1; 0 hashes inline on the request thread), PASSWORD_HASH_MAX_PENDING (default 4 x workers),
+PASSWORD_HASH_TIMEOUT (seconds to wait for a result, default 10). needs_rehash() tells login to
+re-hash a password whose stored cost differs from BCRYPT_LOG_ROUNDS.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+
+# bcrypt only uses the first 72 bytes; newer bcrypt releases raise instead of truncating
+_MAX_PASSWORD_BYTES = 72
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+LOG_ROUNDS = _env_int("BCRYPT_LOG_ROUNDS", 12)
+_WORKERS = max(0, _env_int("PASSWORD_HASH_WORKERS", 1))
+_MAX_PENDING = max(1, _env_int("PASSWORD_HASH_MAX_PENDING", 4 * max(1, _WORKERS)))
+_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", "10"))
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hashes are already pending in this worker; respond 503."""
+
+
+def _encode(password):
+    return password.encode("utf-8")[:_MAX_PASSWORD_BYTES]
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(_encode(password), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def _check(password_hash, password):
+    try:
+        return bcrypt.checkpw(_encode(password), password_hash.encode("utf-8"))
+    except ValueError:  # malformed stored hash
+        return False
+
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(_MAX_PENDING)
+
+
+def _get_executor():
+    """Process pool for this process, rebuilt after fork (each Gunicorn worker gets its own)."""
+    global _executor, _executor_pid
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        with _executor_lock:
+            if _executor is None or _executor_pid != pid:
+                # spawn: forking a threaded Gunicorn worker could copy held locks into the children
+                _executor = ProcessPoolExecutor(
+                    max_workers=_WORKERS, mp_context=multiprocessing.get_context("spawn")
+                )
+                _executor_pid = pid
+    return _executor
+
+
+def _discard_executor():
+    """Drop a pool whose worker died so the next call starts a fresh one."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _run(fn, *args):
+    if not _slots.acquire(blocking=False):
+        raise PasswordHasherBusy("Too many logins in progress; try again shortly")
+    if _WORKERS == 0:
+        try:
+            return fn(*args)
+        finally:
+            _slots.release()
+    try:
+        future = _get_executor().submit(fn, *args)
+    except BaseException as e:
+        _slots.release()
+        if isinstance(e, BrokenProcessPool):
+            _discard_executor()
+            raise PasswordHasherBusy("Password hasher restarting; try again shortly") from e
+        raise
+    # The slot stays taken until the hash finishes, even if this request stops waiting for it
+    future.add_done_callback(lambda _f: _slots.release())
+    try:
+        return future.result(timeout=_TIMEOUT)
+    except FutureTimeout:
+        future.cancel()
+        raise PasswordHasherBusy("Password hashing timed out; try again shortly")
+    except BrokenProcessPool as e:
+        _discard_executor()
+        raise PasswordHasherBusy("Password hasher restarting; try again shortly") from e
+
+
+def hash_password(password, rounds=None):
+    """Return a bcrypt hash (str) of password at rounds (default BCRYPT_LOG_ROUNDS)."""
+    return _run(_hash, password, LOG_ROUNDS if rounds is None else rounds)
+
+
+def check_password(password_hash, password):
+    """True if password matches password_hash. Malformed hashes never match."""
+    if not password_hash:
+        return False
+    return _run(_check, password_hash, password)
+
+
+def hash_cost(password_hash):
+    """Return the cost factor stored in a $2a$/$2b$/$2y$ hash, or None if it can't be read."""
+    try:
+        return int(password_hash.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def needs_rehash(password_hash):
+    """True if password_hash was made with a cost other than BCRYPT_LOG_ROUNDS."""
+    return hash_cost(password_hash) != LOG_ROUNDS
@@ -0,0 +1,21 @@
+-- TrailFeathers - Migration 010: typed numeric/geo columns on trip_report_info (parsed from the TEXT columns).
+-- Group: TrailFeathers
+-- Authors: Kim, Smith, Domst, and Snider
+-- Last updated: 3/13/26
+--
+-- distance/elevation_gain/highpoint/lat/long stay as the display text; the new columns hold the parsed
+-- values so reads can sort, filter and use coordinates without parsing. insert_trip_report_info fills
+-- them for new rows. After applying, backfill existing rows with:
+--   DATABASE_URL=... python scripts/backfill_trail_stats.py
+
+ALTER TABLE trip_report_info ADD COLUMN IF NOT EXISTS distance_miles DOUBLE PRECISION;
+ALTER TABLE trip_report_info ADD COLUMN IF NOT EXISTS elevation_gain_feet INTEGER;
+ALTER TABLE trip_report_info ADD COLUMN IF NOT EXISTS highpoint_feet INTEGER;
+ALTER TABLE trip_report_info ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION;
+ALTER TABLE trip_report_info ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION;
+
+CREATE INDEX IF NOT EXISTS idx_trip_report_info_distance_miles ON trip_report_info(distance_miles);
+CREATE INDEX IF NOT EXISTS idx_trip_report_info_elevation_gain_feet ON trip_report_info(elevation_gain_feet);
+CREATE INDEX IF NOT EXISTS idx_trip_report_info_highpoint_feet ON trip_report_info(highpoint_feet);
+CREATE INDEX IF NOT EXISTS idx_trip_report_info_lat_lon ON trip_report_info(latitude, longitude)
+  WHERE latitude IS NOT NULL AND longitude IS NOT NULL;
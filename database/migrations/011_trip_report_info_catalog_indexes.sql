@@ -0,0 +1,25 @@
+-- TrailFeathers - Migration 011: indexes for filtered, sorted, keyset-paginated /api/locations.
+-- Group: TrailFeathers
+-- Authors: Kim, Smith, Domst, and Snider
+-- Last updated: 3/13/26
+--
+-- Name prefix search and name ordering share one index on lower(hike_name) in byte order ("C"
+-- collation, so LIKE 'prefix%' can use it). The numeric sort keys get (column, id) indexes, which
+-- serve range filters and keyset pages (ORDER BY column, id) in either direction; they replace the
+-- single-column indexes from migration 010.
+
+CREATE INDEX IF NOT EXISTS idx_trip_report_info_name_key
+  ON trip_report_info ((lower(hike_name) COLLATE "C"), id)
+  WHERE hike_name IS NOT NULL AND hike_name <> '';
+CREATE INDEX IF NOT EXISTS idx_trip_report_info_difficulty ON trip_report_info(difficulty);
+
+CREATE INDEX IF NOT EXISTS idx_trip_report_info_distance_miles_id ON trip_report_info(distance_miles, id)
+  WHERE distance_miles IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_trip_report_info_elevation_gain_feet_id ON trip_report_info(elevation_gain_feet, id)
+  WHERE elevation_gain_feet IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_trip_report_info_highpoint_feet_id ON trip_report_info(highpoint_feet, id)
+  WHERE highpoint_feet IS NOT NULL;
+
+DROP INDEX IF EXISTS idx_trip_report_info_distance_miles;
+DROP INDEX IF EXISTS idx_trip_report_info_elevation_gain_feet;
+DROP INDEX IF EXISTS idx_trip_report_info_highpoint_feet;
@@ -0,0 +1,23 @@
+-- TrailFeathers - Migration 012: full-text (tsvector + GIN) and trigram search over the hike catalog.
+-- Group: TrailFeathers
+-- Authors: Kim, Smith, Domst, and Snider
+-- Last updated: 3/13/26
+--
+-- search_vector weights hike_name (A), summarized_description (B) and the trip report text (C).
+-- Migration 018 turns it into a generated column, which keeps it current for every write. The trigram index on lower(hike_name) backs
+-- typo-tolerant name matching (word_similarity / <%).
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE trip_report_info ADD COLUMN IF NOT EXISTS search_vector tsvector;
+
+UPDATE trip_report_info
+SET search_vector =
+      setweight(to_tsvector('english', coalesce(hike_name, '')), 'A')
+   || setweight(to_tsvector('english', coalesce(summarized_description, '')), 'B')
+   || setweight(to_tsvector('english', coalesce(trip_report_1, '') || ' ' || coalesce(trip_report_2, '')), 'C')
+WHERE search_vector IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_trip_report_info_search_vector ON trip_report_info USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_trip_report_info_hike_name_trgm
+  ON trip_report_info USING GIN (lower(hike_name) gin_trgm_ops);
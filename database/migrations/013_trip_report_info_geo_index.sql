@@ -0,0 +1,14 @@
+-- TrailFeathers - Migration 013: spatial index for nearest-hike and map viewport queries.
+-- Group: TrailFeathers
+-- Authors: Kim, Smith, Domst, and Snider
+-- Last updated: 3/13/26
+--
+-- GiST over point(longitude, latitude) (core Postgres geometric types, no PostGIS needed) serves
+-- KNN ordering (<->) and box containment (<@). It replaces the B-tree on (latitude, longitude)
+-- from migration 010, which could only range-scan latitude.
+
+CREATE INDEX IF NOT EXISTS idx_trip_report_info_location_gist
+  ON trip_report_info USING GIST (point(longitude, latitude))
+  WHERE latitude IS NOT NULL AND longitude IS NOT NULL;
+
+DROP INDEX IF EXISTS idx_trip_report_info_lat_lon;
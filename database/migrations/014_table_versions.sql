@@ -0,0 +1,40 @@
+-- TrailFeathers - Migration 014: per-table version counters for ETags on shared, rarely-changing data.
+-- Group: TrailFeathers
+-- Authors: Kim, Smith, Domst, and Snider
+-- Last updated: 3/13/26
+--
+-- A statement-level trigger bumps table_versions.version whenever trip_report_info (the hike catalog)
+-- or requirement_types changes, so the API can tell whether a cached copy is current with one
+-- primary-key lookup instead of scanning the table (db.versions.table_version).
+
+CREATE TABLE IF NOT EXISTS table_versions (
+  table_name TEXT PRIMARY KEY,
+  version BIGINT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION bump_table_version()
+RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO table_versions (table_name, version) VALUES (TG_TABLE_NAME, 1)
+  ON CONFLICT (table_name) DO UPDATE
+    SET version = table_versions.version + 1, updated_at = NOW();
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_trip_report_info_version ON trip_report_info;
+CREATE TRIGGER trg_trip_report_info_version
+  AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON trip_report_info
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION bump_table_version();
+
+DROP TRIGGER IF EXISTS trg_requirement_types_version ON requirement_types;
+CREATE TRIGGER trg_requirement_types_version
+  AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON requirement_types
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION bump_table_version();
+
+INSERT INTO table_versions (table_name, version)
+VALUES ('trip_report_info', 1), ('requirement_types', 1)
+ON CONFLICT (table_name) DO NOTHING;
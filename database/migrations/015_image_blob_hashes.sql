@@ -0,0 +1,12 @@
+-- TrailFeathers - Migration 015: keep uploaded images in the blob store; the DB keeps only their hash.
+-- Group: TrailFeathers
+-- Authors: Kim, Smith, Domst, and Snider
+-- Last updated: 3/13/26
+--
+-- image_hash / avatar_hash are SHA-256 keys into db.blobs (BLOB_STORE). Rows with only BYTEA data keep
+-- showing: the app moves each into the store the first time it is read (db.legacy_images). Run
+-- python scripts/migrate_images_to_blobs.py to copy the rest and clear them; with --drop-columns it then
+-- drops the image / avatar BYTEA columns.
+
+ALTER TABLE user_trip_reports ADD COLUMN IF NOT EXISTS image_hash TEXT;
+ALTER TABLE user_profiles ADD COLUMN IF NOT EXISTS avatar_hash TEXT;
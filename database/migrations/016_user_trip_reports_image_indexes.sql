@@ -0,0 +1,21 @@
+-- TrailFeathers - Migration 016: index the per-user trip report lookups on metadata only.
+-- Group: TrailFeathers
+-- Authors: Kim, Smith, Domst, and Snider
+-- Last updated: 3/13/26
+--
+-- list_top_four_hikes picks, per top-four hike, the user's latest report and latest report with an
+-- image (image_hash IS NOT NULL; migration 015). Both are LIMIT 1 scans of these indexes in their
+-- ORDER BY order, so the planner never sorts a user's reports or visits rows holding image data.
+-- The partial index only holds reports with an uploaded image. The (user_id, ...) index also covers
+-- idx_user_trip_reports_user_id, which is dropped.
+
+CREATE INDEX IF NOT EXISTS idx_user_trip_reports_user_hike_latest
+  ON user_trip_reports (user_id, trip_report_info_id, updated_at DESC NULLS LAST, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_user_trip_reports_user_hike_image
+  ON user_trip_reports (user_id, trip_report_info_id, updated_at DESC NULLS LAST, created_at DESC)
+  WHERE image_hash IS NOT NULL;
+
+DROP INDEX IF EXISTS idx_user_trip_reports_user_id;
+
+ANALYZE user_trip_reports;
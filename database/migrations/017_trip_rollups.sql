@@ -0,0 +1,148 @@
+-- TrailFeathers - Migration 017: per-trip rollups (head count, gear coverage, pack weights) kept by triggers.
+-- Group: TrailFeathers
+-- Authors: Kim, Smith, Domst, and Snider
+-- Last updated: 3/13/26
+--
+-- trip_rollups holds, per trip, what checklists and readiness need from the live tables:
+--   head_count        rows in trip_collaborators (creator included)
+--   coverage          {requirement_type_id: persons covered} over assigned gear (capacity_persons, 1 if NULL)
+--   member_weight_oz  {user_id: oz} of assigned gear per carrier (assigned_to_user_id, else the owner)
+--   total_weight_oz   weight_oz x quantity over all assigned gear (no weight counts as 0)
+-- trip_rollups_live computes the same from scratch; it is the single definition used by the triggers,
+-- by the rebuild and by the consistency check (db.trip_rollups, scripts/trip_rollups.py).
+--
+-- Statement triggers on trip_gear, trip_collaborators and gear recompute the rollups of the trips a
+-- statement touched (once per trip per statement). refresh_trip_rollups locks those rollup rows before
+-- recomputing, so concurrent writers to one trip take turns and the later one sees the earlier one's
+-- rows (READ COMMITTED: each statement in the function takes a new snapshot). A trip without a row
+-- (no members or gear yet) reads as all zeros.
+
+CREATE TABLE IF NOT EXISTS trip_rollups (
+  trip_id BIGINT PRIMARY KEY REFERENCES trips(id) ON DELETE CASCADE,
+  head_count INT NOT NULL DEFAULT 0,
+  coverage JSONB NOT NULL DEFAULT '{}',
+  member_weight_oz JSONB NOT NULL DEFAULT '{}',
+  total_weight_oz NUMERIC NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_trip_gear_gear_id ON trip_gear(gear_id);
+
+CREATE OR REPLACE VIEW trip_rollups_live AS
+SELECT
+  t.id AS trip_id,
+  (SELECT COUNT(*)::int FROM trip_collaborators tc WHERE tc.trip_id = t.id) AS head_count,
+  COALESCE((
+    SELECT jsonb_object_agg(c.requirement_type_id::text, c.covered)
+    FROM (
+      SELECT g.requirement_type_id, SUM(COALESCE(g.capacity_persons, 1))::int AS covered
+      FROM trip_gear tg
+      JOIN gear g ON g.id = tg.gear_id
+      WHERE tg.trip_id = t.id AND g.requirement_type_id IS NOT NULL
+      GROUP BY g.requirement_type_id
+    ) c
+  ), '{}'::jsonb) AS coverage,
+  COALESCE((
+    SELECT jsonb_object_agg(w.user_id::text, w.weight_oz)
+    FROM (
+      SELECT COALESCE(tg.assigned_to_user_id, g.user_id) AS user_id,
+             SUM(COALESCE(g.weight_oz, 0) * tg.quantity) AS weight_oz
+      FROM trip_gear tg
+      JOIN gear g ON g.id = tg.gear_id
+      WHERE tg.trip_id = t.id
+      GROUP BY 1
+    ) w
+  ), '{}'::jsonb) AS member_weight_oz,
+  (SELECT COALESCE(SUM(COALESCE(g.weight_oz, 0) * tg.quantity), 0)
+   FROM trip_gear tg
+   JOIN gear g ON g.id = tg.gear_id
+   WHERE tg.trip_id = t.id) AS total_weight_oz
+FROM trips t;
+
+CREATE OR REPLACE FUNCTION refresh_trip_rollups(ids BIGINT[])
+RETURNS VOID AS $$
+BEGIN
+  IF ids IS NULL OR cardinality(ids) = 0 THEN
+    RETURN;
+  END IF;
+  INSERT INTO trip_rollups (trip_id)
+  SELECT t.id FROM trips t WHERE t.id = ANY(ids) ORDER BY t.id
+  ON CONFLICT (trip_id) DO NOTHING;
+  PERFORM 1 FROM trip_rollups WHERE trip_id = ANY(ids) ORDER BY trip_id FOR UPDATE;
+  UPDATE trip_rollups r
+  SET head_count = l.head_count,
+      coverage = l.coverage,
+      member_weight_oz = l.member_weight_oz,
+      total_weight_oz = l.total_weight_oz,
+      updated_at = NOW()
+  FROM trip_rollups_live l
+  WHERE l.trip_id = r.trip_id AND r.trip_id = ANY(ids);
+END;
+$$ LANGUAGE plpgsql;
+
+-- trip_gear and trip_collaborators: the trips of the inserted / updated / deleted rows
+CREATE OR REPLACE FUNCTION trip_rollups_on_trip_rows()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    PERFORM refresh_trip_rollups(ARRAY(SELECT DISTINCT trip_id FROM new_rows));
+  ELSIF TG_OP = 'DELETE' THEN
+    PERFORM refresh_trip_rollups(ARRAY(SELECT DISTINCT trip_id FROM old_rows));
+  ELSE
+    PERFORM refresh_trip_rollups(ARRAY(SELECT trip_id FROM new_rows UNION SELECT trip_id FROM old_rows));
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- gear: trips the updated gear is assigned to, if a column the rollups use changed. Deleting gear
+-- cascades to trip_gear, whose trigger covers it; new gear is not assigned anywhere yet.
+CREATE OR REPLACE FUNCTION trip_rollups_on_gear_update()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM refresh_trip_rollups(ARRAY(
+    SELECT DISTINCT tg.trip_id
+    FROM new_rows n
+    JOIN old_rows o ON o.id = n.id
+    JOIN trip_gear tg ON tg.gear_id = n.id
+    WHERE (n.requirement_type_id, n.capacity_persons, n.weight_oz, n.user_id)
+          IS DISTINCT FROM (o.requirement_type_id, o.capacity_persons, o.weight_oz, o.user_id)
+  ));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables need one trigger per event
+DROP TRIGGER IF EXISTS trg_trip_gear_rollups_insert ON trip_gear;
+CREATE TRIGGER trg_trip_gear_rollups_insert
+  AFTER INSERT ON trip_gear REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION trip_rollups_on_trip_rows();
+DROP TRIGGER IF EXISTS trg_trip_gear_rollups_update ON trip_gear;
+CREATE TRIGGER trg_trip_gear_rollups_update
+  AFTER UPDATE ON trip_gear REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION trip_rollups_on_trip_rows();
+DROP TRIGGER IF EXISTS trg_trip_gear_rollups_delete ON trip_gear;
+CREATE TRIGGER trg_trip_gear_rollups_delete
+  AFTER DELETE ON trip_gear REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION trip_rollups_on_trip_rows();
+
+DROP TRIGGER IF EXISTS trg_trip_collaborators_rollups_insert ON trip_collaborators;
+CREATE TRIGGER trg_trip_collaborators_rollups_insert
+  AFTER INSERT ON trip_collaborators REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION trip_rollups_on_trip_rows();
+DROP TRIGGER IF EXISTS trg_trip_collaborators_rollups_update ON trip_collaborators;
+CREATE TRIGGER trg_trip_collaborators_rollups_update
+  AFTER UPDATE ON trip_collaborators REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION trip_rollups_on_trip_rows();
+DROP TRIGGER IF EXISTS trg_trip_collaborators_rollups_delete ON trip_collaborators;
+CREATE TRIGGER trg_trip_collaborators_rollups_delete
+  AFTER DELETE ON trip_collaborators REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION trip_rollups_on_trip_rows();
+
+DROP TRIGGER IF EXISTS trg_gear_rollups_update ON gear;
+CREATE TRIGGER trg_gear_rollups_update
+  AFTER UPDATE ON gear REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION trip_rollups_on_gear_update();
+
+-- Backfill (python scripts/trip_rollups.py rebuild does the same in batches)
+SELECT refresh_trip_rollups(ARRAY(SELECT id FROM trips));
@@ -0,0 +1,21 @@
+-- TrailFeathers - Migration 018: compute trip_report_info.search_vector in the database (generated column).
+-- Group: TrailFeathers
+-- Authors: Kim, Smith, Domst, and Snider
+-- Last updated: 3/13/26
+--
+-- Migration 012 added search_vector as a plain column that only insert_trip_report_info filled in, so a
+-- row written any other way (or whose name, summary or trip reports were edited) had a missing or stale
+-- vector and dropped out of search. It is now GENERATED ALWAYS ... STORED from the same columns:
+-- name (A), summary (B) and trip reports (C), kept current on every INSERT and UPDATE. An existing
+-- column can't be turned into a generated one, so it is dropped (with its GIN index) and re-added, which
+-- rewrites the table once.
+
+ALTER TABLE trip_report_info DROP COLUMN IF EXISTS search_vector;
+
+ALTER TABLE trip_report_info ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+      setweight(to_tsvector('english', coalesce(hike_name, '')), 'A')
+   || setweight(to_tsvector('english', coalesce(summarized_description, '')), 'B')
+   || setweight(to_tsvector('english', coalesce(trip_report_1, '') || ' ' || coalesce(trip_report_2, '')), 'C')
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_trip_report_info_search_vector ON trip_report_info USING GIN (search_vector);
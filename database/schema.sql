@@ -117,6 +117,18 @@ CREATE TABLE IF NOT EXISTS trip_report_info (
   trip_report_2 TEXT,
   lat TEXT,
   long TEXT,
+  -- Parsed from the text columns above (migration 010)
+  distance_miles DOUBLE PRECISION,
+  elevation_gain_feet INTEGER,
+  highpoint_feet INTEGER,
+  latitude DOUBLE PRECISION,
+  longitude DOUBLE PRECISION,
+  -- Full-text search document: name (A), summary (B), trip reports (C) (migrations 012, 018)
+  search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(hike_name, '')), 'A')
+     || setweight(to_tsvector('english', coalesce(summarized_description, '')), 'B')
+     || setweight(to_tsvector('english', coalesce(trip_report_1, '') || ' ' || coalesce(trip_report_2, '')), 'C')
+  ) STORED,
   created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
 
@@ -132,3 +144,177 @@ CREATE INDEX IF NOT EXISTS idx_friend_requests_sender_id ON friend_requests(send
 CREATE INDEX IF NOT EXISTS idx_trip_invites_trip_id ON trip_invites(trip_id);
 CREATE INDEX IF NOT EXISTS idx_trip_invites_invitee_id ON trip_invites(invitee_id);
 CREATE INDEX IF NOT EXISTS idx_trip_report_info_trip_id ON trip_report_info(trip_id);
+CREATE INDEX IF NOT EXISTS idx_trip_report_info_name_key
+  ON trip_report_info ((lower(hike_name) COLLATE "C"), id)
+  WHERE hike_name IS NOT NULL AND hike_name <> '';
+CREATE INDEX IF NOT EXISTS idx_trip_report_info_difficulty ON trip_report_info(difficulty);
+CREATE INDEX IF NOT EXISTS idx_trip_report_info_distance_miles_id ON trip_report_info(distance_miles, id)
+  WHERE distance_miles IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_trip_report_info_elevation_gain_feet_id ON trip_report_info(elevation_gain_feet, id)
+  WHERE elevation_gain_feet IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_trip_report_info_highpoint_feet_id ON trip_report_info(highpoint_feet, id)
+  WHERE highpoint_feet IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_trip_report_info_search_vector ON trip_report_info USING GIN (search_vector);
+-- Needs CREATE EXTENSION pg_trgm (migration 012)
+CREATE INDEX IF NOT EXISTS idx_trip_report_info_hike_name_trgm
+  ON trip_report_info USING GIN (lower(hike_name) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_trip_report_info_location_gist
+  ON trip_report_info USING GIST (point(longitude, latitude))
+  WHERE latitude IS NOT NULL AND longitude IS NOT NULL;
+
+-- TABLE VERSIONS (bumped by statement triggers; ETags for the catalog and requirement types, migration 014)
+CREATE TABLE IF NOT EXISTS table_versions (
+  table_name TEXT PRIMARY KEY,
+  version BIGINT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION bump_table_version()
+RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO table_versions (table_name, version) VALUES (TG_TABLE_NAME, 1)
+  ON CONFLICT (table_name) DO UPDATE
+    SET version = table_versions.version + 1, updated_at = NOW();
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_trip_report_info_version ON trip_report_info;
+CREATE TRIGGER trg_trip_report_info_version
+  AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON trip_report_info
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION bump_table_version();
+
+DROP TRIGGER IF EXISTS trg_requirement_types_version ON requirement_types;
+CREATE TRIGGER trg_requirement_types_version
+  AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON requirement_types
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION bump_table_version();
+
+-- TRIP ROLLUPS (head count, gear coverage and pack weights per trip, kept by triggers; migration 017)
+CREATE TABLE IF NOT EXISTS trip_rollups (
+  trip_id BIGINT PRIMARY KEY REFERENCES trips(id) ON DELETE CASCADE,
+  head_count INT NOT NULL DEFAULT 0,
+  coverage JSONB NOT NULL DEFAULT '{}',
+  member_weight_oz JSONB NOT NULL DEFAULT '{}',
+  total_weight_oz NUMERIC NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_trip_gear_gear_id ON trip_gear(gear_id);
+
+CREATE OR REPLACE VIEW trip_rollups_live AS
+SELECT
+  t.id AS trip_id,
+  (SELECT COUNT(*)::int FROM trip_collaborators tc WHERE tc.trip_id = t.id) AS head_count,
+  COALESCE((
+    SELECT jsonb_object_agg(c.requirement_type_id::text, c.covered)
+    FROM (
+      SELECT g.requirement_type_id, SUM(COALESCE(g.capacity_persons, 1))::int AS covered
+      FROM trip_gear tg
+      JOIN gear g ON g.id = tg.gear_id
+      WHERE tg.trip_id = t.id AND g.requirement_type_id IS NOT NULL
+      GROUP BY g.requirement_type_id
+    ) c
+  ), '{}'::jsonb) AS coverage,
+  COALESCE((
+    SELECT jsonb_object_agg(w.user_id::text, w.weight_oz)
+    FROM (
+      SELECT COALESCE(tg.assigned_to_user_id, g.user_id) AS user_id,
+             SUM(COALESCE(g.weight_oz, 0) * tg.quantity) AS weight_oz
+      FROM trip_gear tg
+      JOIN gear g ON g.id = tg.gear_id
+      WHERE tg.trip_id = t.id
+      GROUP BY 1
+    ) w
+  ), '{}'::jsonb) AS member_weight_oz,
+  (SELECT COALESCE(SUM(COALESCE(g.weight_oz, 0) * tg.quantity), 0)
+   FROM trip_gear tg
+   JOIN gear g ON g.id = tg.gear_id
+   WHERE tg.trip_id = t.id) AS total_weight_oz
+FROM trips t;
+
+CREATE OR REPLACE FUNCTION refresh_trip_rollups(ids BIGINT[])
+RETURNS VOID AS $$
+BEGIN
+  IF ids IS NULL OR cardinality(ids) = 0 THEN
+    RETURN;
+  END IF;
+  INSERT INTO trip_rollups (trip_id)
+  SELECT t.id FROM trips t WHERE t.id = ANY(ids) ORDER BY t.id
+  ON CONFLICT (trip_id) DO NOTHING;
+  PERFORM 1 FROM trip_rollups WHERE trip_id = ANY(ids) ORDER BY trip_id FOR UPDATE;
+  UPDATE trip_rollups r
+  SET head_count = l.head_count,
+      coverage = l.coverage,
+      member_weight_oz = l.member_weight_oz,
+      total_weight_oz = l.total_weight_oz,
+      updated_at = NOW()
+  FROM trip_rollups_live l
+  WHERE l.trip_id = r.trip_id AND r.trip_id = ANY(ids);
+END;
+$$ LANGUAGE plpgsql;
+
+-- trip_gear and trip_collaborators: the trips of the inserted / updated / deleted rows
+CREATE OR REPLACE FUNCTION trip_rollups_on_trip_rows()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    PERFORM refresh_trip_rollups(ARRAY(SELECT DISTINCT trip_id FROM new_rows));
+  ELSIF TG_OP = 'DELETE' THEN
+    PERFORM refresh_trip_rollups(ARRAY(SELECT DISTINCT trip_id FROM old_rows));
+  ELSE
+    PERFORM refresh_trip_rollups(ARRAY(SELECT trip_id FROM new_rows UNION SELECT trip_id FROM old_rows));
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- gear: trips the updated gear is assigned to, if a column the rollups use changed. Deleting gear
+-- cascades to trip_gear, whose trigger covers it; new gear is not assigned anywhere yet.
+CREATE OR REPLACE FUNCTION trip_rollups_on_gear_update()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM refresh_trip_rollups(ARRAY(
+    SELECT DISTINCT tg.trip_id
+    FROM new_rows n
+    JOIN old_rows o ON o.id = n.id
+    JOIN trip_gear tg ON tg.gear_id = n.id
+    WHERE (n.requirement_type_id, n.capacity_persons, n.weight_oz, n.user_id)
+          IS DISTINCT FROM (o.requirement_type_id, o.capacity_persons, o.weight_oz, o.user_id)
+  ));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables need one trigger per event
+DROP TRIGGER IF EXISTS trg_trip_gear_rollups_insert ON trip_gear;
+CREATE TRIGGER trg_trip_gear_rollups_insert
+  AFTER INSERT ON trip_gear REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION trip_rollups_on_trip_rows();
+DROP TRIGGER IF EXISTS trg_trip_gear_rollups_update ON trip_gear;
+CREATE TRIGGER trg_trip_gear_rollups_update
+  AFTER UPDATE ON trip_gear REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION trip_rollups_on_trip_rows();
+DROP TRIGGER IF EXISTS trg_trip_gear_rollups_delete ON trip_gear;
+CREATE TRIGGER trg_trip_gear_rollups_delete
+  AFTER DELETE ON trip_gear REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION trip_rollups_on_trip_rows();
+
+DROP TRIGGER IF EXISTS trg_trip_collaborators_rollups_insert ON trip_collaborators;
+CREATE TRIGGER trg_trip_collaborators_rollups_insert
+  AFTER INSERT ON trip_collaborators REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION trip_rollups_on_trip_rows();
+DROP TRIGGER IF EXISTS trg_trip_collaborators_rollups_update ON trip_collaborators;
+CREATE TRIGGER trg_trip_collaborators_rollups_update
+  AFTER UPDATE ON trip_collaborators REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION trip_rollups_on_trip_rows();
+DROP TRIGGER IF EXISTS trg_trip_collaborators_rollups_delete ON trip_collaborators;
+CREATE TRIGGER trg_trip_collaborators_rollups_delete
+  AFTER DELETE ON trip_collaborators REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION trip_rollups_on_trip_rows();
+
+DROP TRIGGER IF EXISTS trg_gear_rollups_update ON gear;
+CREATE TRIGGER trg_gear_rollups_update
+  AFTER UPDATE ON gear REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION trip_rollups_on_gear_update();
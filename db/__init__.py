@@ -6,13 +6,21 @@ Last updated: 3/13/26
 """
 
 # Connection utilities
-from .connection import get_db_connection, get_cursor
+from .connection import (
+    get_db_connection,
+    get_cursor,
+    begin_unit_of_work,
+    current_unit_of_work,
+    release_connection,
+    unit_of_work,
+)
 
 # Users
 from .users import (
     get_user_by_id,
     get_user_by_username,
     create_user,
+    update_user_password_hash,
     user_exists_by_username,
     get_first_user,
 )
@@ -21,6 +29,10 @@ from .users import (
 from .trip_reports import (
     insert_trip_report_info,
     list_trip_report_info_for_selection,
+    search_trip_report_info,
+    search_trip_report_info_text,
+    nearest_trip_report_info,
+    list_trip_report_info_in_box,
     get_trip_report_info_by_id,
     get_trip_report_info_for_trip,
 )
@@ -30,6 +42,8 @@ from .requirements import (
     list_requirement_types,
     list_activity_requirements,
     get_trip_requirement_summary,
+    get_trip_requirement_summaries,
+    list_trip_readiness,
 )
 
 # Gear
@@ -60,10 +74,12 @@ from .favorites import (
 # Profiles
 from .profiles import (
     PROFILE_AVATAR_DIR_PREFIX,
+    MAX_AVATAR_BYTES,
     get_user_profile,
     upsert_user_profile,
     set_profile_avatar_upload,
     get_profile_avatar_payload,
+    get_avatar_by_username,
 )
 
 # Top Four
@@ -78,8 +94,10 @@ from .top_four import (
 
 # User Trip Reports
 from .user_trip_reports import (
+    MAX_TRIP_REPORT_IMAGE_BYTES,
     list_user_trip_reports,
     get_user_trip_report,
+    user_owns_trip_report,
     set_trip_report_image_upload,
     get_trip_report_image_payload,
     create_user_trip_report,
@@ -107,6 +125,7 @@ from .trips import (
     user_has_trip_access,
     leave_trip,
     add_trip_collaborator,
+    list_trip_weather_locations,
 )
 
 # Trip Invites
@@ -129,21 +148,50 @@ from .trip_gear import (
     get_trip_gear_pool,
     get_trip_assigned_gear,
     assign_gear_to_trip,
+    assign_gear_to_trip_many,
     unassign_gear_from_trip,
+    unassign_gear_from_trip_many,
+)
+
+# Trip Dashboard
+from .trip_dashboard import (
+    get_trip_dashboard_data,
+    get_trip_dashboard_shared,
+    get_trip_dashboard_viewer,
+    get_cached_trip_dashboard_shared,
+    invalidate_trip_dashboard,
+    invalidate_trip_dashboards_for_user,
+)
+
+# Trip Rollups
+from .trip_rollups import (
+    rebuild_trip_rollups,
+    check_trip_rollups,
+    repair_trip_rollups,
+)
+
+# Versions (ETags)
+from .versions import (
+    table_version,
+    wishlist_version,
+    favorites_version,
+    public_profile_version,
 )
 
 __all__ = [
     # Connection
     'get_db_connection', 'get_cursor',
+    'begin_unit_of_work', 'current_unit_of_work', 'release_connection', 'unit_of_work',
     # Users
     'get_user_by_id', 'get_user_by_username', 'create_user', 
-    'user_exists_by_username', 'get_first_user',
+    'update_user_password_hash', 'user_exists_by_username', 'get_first_user',
     # Trip Reports
-    'insert_trip_report_info', 'list_trip_report_info_for_selection',
+    'insert_trip_report_info', 'list_trip_report_info_for_selection', 'search_trip_report_info',
+    'search_trip_report_info_text', 'nearest_trip_report_info', 'list_trip_report_info_in_box',
     'get_trip_report_info_by_id', 'get_trip_report_info_for_trip',
     # Requirements
     'list_requirement_types', 'list_activity_requirements',
-    'get_trip_requirement_summary',
+    'get_trip_requirement_summary', 'get_trip_requirement_summaries', 'list_trip_readiness',
     # Gear
     'add_gear_item', 'list_gear', 'get_gear_item', 
     'update_gear_item', 'delete_gear_item',
@@ -153,13 +201,13 @@ __all__ = [
     # Favorites
     'list_favorite_hikes', 'add_favorite_hike', 'remove_favorite_hike',
     # Profiles
-    'PROFILE_AVATAR_DIR_PREFIX', 'get_user_profile', 'upsert_user_profile',
-    'set_profile_avatar_upload', 'get_profile_avatar_payload',
+    'PROFILE_AVATAR_DIR_PREFIX', 'MAX_AVATAR_BYTES', 'get_user_profile', 'upsert_user_profile',
+    'set_profile_avatar_upload', 'get_profile_avatar_payload', 'get_avatar_by_username',
     # Top Four
     'list_top_four_hikes', 'set_top_four_slot', 'clear_top_four_slot',
     'user_has_trip_report_for_info', 'list_top_four_eligible_hikes', 'replace_top_four',
     # User Trip Reports
-    'list_user_trip_reports', 'get_user_trip_report',
+    'MAX_TRIP_REPORT_IMAGE_BYTES', 'list_user_trip_reports', 'get_user_trip_report', 'user_owns_trip_report',
     'set_trip_report_image_upload', 'get_trip_report_image_payload',
     'create_user_trip_report', 'update_user_trip_report', 'delete_user_trip_report',
     # Wishlist
@@ -169,6 +217,7 @@ __all__ = [
     # Trips
     'create_trip', 'get_trip', 'list_trips_for_user',
     'update_trip', 'delete_trip', 'user_has_trip_access', 'leave_trip', 'add_trip_collaborator',
+    'list_trip_weather_locations',
     # Trip Invites
     'invite_user_to_trip', 'create_trip_invite', 'list_trip_invites_pending',
     'list_incoming_trip_invites', 'has_pending_invite_to_trip',
@@ -176,5 +225,13 @@ __all__ = [
     'remove_trip_collaborator', 'cancel_trip_invite', 'list_trip_collaborators',
     # Trip Gear
     'get_trip_gear_pool', 'get_trip_assigned_gear',
-    'assign_gear_to_trip', 'unassign_gear_from_trip',
+    'assign_gear_to_trip', 'assign_gear_to_trip_many', 'unassign_gear_from_trip',
+    'unassign_gear_from_trip_many',
+    # Trip Dashboard
+    'get_trip_dashboard_data', 'get_trip_dashboard_shared', 'get_trip_dashboard_viewer',
+    'get_cached_trip_dashboard_shared', 'invalidate_trip_dashboard', 'invalidate_trip_dashboards_for_user',
+    # Trip Rollups
+    'rebuild_trip_rollups', 'check_trip_rollups', 'repair_trip_rollups',
+    # Versions (ETags)
+    'table_version', 'wishlist_version', 'favorites_version', 'public_profile_version',
 ]
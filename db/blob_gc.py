@@ -0,0 +1,53 @@
+"""
+TrailFeathers - Deleting uploaded image blobs once no row references them.
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+Uploaded images are referenced by user_trip_reports.image_hash and user_profiles.avatar_hash, and
+identical uploads share one blob (db.blobs), so a blob can only go once neither column points at it.
+Writes that replace or clear a hash, or delete its row, call release_blob(old key). After the
+transaction commits, a background thread takes a transaction-scoped advisory lock on the key. It
+checks both columns and, if nothing references the key, deletes the blob and its variants
+(db.image_variants).
+
+Uploads call lock_blob() in the transaction that stores a key and put the blob again under the lock.
+An upload of the same bytes racing a delete then either commits first (the check sees its row) or
+waits and re-creates the blob after the delete.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from .blobs import blob_store
+from .connection import after_commit, get_cursor
+from .image_variants import delete_variants
+
+_LOCK_SQL = "SELECT pg_advisory_xact_lock(hashtextextended('blob:' || %s, 0))"
+_REFERENCED_SQL = """
+SELECT EXISTS (SELECT 1 FROM user_trip_reports WHERE image_hash = %(key)s)
+    OR EXISTS (SELECT 1 FROM user_profiles WHERE avatar_hash = %(key)s) AS referenced
+"""
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="blob-gc")
+
+
+def lock_blob(cur, key):
+    """Take the advisory lock for blob key until cur's transaction ends (see module docstring)."""
+    cur.execute(_LOCK_SQL, (key,))
+
+
+def delete_blob_if_unreferenced(key):
+    """Delete blob key and its variants if no report or profile references it. Returns True if deleted."""
+    with get_cursor() as cur:
+        lock_blob(cur, key)
+        cur.execute(_REFERENCED_SQL, {"key": key})
+        if cur.fetchone()["referenced"]:
+            return False
+        delete_variants(key)
+        blob_store.delete(key)  # under the lock: an upload of these bytes waits, then puts them back
+        return True
+
+
+def release_blob(key):
+    """Once the current transaction commits, delete blob key (in the background) if nothing
+    references it any more. No-op for None."""
+    if key:
+        after_commit(lambda: _executor.submit(delete_blob_if_unreferenced, key))
@@ -0,0 +1,237 @@
+"""
+TrailFeathers - Content-addressed blob store for uploaded images (trip report photos, avatars).
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+Blobs are keyed by the SHA-256 hex digest of their bytes: identical uploads share one object and a
+key's content never changes, so responses for it can be cached forever. The database keeps only the
+key and media type (user_trip_reports.image_hash, user_profiles.avatar_hash; migration 015). Derived
+blobs (db.image_variants) are stored under a key computed from how they were made instead; those
+never change either.
+
+put() takes bytes or a SpooledBlob: a temp file (in memory up to 256KB, then on disk) that hashes and
+measures data as it is written, so an upload is streamed from the request into the store without ever
+being held in memory whole (tf_server.uploads).
+
+BLOB_STORE=local (default) keeps files under BLOB_DIR (default <repo>/blobs) as ab/cd/<key>; routes
+serve them with send_file, so Gunicorn can use sendfile and Range requests work. BLOB_STORE=s3 uses an
+S3-compatible bucket through boto3 (S3_BUCKET, optional S3_ENDPOINT_URL for MinIO/R2/etc. and
+S3_PREFIX; credentials from the usual AWS_* env) and routes redirect to presigned URLs. Render's disk
+is ephemeral, so with RENDER set make_blob_store() refuses unless BLOB_STORE=s3 or BLOB_DIR is given
+explicitly (a persistent disk mount). blob_store builds the store on first use, so importing db (the
+app, scripts) works either way and only image reads and uploads report the misconfiguration.
+"""
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+try:
+    import boto3
+except ImportError:
+    boto3 = None
+
+_KEY = re.compile(r"^[0-9a-f]{64}$")
+_SPOOL_MEMORY = 256 * 1024
+_COPY_BUFFER = 64 * 1024
+_HEAD_BYTES = 16
+
+
+def blob_key(data):
+    """Return the content key (SHA-256 hex) for bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobTooLarge(Exception):
+    """Raised by SpooledBlob.write past its limit. Not a ValueError, so Werkzeug's form parser
+    (which silences ValueError) lets it through and the upload stops right there."""
+
+
+class SpooledBlob:
+    """Writable/readable temp file that records the SHA-256, size and first bytes of what is written.
+    Rejects writes past limit bytes with BlobTooLarge."""
+
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.size = 0
+        self.head = b""
+        self._sha = hashlib.sha256()
+        self._file = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MEMORY, mode="w+b")
+
+    def write(self, data):
+        self.size += len(data)
+        if self.limit is not None and self.size > self.limit:
+            raise BlobTooLarge(f"Upload larger than {self.limit} bytes")
+        self._sha.update(data)
+        if len(self.head) < _HEAD_BYTES:
+            self.head += bytes(data[: _HEAD_BYTES - len(self.head)])
+        return self._file.write(data)
+
+    @property
+    def key(self):
+        """Content key (SHA-256 hex) of everything written so far."""
+        return self._sha.hexdigest()
+
+    def __getattr__(self, name):  # read, seek, tell, close, ...
+        return getattr(self._file, name)
+
+    def __iter__(self):
+        return iter(self._file)
+
+
+def blob_size(data):
+    """Size in bytes of bytes or a SpooledBlob (0 for None)."""
+    if data is None:
+        return 0
+    return data.size if isinstance(data, SpooledBlob) else len(data)
+
+
+def _check_key(key):
+    if not isinstance(key, str) or not _KEY.match(key):
+        raise ValueError("Invalid blob key")
+    return key
+
+
+class LocalBlobStore:
+    """Blobs as files under root, sharded by the first two byte pairs of the key."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def _path(self, key):
+        _check_key(key)
+        return self.root / key[:2] / key[2:4] / key
+
+    def put(self, data, media_type=None, key=None):
+        """Store bytes or a SpooledBlob under key (default: the content hash); return the key.
+        Writing an existing key is a no-op."""
+        key = key or (data.key if isinstance(data, SpooledBlob) else blob_key(data))
+        path = self._path(key)
+        if path.exists():
+            return key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if isinstance(data, SpooledBlob):
+                    data.seek(0)
+                    shutil.copyfileobj(data, f, _COPY_BUFFER)
+                else:
+                    f.write(data)
+            os.replace(tmp, path)  # atomic: readers never see a partial blob
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return key
+
+    def exists(self, key):
+        return self._path(key).is_file()
+
+    def open(self, key):
+        """Binary file object for the blob. Raises FileNotFoundError."""
+        return open(self._path(key), "rb")
+
+    def local_path(self, key):
+        """Filesystem path of the blob if present, for send_file; else None."""
+        path = self._path(key)
+        return str(path) if path.is_file() else None
+
+    def url(self, key, expires=3600):
+        return None
+
+    def delete(self, key):
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+
+class S3BlobStore:
+    """Blobs as objects <prefix><key> in an S3-compatible bucket."""
+
+    def __init__(self, bucket, prefix="blobs/", endpoint_url=None):
+        if boto3 is None:
+            raise RuntimeError("BLOB_STORE=s3 needs the boto3 package")
+        self.bucket = bucket
+        self.prefix = prefix
+        self._client = boto3.client("s3", endpoint_url=endpoint_url or None)
+
+    def _name(self, key):
+        return self.prefix + _check_key(key)
+
+    def put(self, data, media_type=None, key=None):
+        key = key or (data.key if isinstance(data, SpooledBlob) else blob_key(data))
+        if not self.exists(key):
+            extra = {"ContentType": media_type} if media_type else {}
+            extra["CacheControl"] = "public, max-age=31536000, immutable"
+            if isinstance(data, SpooledBlob):
+                data.seek(0)
+                self._client.upload_fileobj(data, self.bucket, self._name(key), ExtraArgs=extra)
+            else:
+                self._client.put_object(Bucket=self.bucket, Key=self._name(key), Body=data, **extra)
+        return key
+
+    def exists(self, key):
+        try:
+            self._client.head_object(Bucket=self.bucket, Key=self._name(key))
+            return True
+        except self._client.exceptions.ClientError:
+            return False
+
+    def open(self, key):
+        try:
+            return self._client.get_object(Bucket=self.bucket, Key=self._name(key))["Body"]
+        except self._client.exceptions.NoSuchKey:
+            raise FileNotFoundError(key)
+
+    def local_path(self, key):
+        return None
+
+    def url(self, key, expires=3600):
+        """Presigned GET URL for the blob."""
+        return self._client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": self._name(key)}, ExpiresIn=expires
+        )
+
+    def delete(self, key):
+        self._client.delete_object(Bucket=self.bucket, Key=self._name(key))
+
+
+def make_blob_store():
+    """Blob store selected by BLOB_STORE (local or s3). RuntimeError on Render without s3 or BLOB_DIR."""
+    kind = os.getenv("BLOB_STORE", "local").strip().lower()
+    if kind == "s3":
+        return S3BlobStore(
+            os.environ["S3_BUCKET"],
+            prefix=os.getenv("S3_PREFIX", "blobs/"),
+            endpoint_url=os.getenv("S3_ENDPOINT_URL"),
+        )
+    if os.getenv("RENDER") and not os.getenv("BLOB_DIR"):
+        raise RuntimeError(
+            "On Render the default blob directory is on ephemeral disk: set BLOB_STORE=s3 or point "
+            "BLOB_DIR at a persistent disk."
+        )
+    default_dir = Path(__file__).resolve().parent.parent / "blobs"
+    return LocalBlobStore(os.getenv("BLOB_DIR", str(default_dir)))
+
+
+class _LazyBlobStore:
+    """The store make_blob_store() returns, built on first attribute access."""
+
+    def __init__(self):
+        self._store = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if self._store is None:
+            with self._lock:
+                if self._store is None:
+                    self._store = make_blob_store()
+        return getattr(self._store, name)
+
+
+blob_store = _LazyBlobStore()
@@ -0,0 +1,141 @@
+"""
+TrailFeathers - Small key/value caches for server-side data shared between requests and users.
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+LocalCache is an in-process LRU with per-entry TTL (one per Gunicorn worker). RedisCache talks to a
+Redis-compatible server (Redis, Valkey, KeyDB) so all workers share entries and invalidations.
+Counters (incr) are kept apart from cached values: LocalCache never evicts them, and RedisCache gives
+them a TTL well beyond any value's, so a counter outlives every entry written under it.
+make_cache() picks RedisCache when REDIS_URL is set and the redis package is installed, else LocalCache.
+Values must be JSON-serializable so both backends behave the same.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+_COUNTER_TTL = 24 * 3600
+
+
+class LocalCache:
+    """Thread-safe in-process LRU cache with a default TTL (seconds) per entry."""
+
+    def __init__(self, maxsize=256, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._counters = {}  # key -> int; outside the LRU so set() can never evict one
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return cached value or None if missing/expired."""
+        with self._lock:
+            if key in self._counters:
+                return self._counters[key]
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def get_many(self, keys):
+        """Return list of values (None for misses) in the order of keys."""
+        return [self.get(k) for k in keys]
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+            self._counters.pop(key, None)
+
+    def incr(self, key):
+        """Increment an integer counter (created at 0) and return the new value. Counters are never
+        expired or evicted."""
+        with self._lock:
+            value = self._counters.get(key, 0) + 1
+            self._counters[key] = value
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._counters.clear()
+
+
+class RedisCache:
+    """Same interface as LocalCache backed by a Redis-compatible server; keys are namespaced by prefix.
+    Counters expire counter_ttl seconds after their last incr (default: a day, at least 10x ttl)."""
+
+    def __init__(self, client, prefix, ttl=60, counter_ttl=None):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+        self.counter_ttl = int(counter_ttl or max(_COUNTER_TTL, 10 * ttl))
+
+    def _k(self, key):
+        return f"{self.prefix}:{key}"
+
+    def get(self, key):
+        return self.get_many([key])[0]
+
+    def get_many(self, keys):
+        raw = self.client.mget([self._k(k) for k in keys])
+        return [json.loads(v) if v is not None else None for v in raw]
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self._k(key), json.dumps(value), ex=max(1, int(self.ttl if ttl is None else ttl)))
+
+    def delete(self, key):
+        self.client.delete(self._k(key))
+
+    def incr(self, key):
+        pipe = self.client.pipeline()
+        pipe.incr(self._k(key))
+        pipe.expire(self._k(key), self.counter_ttl)
+        value, _ = pipe.execute()
+        return int(value)
+
+    def clear(self):
+        for k in self.client.scan_iter(match=self._k("*")):
+            self.client.delete(k)
+
+
+_redis_client = None
+_redis_lock = threading.Lock()
+
+
+def _get_redis_client():
+    """Shared Redis client for REDIS_URL, or None if unset or the redis package is missing."""
+    global _redis_client
+    url = os.getenv("REDIS_URL")
+    if not url or redis is None:
+        return None
+    with _redis_lock:
+        if _redis_client is None:
+            _redis_client = redis.Redis.from_url(url, socket_timeout=2)
+        return _redis_client
+
+
+def make_cache(name, maxsize=256, ttl=60):
+    """Return a cache for one namespace: RedisCache if REDIS_URL is configured, else LocalCache."""
+    client = _get_redis_client()
+    if client is not None:
+        return RedisCache(client, f"tf:{name}", ttl=ttl)
+    return LocalCache(maxsize=maxsize, ttl=ttl)
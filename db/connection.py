@@ -3,8 +3,24 @@ TrailFeathers - Database connection: get_db_connection(), get_cursor(); uses DAT
 Group: TrailFeathers
 Authors: Kim, Smith, Domst, and Snider
 Last updated: 3/13/26
+
+Connections come from a process-wide pool so each request does not pay a fresh TCP+TLS handshake
+to Neon. The pool is created lazily per process (safe under Gunicorn's fork model) and sized from env:
+DB_POOL_MIN_SIZE (default 1), DB_POOL_MAX_SIZE (default 10; 0 disables pooling),
+DB_POOL_MAX_CONNECTIONS (optional total budget split across WEB_CONCURRENCY Gunicorn workers),
+DB_POOL_IDLE_TIMEOUT (seconds before an idle connection above min size is closed, default 240),
+DB_POOL_PING_AFTER (idle seconds after which checkout runs SELECT 1 first, default 30),
+DB_POOL_TIMEOUT (seconds to wait for a free connection, default 30).
+
+A UnitOfWork (begin_unit_of_work() / unit_of_work()) binds one connection and transaction to the
+current context; get_cursor() calls made inside it share that transaction instead of committing
+individually. tf_server opens one per HTTP request.
 """
+import contextvars
 import os
+import threading
+import time
+from collections import deque
 from contextlib import contextmanager
 
 # Prefer psycopg2 for RealDictCursor; fall back to psycopg (v3) if needed
@@ -16,9 +32,27 @@ except ImportError:
     import psycopg
     _use_psycopg2 = False
 
+_DB_ERROR = psycopg2.Error if _use_psycopg2 else psycopg.Error
 
-def get_db_connection():
-    """Return a live DB connection (cursor returns dict-like rows). Caller must close it."""
+
+def _env_int(name, default):
+    """Read an int from env; fall back to default if unset or invalid."""
+    try:
+        return int(os.getenv(name, ""))
+    except ValueError:
+        return default
+
+
+def _env_float(name, default):
+    """Read a float from env; fall back to default if unset or invalid."""
+    try:
+        return float(os.getenv(name, ""))
+    except ValueError:
+        return default
+
+
+def _connect():
+    """Open a new DB connection (cursor returns dict-like rows)."""
     url = os.getenv("DATABASE_URL")
     if not url:
         raise RuntimeError(
@@ -32,17 +66,381 @@ def get_db_connection():
     return conn
 
 
+def _is_closed(conn):
+    """True if the driver reports the connection as closed or broken."""
+    if _use_psycopg2:
+        return bool(conn.closed)
+    return conn.closed or conn.broken
+
+
+def _pool_sizes():
+    """Return (min_size, max_size) for this process from env."""
+    max_size = _env_int("DB_POOL_MAX_SIZE", 10)
+    total = _env_int("DB_POOL_MAX_CONNECTIONS", 0)
+    if total > 0:
+        # Gunicorn workers each hold their own pool; share the server-side budget between them
+        workers = max(1, _env_int("WEB_CONCURRENCY", 1))
+        max_size = max(1, total // workers)
+    min_size = min(max(0, _env_int("DB_POOL_MIN_SIZE", 1)), max(max_size, 0))
+    return min_size, max_size
+
+
+class _ConnectionPool:
+    """Thread-safe pool of open connections for one process. Idle connections are reused
+    most-recently-used first; the oldest are closed after idle_timeout (keeping min_size)."""
+
+    def __init__(self, min_size, max_size, idle_timeout, ping_after, checkout_timeout):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.ping_after = ping_after
+        self.checkout_timeout = checkout_timeout
+        self._idle = deque()  # (conn, last_used); newest on the right
+        self._size = 0  # idle + checked out
+        self._cond = threading.Condition()
+
+    def getconn(self):
+        """Check out a healthy connection, opening one if under max_size; waits up to checkout_timeout."""
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            expired = []
+            conn = None
+            last_used = None
+            with self._cond:
+                while True:
+                    expired.extend(self._pop_expired_locked())
+                    if self._idle:
+                        conn, last_used = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise RuntimeError("Timed out waiting for a database connection.")
+                    self._cond.wait(remaining)
+            for old in expired:
+                _close_quietly(old)
+            if conn is None:
+                try:
+                    return _connect()
+                except Exception:
+                    self._release_slot()
+                    raise
+            if self._is_healthy(conn, last_used):
+                return conn
+            _close_quietly(conn)
+            self._release_slot()
+
+    def putconn(self, conn, discard=False):
+        """Return a connection to the pool, or close it if discard is set or it is broken."""
+        if discard or _is_closed(conn):
+            _close_quietly(conn)
+            self._release_slot()
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def _release_slot(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _pop_expired_locked(self):
+        """Remove connections idle longer than idle_timeout while above min_size. Caller holds the lock."""
+        out = []
+        now = time.monotonic()
+        while self._idle and self._size > self.min_size and now - self._idle[0][1] >= self.idle_timeout:
+            out.append(self._idle.popleft()[0])
+            self._size -= 1
+        return out
+
+    def _is_healthy(self, conn, last_used):
+        """Health check on checkout: cheap state check always, SELECT 1 if idle for ping_after seconds."""
+        if _is_closed(conn):
+            return False
+        if time.monotonic() - last_used < self.ping_after:
+            return True
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.close()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return this process's connection pool (None if DB_POOL_MAX_SIZE=0). Recreated after fork."""
+    global _pool, _pool_pid
+    pid = os.getpid()
+    if _pool_pid == pid:
+        return _pool
+    with _pool_lock:
+        if _pool_pid != pid:
+            # Inherited connections belong to the parent process; drop them without closing
+            min_size, max_size = _pool_sizes()
+            _pool = None
+            if max_size > 0:
+                _pool = _ConnectionPool(
+                    min_size,
+                    max_size,
+                    idle_timeout=_env_float("DB_POOL_IDLE_TIMEOUT", 240.0),
+                    ping_after=_env_float("DB_POOL_PING_AFTER", 30.0),
+                    checkout_timeout=_env_float("DB_POOL_TIMEOUT", 30.0),
+                )
+            _pool_pid = pid
+    return _pool
+
+
+class _PooledConnection:
+    """Connection handed out by get_db_connection(); close() returns it to the pool instead of closing."""
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def close(self):
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        try:
+            conn.rollback()
+        except Exception:
+            self._pool.putconn(conn, discard=True)
+            return
+        self._pool.putconn(conn)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._conn is not None:
+            if exc_type is None:
+                self._conn.commit()
+            else:
+                self._conn.rollback()
+        self.close()
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise RuntimeError("Connection already returned to the pool.")
+        return getattr(self._conn, name)
+
+
+def _dict_cursor(conn):
+    """Open a cursor on conn that returns dict rows."""
+    if _use_psycopg2:
+        return conn.cursor(cursor_factory=RealDictCursor)
+    return conn.cursor(row_factory=psycopg.rows.dict_row)
+
+
+def _release(pool, conn, rollback):
+    """Hand conn back to the pool (or close it when unpooled), rolling back any open transaction first."""
+    if pool is None:
+        _close_quietly(conn)
+        return
+    discard = False
+    if rollback:
+        try:
+            conn.rollback()
+        except Exception:
+            discard = True
+    pool.putconn(conn, discard=discard)
+
+
+class _CountingCursor:
+    """Cursor proxy that counts execute() calls into the owning UnitOfWork's query_count."""
+
+    __slots__ = ("_cur", "_unit")
+
+    def __init__(self, cur, unit):
+        self._cur = cur
+        self._unit = unit
+
+    def execute(self, *args, **kwargs):
+        self._unit.query_count += 1
+        return self._cur.execute(*args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        self._unit.query_count += 1
+        return self._cur.executemany(*args, **kwargs)
+
+    def __iter__(self):
+        return iter(self._cur)
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+
+class UnitOfWork:
+    """One connection and transaction shared by every get_cursor() call made while it is active.
+    The connection is checked out lazily on first use. If a database error escapes a nested
+    get_cursor() block the transaction is rolled back right away and the unit is marked failed, so
+    commit() refuses and finish() will not commit anything the request wrote. Other exceptions (the
+    ValueErrors helpers raise for bad input, before or instead of writing) leave the transaction as it
+    is. query_count counts statements executed through it."""
+
+    def __init__(self):
+        self._pool = get_pool()
+        self._conn = None
+        self._token = None
+        self._after_commit = []
+        self.failed = False
+        self.query_count = 0
+
+    @contextmanager
+    def cursor(self):
+        """Cursor on the shared connection; does not commit on exit."""
+        if self._conn is None:
+            self._conn = self._pool.getconn() if self._pool is not None else _connect()
+        cur = _dict_cursor(self._conn)
+        try:
+            yield _CountingCursor(cur, self)
+        except BaseException as e:
+            if isinstance(e, Exception) and not isinstance(e, _DB_ERROR):
+                raise  # the transaction is still usable; the caller decides what the request does
+            self.failed = True
+            try:
+                self._conn.rollback()
+            except Exception:
+                pass
+            raise
+        finally:
+            _close_quietly(cur)
+
+    @property
+    def has_pending_after_commit(self):
+        """True if callbacks registered with after_commit() are waiting for this unit to commit."""
+        return bool(self._after_commit)
+
+    def commit(self):
+        """Commit the shared transaction unless the unit failed, then run after_commit callbacks.
+        Returns True if committed."""
+        if self.failed:
+            return False
+        if self._conn is not None:
+            self._conn.commit()
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            callback()
+        return True
+
+    def release_connection(self):
+        """Commit what the unit has done so far and hand its connection back to the pool, leaving the
+        unit active: the next get_cursor() checks a connection out again. For handlers that are about
+        to wait on something slow outside the database (e.g. an upstream HTTP call), so the pooled
+        connection does not sit idle in a transaction meanwhile. A failed unit is rolled back instead."""
+        try:
+            self.commit()
+        finally:
+            if self._conn is not None:
+                conn, self._conn = self._conn, None
+                _release(self._pool, conn, rollback=True)
+
+    def finish(self, commit=False):
+        """End the unit: optionally commit, roll back anything left, return the connection, deactivate."""
+        try:
+            if commit:
+                self.commit()
+        finally:
+            if self._conn is not None:
+                conn, self._conn = self._conn, None
+                _release(self._pool, conn, rollback=True)
+            if self._token is not None:
+                _current_unit.reset(self._token)
+                self._token = None
+
+
+_current_unit = contextvars.ContextVar("tf_db_unit_of_work", default=None)
+
+
+def current_unit_of_work():
+    """Return the active UnitOfWork for this context, or None."""
+    return _current_unit.get()
+
+
+def begin_unit_of_work():
+    """Start a UnitOfWork and make it active for get_cursor() in this context. Caller must finish() it."""
+    unit = UnitOfWork()
+    unit._token = _current_unit.set(unit)
+    return unit
+
+
+def after_commit(callback):
+    """Run callback once the current unit of work commits (dropped if it rolls back).
+    Outside a unit of work get_cursor() commits on exit, so callback runs immediately."""
+    unit = _current_unit.get()
+    if unit is None:
+        callback()
+    else:
+        unit._after_commit.append(callback)
+
+
+def release_connection():
+    """Release the active unit of work's connection (UnitOfWork.release_connection); no-op outside one."""
+    unit = _current_unit.get()
+    if unit is not None:
+        unit.release_connection()
+
+
+@contextmanager
+def unit_of_work():
+    """Context manager: run the block in one transaction (joins an active unit). Commits on success."""
+    if _current_unit.get() is not None:
+        yield _current_unit.get()
+        return
+    unit = begin_unit_of_work()
+    try:
+        yield unit
+    except BaseException:
+        unit.failed = True
+        raise
+    finally:
+        unit.finish(commit=not unit.failed)
+
+
+def get_db_connection():
+    """Return a live DB connection (cursor returns dict-like rows). Caller must close it (returns it to the pool)."""
+    pool = get_pool()
+    if pool is None:
+        return _connect()
+    return _PooledConnection(pool, pool.getconn())
+
+
 @contextmanager
 def get_cursor():
-    """Context manager: connection + cursor that returns dict rows. Commits on exit."""
-    conn = get_db_connection()
+    """Context manager: cursor that returns dict rows. Inside a unit of work, shares its transaction;
+    otherwise uses a pooled connection and commits on exit, rolling back on error."""
+    unit = _current_unit.get()
+    if unit is not None:
+        with unit.cursor() as cur:
+            yield cur
+        return
+    pool = get_pool()
+    conn = pool.getconn() if pool is not None else _connect()
+    cur = None
+    committed = False
     try:
-        if _use_psycopg2:
-            cur = conn.cursor(cursor_factory=RealDictCursor)
-        else:
-            cur = conn.cursor(row_factory=psycopg.rows.dict_row)
+        cur = _dict_cursor(conn)
         yield cur
         conn.commit()
+        committed = True
     finally:
-        cur.close()
-        conn.close()
+        if cur is not None:
+            _close_quietly(cur)
+        _release(pool, conn, rollback=not committed)
@@ -50,14 +50,17 @@ def list_incoming_requests(receiver_id):
 
 
 def accept_friend_request(request_id, receiver_id):
-    """Set request to accepted. Only the receiver can accept. Returns True if updated."""
+    """Set request to accepted. Only the receiver can accept. Returns the new friend { id, username,
+    created_at } (the sender; created_at of the request, as list_friends orders by) if updated, else None."""
     with get_cursor() as cur:
         cur.execute(
-            """UPDATE friend_requests SET status = 'accepted'
-               WHERE id = %s AND receiver_id = %s AND status = 'pending'""",
+            """UPDATE friend_requests fr SET status = 'accepted'
+               FROM users u
+               WHERE fr.id = %s AND fr.receiver_id = %s AND fr.status = 'pending' AND u.id = fr.sender_id
+               RETURNING u.id, u.username, fr.created_at""",
             (request_id, receiver_id),
         )
-        return cur.rowcount > 0
+        return cur.fetchone()
 
 
 def decline_friend_request(request_id, receiver_id):
@@ -72,15 +75,17 @@ def decline_friend_request(request_id, receiver_id):
 
 
 def list_friends(user_id):
-    """Return list of friends: [{ id, username }] for the other user in each accepted pair."""
+    """Return list of friends: [{ id, username, created_at }] for the other user in each accepted pair,
+    newest request first."""
     with get_cursor() as cur:
         cur.execute(
-            """SELECT u.id, u.username
+            """SELECT u.id, u.username, fr.created_at
                FROM friend_requests fr
                JOIN users u ON (u.id = fr.receiver_id AND fr.sender_id = %s)
                           OR (u.id = fr.sender_id AND fr.receiver_id = %s)
                WHERE fr.status = 'accepted'
-                 AND (fr.sender_id = %s OR fr.receiver_id = %s)""",
+                 AND (fr.sender_id = %s OR fr.receiver_id = %s)
+               ORDER BY fr.created_at DESC, fr.id DESC""",
             (user_id, user_id, user_id, user_id),
         )
         return cur.fetchall()
@@ -5,6 +5,7 @@ Authors: Kim, Smith, Domst, and Snider
 Last updated: 3/13/26
 """
 from .connection import get_cursor
+from .trip_dashboard import invalidate_trip_dashboards_for_user
 
 
 def add_gear_item(user_id, payload):
@@ -51,7 +52,8 @@ def add_gear_item(user_id, payload):
             (user_id, gear_type, name, capacity, weight_oz, brand, condition, notes, requirement_type_id, capacity_persons),
         )
         row = cur.fetchone()
-        return row["id"]
+    invalidate_trip_dashboards_for_user(user_id)
+    return row["id"]
 
 
 def list_gear(user_id):
@@ -157,6 +159,7 @@ def update_gear_item(gear_id, user_id, payload):
                 user_id,
             ),
         )
+    invalidate_trip_dashboards_for_user(user_id)
 
 
 def delete_gear_item(gear_id, user_id):
@@ -166,3 +169,4 @@ def delete_gear_item(gear_id, user_id):
         raise ValueError("Gear item not found.")
     with get_cursor() as cur:
         cur.execute("DELETE FROM gear WHERE id = %s AND user_id = %s", (gear_id, user_id))
+    invalidate_trip_dashboards_for_user(user_id)
@@ -0,0 +1,105 @@
+"""
+TrailFeathers - Downscaled WebP/JPEG variants of uploaded images, kept in the blob store.
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+A variant is the source blob scaled to fit VARIANT_SIZES px on its longest side (EXIF rotation
+applied, never upscaled) and re-encoded as WebP or JPEG. Its blob key is derived from the recipe
+(source key, size, format, _RECIPE_VERSION), not its bytes, so it can be found without a lookup table
+and, like the source, never changes. schedule_variants() renders the WebP variants on a background
+thread once an upload commits (IMAGE_VARIANT_WORKERS, default 1); variant() renders any missing one
+on demand, so images uploaded before this existed get theirs on first request.
+
+Needs Pillow; without it variant() returns None and callers serve the original.
+"""
+import hashlib
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .blobs import blob_store
+from .cache import make_cache
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+VARIANT_SIZES = (128, 512, 1280)
+_RECIPE_VERSION = 1
+# format -> (Pillow format, media type, save options)
+VARIANT_FORMATS = {
+    "webp": ("WEBP", "image/webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", "image/jpeg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+_MAX_PIXELS = 40_000_000  # refuse decompression bombs well before Pillow's own limit
+
+# (source key, size, format) -> variant key, or "" when the source already fits and is served as is
+_known = make_cache("image_variants", maxsize=4096, ttl=24 * 3600)
+_executor = ThreadPoolExecutor(
+    max_workers=max(1, int(os.getenv("IMAGE_VARIANT_WORKERS", "1"))), thread_name_prefix="image-variants"
+)
+
+
+def variant_key(key, size, fmt):
+    """Blob key for the size/fmt variant of source blob key."""
+    return hashlib.sha256(f"variant:{_RECIPE_VERSION}:{key}:{size}:{fmt}".encode()).hexdigest()
+
+
+def _render(key, size, fmt):
+    """Render and store one variant; return its key, "" if the source already fits, None on failure."""
+    pil_format, media_type, options = VARIANT_FORMATS[fmt]
+    try:
+        with blob_store.open(key) as f:
+            im = Image.open(f)
+            if im.width * im.height > _MAX_PIXELS:
+                return None
+            if max(im.size) <= size:
+                return ""
+            im.draft("RGB", (size, size))  # JPEG: decode at a reduced scale when possible
+            im = ImageOps.exif_transpose(im)
+            im.thumbnail((size, size), Image.LANCZOS)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+    if pil_format == "JPEG" or im.mode not in ("RGB", "RGBA"):
+        im = im.convert("RGBA" if pil_format == "WEBP" and im.mode in ("LA", "P", "PA") else "RGB")
+    out = io.BytesIO()
+    im.save(out, pil_format, **options)
+    return blob_store.put(out.getvalue(), media_type, key=variant_key(key, size, fmt))
+
+
+def variant(key, size, fmt="webp"):
+    """Return (blob key, media type) of the size/fmt variant of source blob key, rendering it if it
+    does not exist yet; None if the original should be served (it already fits, or no Pillow)."""
+    if Image is None or size not in VARIANT_SIZES or fmt not in VARIANT_FORMATS:
+        return None
+    cache_key = f"{key}:{size}:{fmt}"
+    found = _known.get(cache_key)
+    if found is None:
+        vkey = variant_key(key, size, fmt)
+        found = vkey if blob_store.exists(vkey) else _render(key, size, fmt)
+        if found is None:
+            return None
+        _known.set(cache_key, found)
+    return (found, VARIANT_FORMATS[fmt][1]) if found else None
+
+
+def delete_variants(key):
+    """Delete every variant of source blob key from the store and forget them (db.blob_gc)."""
+    for size in VARIANT_SIZES:
+        for fmt in VARIANT_FORMATS:
+            _known.delete(f"{key}:{size}:{fmt}")
+            blob_store.delete(variant_key(key, size, fmt))
+
+
+def _render_all(key):
+    for size in VARIANT_SIZES:
+        if variant(key, size, "webp") is None:
+            break  # larger sizes won't fit either, or the source can't be decoded
+
+
+def schedule_variants(key):
+    """Render the WebP variants of a new upload in the background."""
+    if Image is not None:
+        _executor.submit(_render_all, key)
@@ -0,0 +1,79 @@
+"""
+TrailFeathers - Images still in the BYTEA columns from before migration 015 (user_trip_reports.image,
+user_profiles.avatar).
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+Until scripts/migrate_images_to_blobs.py has copied them into the blob store, reads fall back to those
+columns so existing photos and avatars keep showing: "has an image" checks also look at the BYTEA
+column (has_image_sql), and the image getters move a row's BYTEA image into the blob store the first
+time it is asked for (promote_legacy_image). Whether a column still exists is looked up at most once a
+minute; once the script drops it (--drop-columns) this is a no-op.
+"""
+import time
+
+from .blob_gc import lock_blob
+from .blobs import blob_store
+from .connection import after_commit, get_cursor
+from .image_variants import schedule_variants
+
+# table -> (id column, BYTEA column, hash column, media type column)
+_COLUMNS = {
+    "user_trip_reports": ("id", "image", "image_hash", "image_media_type"),
+    "user_profiles": ("user_id", "avatar", "avatar_hash", "avatar_media_type"),
+}
+_RECHECK_SECONDS = 60
+_present = {}  # table -> (checked_at, column still exists)
+
+
+def legacy_column(table):
+    """Name of table's pre-015 BYTEA image column if it still exists, else None."""
+    data_col = _COLUMNS[table][1]
+    checked = _present.get(table)
+    if checked is None or (checked[1] and checked[0] + _RECHECK_SECONDS < time.monotonic()):
+        with get_cursor() as cur:
+            cur.execute(
+                """SELECT 1 FROM information_schema.columns
+                   WHERE table_schema = 'public' AND table_name = %s AND column_name = %s""",
+                (table, data_col),
+            )
+            checked = (time.monotonic(), cur.fetchone() is not None)
+        _present[table] = checked  # a dropped column never comes back, so that answer is kept
+    return data_col if checked[1] else None
+
+
+def has_image_sql(table, alias):
+    """SQL condition true when the row aliased alias has an image: its hash, or legacy BYTEA data."""
+    hash_col = _COLUMNS[table][2]
+    data_col = legacy_column(table)
+    if data_col is None:
+        return f"{alias}.{hash_col} IS NOT NULL"
+    return f"({alias}.{hash_col} IS NOT NULL OR {alias}.{data_col} IS NOT NULL)"
+
+
+def promote_legacy_image(table, row_id):
+    """Move row row_id's legacy BYTEA image into the blob store and record its key, as the migration
+    script does. Returns the row's blob key (also when it already had one), or None if it has no image."""
+    id_col, data_col, hash_col, media_col = _COLUMNS[table]
+    if legacy_column(table) is None:
+        return None
+    with get_cursor() as cur:
+        cur.execute(
+            f"""SELECT {hash_col} AS hash, {data_col} AS data, {media_col} AS media_type
+                FROM {table} WHERE {id_col} = %s FOR UPDATE""",
+            (row_id,),
+        )
+        row = cur.fetchone()
+        if row is None or row["hash"] or row["data"] is None:
+            return row["hash"] if row else None
+        data = bytes(row["data"])
+        key = blob_store.put(data, row["media_type"])
+        lock_blob(cur, key)
+        blob_store.put(data, row["media_type"])  # no-op unless a release of the same bytes deleted it
+        cur.execute(
+            f"""UPDATE {table} SET {hash_col} = %s, {data_col} = NULL WHERE {id_col} = %s""",
+            (key, row_id),
+        )
+    after_commit(lambda: schedule_variants(key))
+    return key
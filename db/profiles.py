@@ -3,21 +3,49 @@ TrailFeathers - User profiles: display_name, bio, avatar_path, optional avatar u
 Group: TrailFeathers
 Authors: Kim, Smith, Domst, and Snider
 Last updated: 3/13/26
+
+get_avatar_by_username() serves GET /api/users/<username>/avatar, which every <img> of a user's avatar
+hits without auth: one users/user_profiles join, cached per username for AVATAR_CACHE_TTL seconds
+(default 300; db.cache, so shared through Redis when REDIS_URL is set). Writes that change the
+uploaded avatar drop the entry once they commit, and release the avatar they replace (db.blob_gc).
 """
-from .connection import get_cursor, get_db_connection
+import os
+
+from .blob_gc import lock_blob, release_blob
+from .blobs import blob_size, blob_store
+from .cache import make_cache
+from .connection import after_commit, get_cursor, get_db_connection
+from .image_variants import schedule_variants
+from .legacy_images import has_image_sql, promote_legacy_image
 
 # Allowed prefix for avatar_path (under static/) — profile duck presets
 PROFILE_AVATAR_DIR_PREFIX = "images_for_site/profile_ducks/"
 
+# username -> {"hash", "media_type"}; hash None when the user has no uploaded avatar
+_avatars_by_username = make_cache(
+    "avatars_by_username", maxsize=4096, ttl=float(os.getenv("AVATAR_CACHE_TTL", "300"))
+)
+_RETURNING_USERNAME = "RETURNING (SELECT username FROM users WHERE id = user_profiles.user_id) AS username"
+# Prefix for the upserts that replace avatar_hash: the CTE sees the row as it was before the statement
+_OLD_AVATAR_CTE = "WITH old AS (SELECT avatar_hash FROM user_profiles WHERE user_id = %s FOR UPDATE) "
+_RETURNING_OLD_AVATAR = ", (SELECT avatar_hash FROM old) AS old_hash"
+
+
+def _forget_avatar(username):
+    """Drop username's cached avatar once the current transaction commits."""
+    if username:
+        after_commit(lambda: _avatars_by_username.delete(username))
+
 
 def get_user_profile(user_id):
     """Return profile row for user_id. None if no row.
-    Includes avatar_path (static-relative path) and whether an uploaded BYTEA avatar exists."""
+    Includes avatar_path (static-relative path) and whether an uploaded avatar exists (avatar_hash)."""
     with get_cursor() as cur:
         cur.execute(
             """SELECT user_id, display_name, bio, updated_at,
                       avatar_path,
-                      (avatar IS NOT NULL) AS avatar_uploaded,
+                      """ + has_image_sql("user_profiles", "user_profiles") + """ AS avatar_uploaded,
+                      avatar_hash,
                       avatar_media_type
                FROM user_profiles WHERE user_id = %s""",
             (user_id,),
@@ -27,23 +55,28 @@ def get_user_profile(user_id):
 
 def upsert_user_profile(user_id, display_name=None, bio=None, avatar_path=None):
     """Insert or update user profile. display_name and bio can be None to clear.
-    If avatar_path is str, set preset path and clear uploaded BYTEA avatar.
+    If avatar_path is str, set preset path and clear uploaded avatar.
     If avatar_path is False, clear avatar_path only (keep upload if any)."""
+    changed_avatar_of = old_hash = None
     with get_cursor() as cur:
         if avatar_path is not None and avatar_path is not False:
-            # Set path and clear BYTEA so preset takes effect
+            # Set path and clear the upload so preset takes effect
             cur.execute(
-                """INSERT INTO user_profiles (user_id, display_name, bio, avatar_path, avatar, avatar_media_type, updated_at)
+                _OLD_AVATAR_CTE
+                + """INSERT INTO user_profiles (user_id, display_name, bio, avatar_path, avatar_hash, avatar_media_type, updated_at)
                    VALUES (%s, %s, %s, %s, NULL, NULL, NOW())
                    ON CONFLICT (user_id) DO UPDATE SET
                      display_name = COALESCE(EXCLUDED.display_name, user_profiles.display_name),
                      bio = COALESCE(EXCLUDED.bio, user_profiles.bio),
                      avatar_path = EXCLUDED.avatar_path,
-                     avatar = NULL,
+                     avatar_hash = NULL,
                      avatar_media_type = NULL,
-                     updated_at = NOW()""",
-                (user_id, display_name, bio, avatar_path),
+                     updated_at = NOW()
+                   """ + _RETURNING_USERNAME + _RETURNING_OLD_AVATAR,
+                (user_id, user_id, display_name, bio, avatar_path),
             )
+            row = cur.fetchone()
+            changed_avatar_of, old_hash = row["username"], row["old_hash"]
         elif avatar_path is False:
             # Clear preset path only
             cur.execute(
@@ -66,42 +99,81 @@ def upsert_user_profile(user_id, display_name=None, bio=None, avatar_path=None):
                      updated_at = NOW()""",
                 (user_id, display_name, bio),
             )
+    _forget_avatar(changed_avatar_of)
+    release_blob(old_hash)
+
 
+MAX_AVATAR_BYTES = 2 * 1024 * 1024
 
-def set_profile_avatar_upload(user_id, image_bytes, media_type):
-    """Store uploaded avatar bytes; clears avatar_path so upload is shown."""
-    if not image_bytes or len(image_bytes) > 2 * 1024 * 1024:
+
+def set_profile_avatar_upload(user_id, image, media_type):
+    """Store an uploaded avatar (bytes or a db.blobs.SpooledBlob) in the blob store; clears avatar_path
+    so upload is shown.
+    Thumbnails are rendered in the background after commit and the avatar it replaces is released
+    (db.blob_gc). Returns the blob key."""
+    if not 0 < blob_size(image) <= MAX_AVATAR_BYTES:
         raise ValueError("Image missing or too large (max 2MB).")
     mt = (media_type or "image/jpeg").strip().lower()
     if mt not in ("image/jpeg", "image/png", "image/gif", "image/webp"):
         raise ValueError("Use JPEG, PNG, GIF, or WebP.")
+    key = blob_store.put(image, mt)
     with get_cursor() as cur:
+        lock_blob(cur, key)
+        blob_store.put(image, mt)  # no-op unless a release of the same bytes deleted it meanwhile
         cur.execute(
-            """INSERT INTO user_profiles (user_id, avatar, avatar_media_type, avatar_path, updated_at)
+            _OLD_AVATAR_CTE
+            + """INSERT INTO user_profiles (user_id, avatar_hash, avatar_media_type, avatar_path, updated_at)
                VALUES (%s, %s, %s, NULL, NOW())
                ON CONFLICT (user_id) DO UPDATE SET
-                 avatar = EXCLUDED.avatar,
+                 avatar_hash = EXCLUDED.avatar_hash,
                  avatar_media_type = EXCLUDED.avatar_media_type,
                  avatar_path = NULL,
-                 updated_at = NOW()""",
-            (user_id, image_bytes, mt),
+                 updated_at = NOW()
+               """ + _RETURNING_USERNAME + _RETURNING_OLD_AVATAR,
+            (user_id, user_id, key, mt),
         )
+        row = cur.fetchone()
+    _forget_avatar(row["username"])
+    if row["old_hash"] != key:
+        release_blob(row["old_hash"])
+    after_commit(lambda: schedule_variants(key))
+    return key
 
 
 def get_profile_avatar_payload(user_id):
-    """Return dict with keys bytes, media_type if user has BYTEA avatar; else None."""
+    """Return dict with keys hash (blob key), media_type if user has an uploaded avatar; else None. A
+    pre-015 BYTEA avatar is moved into the blob store first (db.legacy_images)."""
     with get_cursor() as cur:
         cur.execute(
-            """SELECT avatar, avatar_media_type FROM user_profiles
-               WHERE user_id = %s AND avatar IS NOT NULL""",
+            """SELECT avatar_hash, avatar_media_type FROM user_profiles WHERE user_id = %s""",
             (user_id,),
         )
         row = cur.fetchone()
-        if not row or not row.get("avatar"):
-            return None
-        b = row["avatar"]
-        if isinstance(b, memoryview):
-            b = b.tobytes()
-        return {"bytes": b, "media_type": row.get("avatar_media_type") or "image/jpeg"}
+    if not row:
+        return None
+    key = row["avatar_hash"] or promote_legacy_image("user_profiles", user_id)
+    if not key:
+        return None
+    return {"hash": key, "media_type": row.get("avatar_media_type") or "image/jpeg"}
 
 
+def get_avatar_by_username(username, fresh=False):
+    """Return {"hash", "media_type"} for username's uploaded avatar (hash None if they have none), or
+    None if there is no such user. Cached (see module docstring); fresh=True reads the database."""
+    avatar = None if fresh else _avatars_by_username.get(username)
+    if avatar is not None:
+        return avatar
+    with get_cursor() as cur:
+        cur.execute(
+            """SELECT u.id, p.avatar_hash, p.avatar_media_type
+               FROM users u LEFT JOIN user_profiles p ON p.user_id = u.id
+               WHERE u.username = %s""",
+            (username,),
+        )
+        row = cur.fetchone()
+    if not row:
+        return None
+    key = row["avatar_hash"] or promote_legacy_image("user_profiles", row["id"])
+    avatar = {"hash": key, "media_type": row["avatar_media_type"] or "image/jpeg"}
+    _avatars_by_username.set(username, avatar)
+    return avatar
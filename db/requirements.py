@@ -3,9 +3,63 @@ TrailFeathers - Activity requirements and requirement types; get_trip_requiremen
 Group: TrailFeathers
 Authors: Kim, Smith, Domst, and Snider
 Last updated: 3/13/26
+
+Checklists are evaluated in SQL, for one trip or many at once (get_trip_requirement_summaries): every
+activity_requirements rule against the trip's head count and gear coverage from trip_rollups
+(migration 017, kept current by triggers; db.trip_rollups), so one query reads O(requirements) rows. REQUIRED_COUNT_SQL
+holds the rules and is shared with the trip dashboard query. scripts/check_requirement_summary.py
+compares the results with the original per-row Python evaluation on random trips. list_trip_readiness
+rolls the same query up to met/short counts per trip for the trips list.
 """
 from .connection import get_cursor
 
+# Required count of an activity_requirements row r for a trip with h.n people (collaborators incl. creator):
+# per_group -> quantity, per_person -> quantity * n, per_N_persons -> quantity * ceil(n / n_persons).
+REQUIRED_COUNT_SQL = """CASE
+  WHEN r.rule = 'per_group' THEN r.quantity
+  WHEN r.rule = 'per_person' THEN r.quantity * h.n
+  WHEN r.rule = 'per_N_persons' AND r.n_persons > 0 THEN r.quantity * CEIL(h.n::numeric / r.n_persons)::int
+  ELSE 0
+END"""
+
+# btrim() characters for trips.activity_type before matching activity_requirements.activity_type:
+# every character str.strip() removes (Unicode whitespace, all below U+3001), as a U&'' literal
+ACTIVITY_TYPE_TRIM = "U&'" + "".join(f"\\{ord(c):04x}" for c in map(chr, range(0x3001)) if c.isspace()) + "'"
+
+_MEMBER_OF_SQL = """(t.creator_id = %(uid)s
+       OR EXISTS (SELECT 1 FROM trip_collaborators tc WHERE tc.trip_id = t.id AND tc.user_id = %(uid)s))"""
+_VISIBLE_TO_USER_SQL = """(t.creator_id = %(uid)s
+       OR EXISTS (SELECT 1 FROM trip_collaborators tc WHERE tc.trip_id = t.id AND tc.user_id = %(uid)s)
+       OR EXISTS (SELECT 1 FROM trip_invites ti
+                  WHERE ti.trip_id = t.id AND ti.invitee_id = %(uid)s AND ti.status = 'pending'))"""
+
+# Persons covered for requirement r by the gear assigned to the trip whose trip_rollups row is tr
+# (migration 017: capacity_persons per item, 1 if NULL, i.e. group-shareable); 0 without a row.
+COVERED_COUNT_SQL = "COALESCE((tr.coverage ->> r.requirement_type_id::text)::int, 0)"
+# Head count as h.n from trip_rollups tr, for REQUIRED_COUNT_SQL
+HEAD_COUNT_LATERAL_SQL = "CROSS JOIN LATERAL (SELECT COALESCE(tr.head_count, 0) AS n) h"
+
+# One row per (trip, requirement) for the selected trips, or one all-NULL requirement row for a trip
+# whose activity has none. Head count and coverage come from trip_rollups, one row per trip.
+_CHECKLIST_SQL = """
+WITH t AS (
+  SELECT t.id, btrim(t.activity_type, """ + ACTIVITY_TYPE_TRIM + """) AS activity_type
+  FROM trips t
+  WHERE {where}
+)
+SELECT t.id AS trip_id, r.requirement_type_id, rt.key AS requirement_key,
+       rt.display_name AS requirement_display_name, r.rule, r.quantity, r.n_persons,
+       """ + REQUIRED_COUNT_SQL + """ AS required_count,
+       """ + COVERED_COUNT_SQL + """ AS covered_count,
+       COALESCE(tr.total_weight_oz, 0)::float8 AS assigned_weight_oz
+FROM t
+LEFT JOIN trip_rollups tr ON tr.trip_id = t.id
+""" + HEAD_COUNT_LATERAL_SQL + """
+LEFT JOIN (activity_requirements r JOIN requirement_types rt ON rt.id = r.requirement_type_id)
+  ON r.activity_type = t.activity_type AND t.activity_type <> ''
+ORDER BY t.id, rt.display_name, r.requirement_type_id
+"""
+
 
 def list_requirement_types():
     """Return all requirement types: id, key, display_name. Ordered by display_name."""
@@ -33,93 +87,83 @@ def list_activity_requirements(activity_type):
         return cur.fetchall()
 
 
-def _required_count_for_rule(rule, quantity, n_persons, num_people):
-    """Compute required count given rule and head count."""
-    import math
-    if rule == "per_group":
-        return quantity
-    if rule == "per_person":
-        return quantity * num_people
-    if rule == "per_N_persons" and n_persons and n_persons > 0:
-        return quantity * math.ceil(num_people / n_persons)
-    return 0
-
-
-def _covered_count_for_type(assigned_gear_rows):
-    """From list of gear rows (with capacity_persons), sum coverage. Group-shareable (NULL) counts as 1 per type."""
-    if not assigned_gear_rows:
-        return 0
-    total = 0
-    for row in assigned_gear_rows:
-        cap = row.get("capacity_persons")
-        if cap is not None:
-            total += cap
-        else:
-            total += 1
-    return total
+def _checklist_row(row):
+    """Checklist item dict (as the API returns it) from a _CHECKLIST_SQL row."""
+    return {
+        "requirement_type_id": row["requirement_type_id"],
+        "requirement_key": row["requirement_key"],
+        "requirement_display_name": row["requirement_display_name"],
+        "rule": row["rule"],
+        "quantity": row["quantity"],
+        "n_persons": row["n_persons"],
+        "required_count": row["required_count"],
+        "covered_count": row["covered_count"],
+        "status": "met" if row["covered_count"] >= row["required_count"] else "short",
+    }
+
+
+def _checklist_query(trip_ids, user_id):
+    """(_CHECKLIST_SQL for the selected trips, params); see get_trip_requirement_summaries."""
+    if trip_ids is None and user_id is None:
+        raise ValueError("trip_ids or user_id required")
+    conditions = []
+    params = {"uid": user_id}
+    if trip_ids is not None:
+        conditions.append("t.id = ANY(%(ids)s)")
+        params["ids"] = list(trip_ids)
+    if user_id is not None:
+        conditions.append(_VISIBLE_TO_USER_SQL if trip_ids is not None else _MEMBER_OF_SQL)
+    return _CHECKLIST_SQL.format(where=" AND ".join(conditions)), params
+
+
+def get_trip_requirement_summaries(trip_ids=None, user_id=None):
+    """Checklists for many trips in one query: {trip_id: [item, ...]} in get_trip_requirement_summary's
+    shape; trips that don't exist are left out. With user_id, only trips the user can see (creator,
+    collaborator or pending invitee); with trip_ids None, all trips the user is creator or collaborator on."""
+    sql, params = _checklist_query(trip_ids, user_id)
+    with get_cursor() as cur:
+        cur.execute(sql, params)
+        rows = cur.fetchall()
+    out = {}
+    for row in rows:
+        items = out.setdefault(row["trip_id"], [])
+        if row["requirement_type_id"] is not None:
+            items.append(_checklist_row(row))
+    return out
 
 
 def get_trip_requirement_summary(trip_id):
     """For the trip's activity, return list of requirement rows with required_count, covered_count, status.
     Each row: requirement_type_id, requirement_key, requirement_display_name, rule, quantity, n_persons,
-    required_count, covered_count, status ('met' | 'short').
-    
-    NOTE: This function imports from trips module to avoid circular dependency issues.
-    """
-    # Import here to avoid circular dependency
-    from .trips import get_trip
-    from .trip_invites import list_trip_collaborators
-    
-    trip = get_trip(trip_id)
-    if not trip:
-        return None
-    activity_type = (trip.get("activity_type") or "").strip()
-    if not activity_type:
-        return []
-    reqs = list_activity_requirements(activity_type)
-    if not reqs:
-        return []
-
-    # Head count
-    collabs = list_trip_collaborators(trip_id)
-    num_people = len(collabs)
-
-    # Assigned gear for this trip, with requirement_type_id and capacity_persons
+    required_count, covered_count, status ('met' | 'short'). None if no trip; one query."""
+    return get_trip_requirement_summaries([trip_id]).get(trip_id)
+
+
+def list_trip_readiness(user_id, trip_ids=None):
+    """Checklist totals for the user's trips (as get_trip_requirement_summaries selects them) in one query:
+    {trip_id: {requirements, met, short, ready, assigned_weight_oz}}. ready is True when nothing is
+    short; assigned_weight_oz sums weight_oz x quantity of the trip's assigned gear (items without a
+    weight count as 0)."""
+    sql, params = _checklist_query(trip_ids, user_id)
     with get_cursor() as cur:
         cur.execute(
-            """SELECT g.id, g.requirement_type_id, g.capacity_persons
-               FROM trip_gear tg
-               JOIN gear g ON g.id = tg.gear_id
-               WHERE tg.trip_id = %s""",
-            (trip_id,),
+            """SELECT ck.trip_id,
+                      COUNT(ck.requirement_type_id)::int AS requirements,
+                      COUNT(*) FILTER (WHERE ck.requirement_type_id IS NOT NULL
+                                         AND ck.covered_count >= ck.required_count)::int AS met,
+                      MAX(ck.assigned_weight_oz) AS assigned_weight_oz
+               FROM (""" + sql + """) ck
+               GROUP BY ck.trip_id""",
+            params,
         )
-        assigned = cur.fetchall()
-
-    # Group assigned gear by requirement_type_id
-    by_type = {}
-    for row in assigned:
-        rt_id = row.get("requirement_type_id")
-        if rt_id is not None:
-            by_type.setdefault(rt_id, []).append(row)
-
-    out = []
-    for ar in reqs:
-        rt_id = ar["requirement_type_id"]
-        rule = ar["rule"]
-        quantity = ar["quantity"]
-        n_persons = ar.get("n_persons")
-        required = _required_count_for_rule(rule, quantity, n_persons, num_people)
-        covered = _covered_count_for_type(by_type.get(rt_id, []))
-        status = "met" if covered >= required else "short"
-        out.append({
-            "requirement_type_id": rt_id,
-            "requirement_key": ar["requirement_key"],
-            "requirement_display_name": ar["requirement_display_name"],
-            "rule": rule,
-            "quantity": quantity,
-            "n_persons": n_persons,
-            "required_count": required,
-            "covered_count": covered,
-            "status": status,
-        })
-    return out
+        rows = cur.fetchall()
+    return {
+        row["trip_id"]: {
+            "requirements": row["requirements"],
+            "met": row["met"],
+            "short": row["requirements"] - row["met"],
+            "ready": row["met"] == row["requirements"],
+            "assigned_weight_oz": row["assigned_weight_oz"],
+        }
+        for row in rows
+    }
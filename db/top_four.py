@@ -5,47 +5,55 @@ Authors: Kim, Smith, Domst, and Snider
 Last updated: 3/13/26
 """
 from .connection import get_cursor
+from .legacy_images import has_image_sql
 from .trip_reports import get_trip_report_info_by_id
 
 
+_LIST_TOP_FOUR_SQL = """
+SELECT
+  ut.position,
+  ut.trip_report_info_id,
+  tri.hike_name,
+  tri.distance,
+  tri.elevation_gain,
+  tri.difficulty,
+  tri.source_url,
+  lr.latest_report_id,
+  ir.image_report_id
+FROM user_top_four_hikes ut
+JOIN trip_report_info tri ON tri.id = ut.trip_report_info_id
+LEFT JOIN LATERAL (
+  SELECT utr.id AS latest_report_id
+  FROM user_trip_reports utr
+  WHERE utr.user_id = %(user_id)s AND utr.trip_report_info_id = ut.trip_report_info_id
+  ORDER BY utr.updated_at DESC NULLS LAST, utr.created_at DESC
+  LIMIT 1
+) lr ON TRUE
+LEFT JOIN LATERAL (
+  SELECT utr.id AS image_report_id
+  FROM user_trip_reports utr
+  WHERE utr.user_id = %(user_id)s
+    AND utr.trip_report_info_id = ut.trip_report_info_id
+    AND {has_image}
+  ORDER BY utr.updated_at DESC NULLS LAST, utr.created_at DESC
+  LIMIT 1
+) ir ON TRUE
+WHERE ut.user_id = %(user_id)s
+ORDER BY ut.position
+"""
+
+
+def list_top_four_sql():
+    """_LIST_TOP_FOUR_SQL with its image check (which also counts pre-015 BYTEA images; db.legacy_images)."""
+    return _LIST_TOP_FOUR_SQL.format(has_image=has_image_sql("user_trip_reports", "utr"))
+
+
 def list_top_four_hikes(user_id):
     """Return list of up to 4 items: position, trip_report_info_id, hike_name, etc. from trip_report_info.
     Also includes latest_report_id and image_report_id (latest trip report with uploaded image) for thumbnails.
-    Positions 1-4; missing positions are not in list."""
+    Positions 1-4; missing positions are not in list. Each lateral is a LIMIT 1 index scan (migration 016)."""
     with get_cursor() as cur:
-        cur.execute(
-            """SELECT
-                 ut.position,
-                 ut.trip_report_info_id,
-                 tri.hike_name,
-                 tri.distance,
-                 tri.elevation_gain,
-                 tri.difficulty,
-                 tri.source_url,
-                 lr.latest_report_id,
-                 ir.image_report_id
-               FROM user_top_four_hikes ut
-               JOIN trip_report_info tri ON tri.id = ut.trip_report_info_id
-               LEFT JOIN LATERAL (
-                 SELECT utr.id AS latest_report_id
-                 FROM user_trip_reports utr
-                 WHERE utr.user_id = %s AND utr.trip_report_info_id = ut.trip_report_info_id
-                 ORDER BY utr.updated_at DESC NULLS LAST, utr.created_at DESC
-                 LIMIT 1
-               ) lr ON TRUE
-               LEFT JOIN LATERAL (
-                 SELECT utr.id AS image_report_id
-                 FROM user_trip_reports utr
-                 WHERE utr.user_id = %s
-                   AND utr.trip_report_info_id = ut.trip_report_info_id
-                   AND utr.image IS NOT NULL
-                 ORDER BY utr.updated_at DESC NULLS LAST, utr.created_at DESC
-                 LIMIT 1
-               ) ir ON TRUE
-               WHERE ut.user_id = %s
-               ORDER BY ut.position""",
-            (user_id, user_id, user_id),
-        )
+        cur.execute(list_top_four_sql(), {"user_id": user_id})
         return cur.fetchall()
 
 
@@ -0,0 +1,76 @@
+"""
+TrailFeathers - Parse trip_report_info's free-text stats (distance, elevation, coordinates) into numbers.
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+Handles the formats scraped into LLM/*.csv, e.g. WTA "8.5 miles, roundtrip", "4.6 miles of trails",
+"2,000 feet" and Oregon Hikers "2.7 miles with optional 2 mile spur, Double loop", "1,420 feet",
+"45.49054". The first number in the text is used; km/m are converted to miles/feet. Unparseable or
+out-of-range values become None. Used at ingest (insert_trip_report_info) and by
+scripts/backfill_trail_stats.py so the read paths never parse strings.
+"""
+import re
+
+_QUANTITY = re.compile(
+    r"(?<![\d.])([-+]?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?|[-+]?\.\d+)\s*"
+    r"(kilomet(?:er|re)s?|km|miles?|mi|met(?:er|re)s?|m|feet|foot|ft|')?(?![a-z])",
+    re.IGNORECASE,
+)
+
+_MILES_PER_KM = 0.621371
+_FEET_PER_METER = 3.28084
+
+
+def _quantity(text):
+    """Return (value, unit or '') for the first number in text, or (None, '')."""
+    if text is None:
+        return None, ""
+    match = _QUANTITY.search(str(text))
+    if not match:
+        return None, ""
+    return float(match.group(1).replace(",", "")), (match.group(2) or "").lower()
+
+
+def parse_distance_miles(text):
+    """'8.5 miles, roundtrip' -> 8.5; '5 km' -> 3.11. None if no non-negative number."""
+    value, unit = _quantity(text)
+    if value is None or value < 0:
+        return None
+    if unit.startswith("k"):
+        value *= _MILES_PER_KM
+    return round(value, 2)
+
+
+def parse_feet(text):
+    """'2,000 feet' -> 2000; '1200 m' -> 3937. None if no number."""
+    value, unit = _quantity(text)
+    if value is None:
+        return None
+    if unit == "m" or unit.startswith("met"):
+        value *= _FEET_PER_METER
+    return int(round(value))
+
+
+def parse_coordinate(text, limit):
+    """'45.49054' -> 45.49054 if within +/-limit (90 for latitude, 180 for longitude), else None."""
+    try:
+        value = float(str(text).strip())
+    except (TypeError, ValueError):
+        return None
+    return value if -limit <= value <= limit else None
+
+
+def parse_trail_stats(distance, elevation_gain, highpoint, lat, lon):
+    """Return the typed trip_report_info columns for the given text values."""
+    latitude = parse_coordinate(lat, 90)
+    longitude = parse_coordinate(lon, 180)
+    if latitude is None or longitude is None:
+        latitude = longitude = None
+    return {
+        "distance_miles": parse_distance_miles(distance),
+        "elevation_gain_feet": parse_feet(elevation_gain),
+        "highpoint_feet": parse_feet(highpoint),
+        "latitude": latitude,
+        "longitude": longitude,
+    }
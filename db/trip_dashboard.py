@@ -0,0 +1,215 @@
+"""
+TrailFeathers - Trip dashboard aggregate: trip, members, invites, gear, checklist and location in two queries.
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+Replaces the ~12 sequential helper calls the dashboard used to make (get_trip, list_trip_collaborators,
+get_trip_gear_pool, get_trip_requirement_summary, ...). The shared part is the same for every member;
+the viewer part holds the fields that depend on who is looking (pending invite, invitable friends).
+Nested lists come back as JSON built with json_agg, in the same shapes the individual helpers return;
+the checklist uses the requirement rules from db.requirements (REQUIRED_COUNT_SQL) over trip_rollups.
+
+The shared part is cached server-side per trip (LocalCache, or Redis when REDIS_URL is set; TTL from
+TRIP_DASHBOARD_CACHE_TTL, default 30s). Every mutation in trips, trip_invites, trip_gear and gear calls
+invalidate_trip_dashboard(trip_id), which bumps a per-trip generation both immediately and after the
+request's transaction commits; entries built under an older generation are ignored, so a rebuild that
+raced with a write is never served. Without Redis each Gunicorn worker has its own cache and the TTL
+bounds how long another worker can serve a payload from before a write.
+"""
+import os
+
+from .cache import make_cache
+from .connection import after_commit, current_unit_of_work, get_cursor
+from .requirements import ACTIVITY_TYPE_TRIM, COVERED_COUNT_SQL, HEAD_COUNT_LATERAL_SQL, REQUIRED_COUNT_SQL
+
+_dashboard_cache = make_cache(
+    "trip_dashboard",
+    maxsize=512,
+    ttl=float(os.getenv("TRIP_DASHBOARD_CACHE_TTL", "30")),
+)
+
+_SHARED_SQL = """
+WITH trip AS (
+  SELECT t.id, t.trip_name, t.trail_name, t.activity_type, t.intended_start_date,
+         t.creator_id, t.trip_report_info_id, u.username AS creator_username, t.created_at, t.notes
+  FROM trips t
+  JOIN users u ON u.id = t.creator_id
+  WHERE t.id = %(trip_id)s
+),
+collab AS (
+  SELECT u.id, u.username, tc.role, tc.added_at
+  FROM trip_collaborators tc
+  JOIN users u ON u.id = tc.user_id
+  WHERE tc.trip_id = %(trip_id)s
+),
+reqs AS (
+  SELECT ar.requirement_type_id, ar.rule, ar.quantity, ar.n_persons,
+         rt.key AS requirement_key, rt.display_name AS requirement_display_name
+  FROM trip
+  JOIN activity_requirements ar ON ar.activity_type = btrim(trip.activity_type, """ + ACTIVITY_TYPE_TRIM + """)
+  JOIN requirement_types rt ON rt.id = ar.requirement_type_id
+),
+checklist AS (
+  SELECT r.*,
+         """ + REQUIRED_COUNT_SQL + """ AS required_count,
+         """ + COVERED_COUNT_SQL + """ AS covered_count
+  FROM reqs r
+  LEFT JOIN trip_rollups tr ON tr.trip_id = %(trip_id)s
+  """ + HEAD_COUNT_LATERAL_SQL + """
+)
+SELECT trip.*,
+  (SELECT COALESCE(json_agg(json_build_object('id', c.id, 'username', c.username, 'role', c.role)
+                            ORDER BY c.role = 'creator' DESC, c.added_at ASC), '[]'::json)
+   FROM collab c) AS collaborators,
+  (SELECT COALESCE(json_agg(json_build_object(
+             'id', ti.id, 'invitee_id', ti.invitee_id, 'created_at', ti.created_at,
+             'invitee_username', ue.username, 'inviter_username', ui.username)
+           ORDER BY ti.created_at DESC), '[]'::json)
+   FROM trip_invites ti
+   JOIN users ue ON ue.id = ti.invitee_id
+   JOIN users ui ON ui.id = ti.inviter_id
+   WHERE ti.trip_id = %(trip_id)s AND ti.status = 'pending') AS pending_invites,
+  (SELECT COALESCE(json_agg(json_build_object(
+             'id', g.id, 'user_id', g.user_id, 'type', g.type, 'name', g.name, 'capacity', g.capacity,
+             'weight_oz', g.weight_oz::float8, 'brand', g.brand, 'condition', g.condition, 'notes', g.notes,
+             'requirement_type_id', g.requirement_type_id, 'capacity_persons', g.capacity_persons,
+             'requirement_key', rt.key, 'requirement_display_name', rt.display_name,
+             'owner_username', u.username, 'is_assigned', tg.gear_id IS NOT NULL)
+           ORDER BY u.username, g.type, g.name), '[]'::json)
+   FROM trip_collaborators tc
+   JOIN users u ON u.id = tc.user_id
+   JOIN gear g ON g.user_id = tc.user_id
+   LEFT JOIN requirement_types rt ON rt.id = g.requirement_type_id
+   LEFT JOIN trip_gear tg ON tg.trip_id = %(trip_id)s AND tg.gear_id = g.id
+   WHERE tc.trip_id = %(trip_id)s) AS gear_pool,
+  (SELECT COALESCE(json_agg(json_build_object(
+             'id', g.id, 'type', g.type, 'name', g.name, 'capacity', g.capacity,
+             'weight_oz', g.weight_oz::float8, 'brand', g.brand, 'condition', g.condition,
+             'requirement_type_id', g.requirement_type_id, 'capacity_persons', g.capacity_persons,
+             'requirement_key', rt.key, 'requirement_display_name', rt.display_name,
+             'quantity', tg.quantity, 'owner_username', u.username,
+             'assigned_to_user_id', tg.assigned_to_user_id)
+           ORDER BY g.type, g.name), '[]'::json)
+   FROM trip_gear tg
+   JOIN gear g ON g.id = tg.gear_id
+   LEFT JOIN requirement_types rt ON rt.id = g.requirement_type_id
+   JOIN users u ON u.id = g.user_id
+   WHERE tg.trip_id = %(trip_id)s) AS assigned_gear,
+  (SELECT COALESCE(json_agg(json_build_object(
+             'requirement_type_id', ck.requirement_type_id, 'requirement_key', ck.requirement_key,
+             'requirement_display_name', ck.requirement_display_name, 'rule', ck.rule,
+             'quantity', ck.quantity, 'n_persons', ck.n_persons,
+             'required_count', ck.required_count, 'covered_count', ck.covered_count,
+             'status', CASE WHEN ck.covered_count >= ck.required_count THEN 'met' ELSE 'short' END)
+           ORDER BY ck.requirement_display_name, ck.requirement_type_id), '[]'::json)
+   FROM checklist ck) AS checklist,
+  (SELECT row_to_json(loc) FROM (
+     SELECT tri.id, tri.hike_name, tri.summarized_description, tri.source_url,
+            tri.distance, tri.elevation_gain, tri.highpoint, tri.difficulty,
+            tri.trip_report_1, tri.trip_report_2, tri.lat, tri.long,
+            tri.distance_miles, tri.elevation_gain_feet, tri.highpoint_feet, tri.latitude, tri.longitude
+     FROM trip_report_info tri
+     WHERE tri.id = trip.trip_report_info_id
+   ) loc) AS trip_report_info
+FROM trip
+"""
+
+_VIEWER_SQL = """
+SELECT
+  (SELECT row_to_json(inv) FROM (
+     SELECT ti.id, ti.trip_id, ti.created_at, t.trip_name, u.username AS inviter_username
+     FROM trip_invites ti
+     JOIN trips t ON t.id = ti.trip_id
+     JOIN users u ON u.id = ti.inviter_id
+     WHERE ti.trip_id = %(trip_id)s AND ti.invitee_id = %(viewer_id)s AND ti.status = 'pending'
+     ORDER BY ti.created_at DESC
+     LIMIT 1
+   ) inv) AS pending_invite,
+  (SELECT COALESCE(json_agg(json_build_object('id', u.id, 'username', u.username)), '[]'::json)
+   FROM friend_requests fr
+   JOIN users u ON (u.id = fr.receiver_id AND fr.sender_id = %(viewer_id)s)
+              OR (u.id = fr.sender_id AND fr.receiver_id = %(viewer_id)s)
+   WHERE fr.status = 'accepted'
+     AND (fr.sender_id = %(viewer_id)s OR fr.receiver_id = %(viewer_id)s)
+     AND EXISTS (SELECT 1 FROM trips t WHERE t.id = %(trip_id)s AND t.creator_id = %(viewer_id)s)
+     AND NOT EXISTS (SELECT 1 FROM trip_collaborators tc WHERE tc.trip_id = %(trip_id)s AND tc.user_id = u.id)
+     AND NOT EXISTS (SELECT 1 FROM trip_invites ti
+                     WHERE ti.trip_id = %(trip_id)s AND ti.invitee_id = u.id AND ti.status = 'pending')
+  ) AS friends
+"""
+
+
+def _get_trip_dashboard_shared(cur, trip_id):
+    cur.execute(_SHARED_SQL, {"trip_id": trip_id})
+    row = cur.fetchone()
+    return dict(row) if row else None
+
+
+def _get_trip_dashboard_viewer(cur, trip_id, viewer_id):
+    cur.execute(_VIEWER_SQL, {"trip_id": trip_id, "viewer_id": viewer_id})
+    return dict(cur.fetchone())
+
+
+def get_trip_dashboard_shared(trip_id):
+    """Return the viewer-independent dashboard data for a trip in one query, or None if no trip.
+    Keys: trip columns (as get_trip), collaborators, pending_invites, gear_pool, assigned_gear,
+    checklist (as get_trip_requirement_summary), trip_report_info (as get_trip_report_info_for_trip or None)."""
+    with get_cursor() as cur:
+        return _get_trip_dashboard_shared(cur, trip_id)
+
+
+def get_trip_dashboard_viewer(trip_id, viewer_id):
+    """Return the viewer-dependent dashboard data in one query: pending_invite (viewer's pending invite
+    to this trip or None) and friends (viewer's friends who can still be invited; empty unless creator)."""
+    with get_cursor() as cur:
+        return _get_trip_dashboard_viewer(cur, trip_id, viewer_id)
+
+
+def get_trip_dashboard_data(trip_id, viewer_id):
+    """Return shared and viewer dashboard data merged into one dict (two round trips), or None if no trip."""
+    with get_cursor() as cur:
+        shared = _get_trip_dashboard_shared(cur, trip_id)
+        if shared is None:
+            return None
+        shared.update(_get_trip_dashboard_viewer(cur, trip_id, viewer_id))
+        return shared
+
+
+def _bump_generation(trip_id):
+    _dashboard_cache.incr(f"gen:{trip_id}")
+    _dashboard_cache.delete(f"shared:{trip_id}")
+
+
+def invalidate_trip_dashboard(trip_id):
+    """Drop the cached shared dashboard for trip_id for every viewer. Call after any write that changes it."""
+    if trip_id is None:
+        return
+    _bump_generation(trip_id)
+    if current_unit_of_work() is not None:
+        # Also after commit, so a rebuild that read pre-commit data in another request is discarded
+        after_commit(lambda: _bump_generation(trip_id))
+
+
+def invalidate_trip_dashboards_for_user(user_id):
+    """Invalidate dashboards of every trip user_id belongs to (their gear is in those gear pools)."""
+    with get_cursor() as cur:
+        cur.execute("SELECT trip_id FROM trip_collaborators WHERE user_id = %s", (user_id,))
+        trip_ids = [row["trip_id"] for row in cur.fetchall()]
+    for trip_id in trip_ids:
+        invalidate_trip_dashboard(trip_id)
+
+
+def get_cached_trip_dashboard_shared(trip_id, build):
+    """Return the cached shared dashboard payload for trip_id, calling build() on a miss.
+    build() must return a JSON-serializable dict, or None (not cached) if the trip does not exist."""
+    generation, cached = _dashboard_cache.get_many([f"gen:{trip_id}", f"shared:{trip_id}"])
+    generation = generation or 0
+    if cached is not None and cached.get("gen") == generation:
+        return cached["data"]
+    data = build()
+    unit = current_unit_of_work()
+    if data is not None and not (unit is not None and (unit.failed or unit.has_pending_after_commit)):
+        # Payloads read inside a transaction with uncommitted writes are not shared
+        _dashboard_cache.set(f"shared:{trip_id}", {"gen": generation, "data": data})
+    return data
@@ -1,10 +1,11 @@
 """
-TrailFeathers - Trip gear assignment: gear pool, assigned gear, assign, unassign; used by trip dashboard routes.
+TrailFeathers - Trip gear assignment: gear pool, assigned gear, assign and unassign (one or many); used by trip dashboard routes.
 Group: TrailFeathers
 Authors: Kim, Smith, Domst, and Snider
 Last updated: 3/13/26
 """
 from .connection import get_cursor
+from .trip_dashboard import invalidate_trip_dashboard
 
 
 def get_trip_gear_pool(trip_id):
@@ -68,6 +69,7 @@ def assign_gear_to_trip(trip_id, gear_id):
                ON CONFLICT (trip_id, gear_id) DO NOTHING""",
             (trip_id, gear_id, owner_id),
         )
+    invalidate_trip_dashboard(trip_id)
 
 
 def unassign_gear_from_trip(trip_id, gear_id):
@@ -77,3 +79,60 @@ def unassign_gear_from_trip(trip_id, gear_id):
             "DELETE FROM trip_gear WHERE trip_id = %s AND gear_id = %s",
             (trip_id, gear_id),
         )
+    invalidate_trip_dashboard(trip_id)
+
+
+def assign_gear_to_trip_many(trip_id, assignments):
+    """Assign several pieces of gear in one transaction. assignments: [(gear_id, carrier_user_id or None)];
+    None means the owner carries it. Every owner and carrier must be a trip collaborator: one query checks
+    them all, then one INSERT ... SELECT FROM unnest adds the rows (already assigned gear is left as is).
+    Returns the gear ids actually inserted."""
+    carriers = {}
+    for gear_id, carrier_id in assignments:
+        carriers.setdefault(gear_id, carrier_id)  # first mention wins
+    if not carriers:
+        return []
+    params = {"trip_id": trip_id, "gear_ids": list(carriers), "carrier_ids": list(carriers.values())}
+    with get_cursor() as cur:
+        cur.execute(
+            """SELECT r.gear_id
+               FROM unnest(%(gear_ids)s::bigint[], %(carrier_ids)s::bigint[]) AS r(gear_id, carrier_id)
+               LEFT JOIN gear g ON g.id = r.gear_id
+               LEFT JOIN trip_collaborators o ON o.trip_id = %(trip_id)s AND o.user_id = g.user_id
+               LEFT JOIN trip_collaborators c ON c.trip_id = %(trip_id)s AND c.user_id = r.carrier_id
+               WHERE o.user_id IS NULL OR (r.carrier_id IS NOT NULL AND c.user_id IS NULL)
+               ORDER BY r.gear_id""",
+            params,
+        )
+        invalid = [row["gear_id"] for row in cur.fetchall()]
+        if invalid:
+            raise ValueError(
+                "Gear not found, or owner or carrier not in trip: " + ", ".join(str(i) for i in invalid)
+            )
+        cur.execute(
+            """INSERT INTO trip_gear (trip_id, gear_id, assigned_to_user_id, quantity)
+               SELECT %(trip_id)s, r.gear_id, COALESCE(r.carrier_id, g.user_id), 1
+               FROM unnest(%(gear_ids)s::bigint[], %(carrier_ids)s::bigint[]) AS r(gear_id, carrier_id)
+               JOIN gear g ON g.id = r.gear_id
+               ON CONFLICT (trip_id, gear_id) DO NOTHING
+               RETURNING gear_id""",
+            params,
+        )
+        inserted = [row["gear_id"] for row in cur.fetchall()]
+    invalidate_trip_dashboard(trip_id)
+    return inserted
+
+
+def unassign_gear_from_trip_many(trip_id, gear_ids):
+    """Remove several gear assignments in one statement. Returns the gear ids actually removed."""
+    gear_ids = list(dict.fromkeys(gear_ids))
+    if not gear_ids:
+        return []
+    with get_cursor() as cur:
+        cur.execute(
+            "DELETE FROM trip_gear WHERE trip_id = %s AND gear_id = ANY(%s) RETURNING gear_id",
+            (trip_id, gear_ids),
+        )
+        removed = [row["gear_id"] for row in cur.fetchall()]
+    invalidate_trip_dashboard(trip_id)
+    return removed
@@ -5,6 +5,7 @@ Authors: Kim, Smith, Domst, and Snider
 Last updated: 3/13/26
 """
 from .connection import get_cursor
+from .trip_dashboard import invalidate_trip_dashboard
 
 
 def create_trip_invite(trip_id, inviter_id, invitee_id):
@@ -29,7 +30,9 @@ def create_trip_invite(trip_id, inviter_id, invitee_id):
                VALUES (%s, %s, %s, 'pending') RETURNING id""",
             (trip_id, inviter_id, invitee_id),
         )
-        return cur.fetchone()["id"]
+        invite_id = cur.fetchone()["id"]
+    invalidate_trip_dashboard(trip_id)
+    return invite_id
 
 
 def list_trip_invites_pending(trip_id):
@@ -75,7 +78,8 @@ def has_pending_invite_to_trip(user_id, trip_id):
 
 
 def accept_trip_invite(invite_id, user_id):
-    """Invitee accepts: add to trip_collaborators, set invite status accepted. Returns True if updated."""
+    """Invitee accepts: add to trip_collaborators, set invite status accepted. Returns the trip id if
+    accepted, else None."""
     with get_cursor() as cur:
         cur.execute(
             "SELECT trip_id, invitee_id FROM trip_invites WHERE id = %s AND status = 'pending'",
@@ -83,7 +87,7 @@ def accept_trip_invite(invite_id, user_id):
         )
         row = cur.fetchone()
         if not row or row["invitee_id"] != user_id:
-            return False
+            return None
         trip_id = row["trip_id"]
         cur.execute(
             "UPDATE trip_invites SET status = 'accepted' WHERE id = %s",
@@ -93,17 +97,22 @@ def accept_trip_invite(invite_id, user_id):
             "INSERT INTO trip_collaborators (trip_id, user_id, role) VALUES (%s, %s, 'member') ON CONFLICT (trip_id, user_id) DO NOTHING",
             (trip_id, user_id),
         )
-        return True
+    invalidate_trip_dashboard(trip_id)
+    return trip_id
 
 
 def decline_trip_invite(invite_id, user_id):
     """Invitee declines. Returns True if updated."""
     with get_cursor() as cur:
         cur.execute(
-            "UPDATE trip_invites SET status = 'declined' WHERE id = %s AND invitee_id = %s AND status = 'pending'",
+            "UPDATE trip_invites SET status = 'declined' WHERE id = %s AND invitee_id = %s AND status = 'pending' RETURNING trip_id",
             (invite_id, user_id),
         )
-        return cur.rowcount > 0
+        row = cur.fetchone()
+    if not row:
+        return False
+    invalidate_trip_dashboard(row["trip_id"])
+    return True
 
 
 def get_trip_id_for_invite(invite_id):
@@ -134,6 +143,7 @@ def remove_trip_collaborator(trip_id, user_id, removed_by_user_id):
         )
         if cur.rowcount == 0:
             raise ValueError("User is not a member of this trip.")
+    invalidate_trip_dashboard(trip_id)
 
 
 def cancel_trip_invite(invite_id, cancelled_by_user_id):
@@ -151,7 +161,10 @@ def cancel_trip_invite(invite_id, cancelled_by_user_id):
         if not row:
             return False
         cur.execute("DELETE FROM trip_invites WHERE id = %s", (invite_id,))
-        return cur.rowcount > 0
+        deleted = cur.rowcount > 0
+    if deleted:
+        invalidate_trip_dashboard(row["trip_id"])
+    return deleted
 
 
 # Helper function for trips module
@@ -1,14 +1,21 @@
 """
-TrailFeathers - Trip report catalog (trip_report_info): insert, list, get by id or trip; used by routes and LLM.
+TrailFeathers - Trip report catalog (trip_report_info): insert, list, search, get by id or trip; used by routes and LLM.
 Group: TrailFeathers
 Authors: Kim, Smith, Domst, and Snider
 Last updated: 3/13/26
 """
+import html
+import math
+import re
+
 from .connection import get_cursor
+from .trail_stats import parse_trail_stats
 
 
 def insert_trip_report_info(trip_id, info):
-    """Insert one trip_report_info row for an existing trip. Returns inserted id."""
+    """Insert one trip_report_info row for an existing trip, with the typed stat columns parsed from
+    the text ones (see db.trail_stats); search_vector is generated by the database (migration 018).
+    Returns inserted id."""
     summarized_description = (info.get("summarized_description") or "").strip()
     if not summarized_description:
         raise ValueError("summarized_description is required")
@@ -23,6 +30,7 @@ def insert_trip_report_info(trip_id, info):
     trip_report_2 = (info.get("trip_report_2") or "").strip() or None
     lat = (info.get("lat") or "").strip() or None
     long_value = (info.get("long") or "").strip() or None
+    stats = parse_trail_stats(distance, elevation_gain, highpoint, lat, long_value)
 
     with get_cursor() as cur:
         cur.execute(
@@ -38,9 +46,14 @@ def insert_trip_report_info(trip_id, info):
                     trip_report_1,
                     trip_report_2,
                     lat,
-                    long
+                    long,
+                    distance_miles,
+                    elevation_gain_feet,
+                    highpoint_feet,
+                    latitude,
+                    longitude
                 )
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
                 RETURNING id""",
             (
                 trip_id,
@@ -55,17 +68,23 @@ def insert_trip_report_info(trip_id, info):
                 trip_report_2,
                 lat,
                 long_value,
+                stats["distance_miles"],
+                stats["elevation_gain_feet"],
+                stats["highpoint_feet"],
+                stats["latitude"],
+                stats["longitude"],
             ),
         )
-        row = cur.fetchone()
-        return row["id"]
+        return cur.fetchone()["id"]
 
 
 def list_trip_report_info_for_selection():
-    """Return all trip_report_info rows for location catalog: id, hike_name, distance, elevation_gain, difficulty. Ordered by hike_name."""
+    """Return all trip_report_info rows for location catalog: id, hike_name, distance, elevation_gain, difficulty,
+    plus parsed distance_miles/elevation_gain_feet. Ordered by hike_name."""
     with get_cursor() as cur:
         cur.execute(
-            """SELECT id, hike_name, distance, elevation_gain, difficulty, source_url
+            """SELECT id, hike_name, distance, elevation_gain, difficulty, source_url,
+                      distance_miles, elevation_gain_feet
                FROM trip_report_info
                WHERE (hike_name IS NOT NULL AND hike_name != '')
                ORDER BY hike_name""",
@@ -73,12 +92,249 @@ def list_trip_report_info_for_selection():
         return cur.fetchall()
 
 
+_LOCATION_COLUMNS = """id, hike_name, distance, elevation_gain, difficulty, source_url,
+                       distance_miles, elevation_gain_feet"""
+
+# sort name -> (SQL sort key, nullable). name sorts case-insensitively in byte order so the
+# (lower(hike_name) COLLATE "C", id) index serves both the prefix filter and the ordering.
+LOCATION_SORTS = {
+    "name": ('lower(hike_name) COLLATE "C"', False),
+    "distance": ("distance_miles", True),
+    "elevation": ("elevation_gain_feet", True),
+    "highpoint": ("highpoint_feet", True),
+}
+
+
+def _escape_like(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_trip_report_info(
+    name_prefix=None,
+    difficulties=None,
+    min_distance=None,
+    max_distance=None,
+    min_elevation=None,
+    max_elevation=None,
+    sort="name",
+    descending=False,
+    after=None,
+    limit=50,
+):
+    """Return one page of the location catalog and the keyset for the next page: (rows, next_after).
+
+    Filters: case-insensitive hike_name prefix, difficulty in difficulties, distance_miles and
+    elevation_gain_feet ranges (inclusive). sort is a LOCATION_SORTS key; ties break on id. Rows with
+    no value for a numeric sort key come last, ordered by id. after is the next_after of the previous
+    page ((sort value, id)); next_after is None on the last page. Rows carry sort_key."""
+    if sort not in LOCATION_SORTS:
+        raise ValueError(f"sort must be one of {', '.join(LOCATION_SORTS)}")
+    key, nullable = LOCATION_SORTS[sort]
+    where = ["hike_name IS NOT NULL", "hike_name <> ''"]
+    params = {"limit": limit + 1}
+    if name_prefix:
+        where.append('lower(hike_name) COLLATE "C" LIKE %(prefix)s')
+        params["prefix"] = _escape_like(name_prefix.lower()) + "%"
+    if difficulties:
+        where.append("difficulty = ANY(%(difficulties)s)")
+        params["difficulties"] = list(difficulties)
+    for column, low, high, name in (
+        ("distance_miles", min_distance, max_distance, "distance"),
+        ("elevation_gain_feet", min_elevation, max_elevation, "elevation"),
+    ):
+        if low is not None:
+            where.append(f"{column} >= %(min_{name})s")
+            params[f"min_{name}"] = low
+        if high is not None:
+            where.append(f"{column} <= %(max_{name})s")
+            params[f"max_{name}"] = high
+
+    after_value, after_id = after if after else (None, None)
+    in_null_tail = after is not None and nullable and after_value is None
+    rows = []
+    with get_cursor() as cur:
+        if not in_null_tail:
+            conds = list(where)
+            if nullable:
+                conds.append(f"{key} IS NOT NULL")
+            if after is not None:
+                conds.append(f"({key}, id) {'<' if descending else '>'} (%(after_value)s, %(after_id)s)")
+                params.update(after_value=after_value, after_id=after_id)
+            direction = "DESC" if descending else "ASC"
+            cur.execute(
+                f"""SELECT {_LOCATION_COLUMNS}, {key} AS sort_key
+                    FROM trip_report_info WHERE {' AND '.join(conds)}
+                    ORDER BY {key} {direction}, id {direction} LIMIT %(limit)s""",
+                params,
+            )
+            rows = cur.fetchall()
+        if nullable and len(rows) <= limit:
+            # Rows without a value for the sort key follow, by id
+            conds = where + [f"{key} IS NULL"]
+            if in_null_tail:
+                conds.append("id > %(after_id)s")
+                params["after_id"] = after_id
+            params["limit"] = limit + 1 - len(rows)
+            cur.execute(
+                f"""SELECT {_LOCATION_COLUMNS}, NULL AS sort_key
+                    FROM trip_report_info WHERE {' AND '.join(conds)}
+                    ORDER BY id LIMIT %(limit)s""",
+                params,
+            )
+            rows = list(rows) + list(cur.fetchall())
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1]["sort_key"], rows[-1]["id"])
+
+
+# ts_headline markers: private-use characters that can't occur in scraped text, swapped for <mark>
+# after the rest of the snippet is HTML-escaped.
+_MARK_START = "\ue000"
+_MARK_STOP = "\ue001"
+_HEADLINE_OPTIONS = (
+    f"StartSel={_MARK_START}, StopSel={_MARK_STOP}, MaxWords=30, MinWords=12, MaxFragments=2, "
+    "FragmentDelimiter=\" ... \""
+)
+
+
+def _highlight_html(text):
+    """HTML-escape a ts_headline result and turn its match markers into <mark> tags."""
+    if not text:
+        return ""
+    return html.escape(text).replace(_MARK_START, "<mark>").replace(_MARK_STOP, "</mark>")
+
+
+def _prefix_tsquery(query):
+    """'mari lak' -> 'mari:* & lak:*' (every word as a prefix), or None if the query has no words."""
+    words = re.findall(r"\w+", query.lower())
+    return " & ".join(f"{w}:*" for w in words) if words else None
+
+
+def search_trip_report_info_text(query, limit=20):
+    """Ranked free-text search over hike names, summaries and trip reports.
+
+    A row matches if its search_vector matches the query as web-search syntax ("quoted phrases",
+    -excluded, or) or with every word as a prefix (for search-as-you-type), or if the query is
+    trigram-similar to a word sequence in hike_name (typos, e.g. "mrion lake"). Ranked by text rank
+    plus name similarity, name-prefix matches first. Rows carry rank and HTML-safe hike_name_highlight
+    and snippet (matches wrapped in <mark>)."""
+    query = (query or "").strip()
+    if not query:
+        raise ValueError("q is required")
+    params = {"q": query, "raw": query.lower(), "prefix": _prefix_tsquery(query), "limit": limit,
+              "name_prefix": _escape_like(query.lower()) + "%", "options": _HEADLINE_OPTIONS}
+    with get_cursor() as cur:
+        cur.execute(
+            f"""WITH q AS (
+                    SELECT websearch_to_tsquery('english', %(q)s)
+                           || coalesce(to_tsquery('english', %(prefix)s), ''::tsquery) AS tsq
+                ),
+                hits AS (
+                    SELECT t.id, ts_rank_cd(t.search_vector, q.tsq) AS text_rank,
+                           word_similarity(%(raw)s, lower(t.hike_name)) AS name_similarity,
+                           lower(t.hike_name) LIKE %(name_prefix)s AS name_prefix
+                    FROM trip_report_info t, q
+                    WHERE t.hike_name IS NOT NULL AND t.hike_name <> ''
+                      AND (t.search_vector @@ q.tsq OR %(raw)s <%% lower(t.hike_name))
+                    ORDER BY name_prefix DESC, text_rank + name_similarity DESC, t.id
+                    LIMIT %(limit)s
+                )
+                SELECT {_LOCATION_COLUMNS}, h.text_rank + h.name_similarity AS rank,
+                       ts_headline('english', t.hike_name, q.tsq, %(options)s) AS hike_name_highlight,
+                       ts_headline('english', t.summarized_description, q.tsq, %(options)s) AS snippet
+                FROM hits h JOIN trip_report_info t USING (id), q
+                ORDER BY h.name_prefix DESC, rank DESC, t.id""",
+            params,
+        )
+        rows = cur.fetchall()
+    for r in rows:
+        r["hike_name_highlight"] = _highlight_html(r["hike_name_highlight"])
+        r["snippet"] = _highlight_html(r["snippet"])
+    return rows
+
+
+# Geo queries use the GiST index on point(longitude, latitude) from migration 013 (core Postgres,
+# no PostGIS): <-> orders by planar distance in degrees, <@ tests a box.
+_GEO_POINT = "point(longitude, latitude)"
+_HAS_GEO = "latitude IS NOT NULL AND longitude IS NOT NULL"
+_EARTH_RADIUS_MILES = 3958.8
+
+
+def _check_coordinates(lat, lon):
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError("lat must be between -90 and 90 and lon between -180 and 180")
+
+
+def haversine_miles(lat1, lon1, lat2, lon2):
+    """Great-circle distance in miles between two lat/lon points."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * _EARTH_RADIUS_MILES * math.asin(min(1.0, math.sqrt(a)))
+
+
+def nearest_trip_report_info(lat, lon, k=10, exclude_id=None):
+    """Return the k catalog hikes closest to lat/lon, nearest first, each with miles_away.
+
+    The index walk orders by distance in degrees, which overweights east-west separation away from
+    the equator, so a few times k candidates are read and re-ranked by great-circle distance.
+    exclude_id leaves out one row (e.g. the trip's own hike)."""
+    _check_coordinates(lat, lon)
+    conds = [_HAS_GEO, "hike_name IS NOT NULL", "hike_name <> ''"]
+    params = {"lat": lat, "lon": lon, "candidates": max(3 * k, k + 25)}
+    if exclude_id is not None:
+        conds.append("id <> %(exclude_id)s")
+        params["exclude_id"] = exclude_id
+    with get_cursor() as cur:
+        cur.execute(
+            f"""SELECT {_LOCATION_COLUMNS}, latitude, longitude
+                FROM trip_report_info WHERE {' AND '.join(conds)}
+                ORDER BY {_GEO_POINT} <-> point(%(lon)s, %(lat)s)
+                LIMIT %(candidates)s""",
+            params,
+        )
+        rows = cur.fetchall()
+    for r in rows:
+        r["miles_away"] = round(haversine_miles(lat, lon, r["latitude"], r["longitude"]), 2)
+    rows.sort(key=lambda r: (r["miles_away"], r["id"]))
+    return rows[:k]
+
+
+def list_trip_report_info_in_box(south, west, north, east, limit=500):
+    """Return catalog hikes inside a map viewport and whether more matched: (rows, truncated).
+    west > east means the box crosses the antimeridian. At most limit rows, by id."""
+    _check_coordinates(south, west)
+    _check_coordinates(north, east)
+    if south > north:
+        raise ValueError("south must not be greater than north")
+    params = {"south": south, "west": west, "north": north, "east": east, "limit": limit + 1}
+    box = f"{_GEO_POINT} <@ box(point(%(west)s, %(south)s), point(%(east)s, %(north)s))"
+    if west > east:
+        box = (
+            f"({_GEO_POINT} <@ box(point(%(west)s, %(south)s), point(180, %(north)s))"
+            f" OR {_GEO_POINT} <@ box(point(-180, %(south)s), point(%(east)s, %(north)s)))"
+        )
+    with get_cursor() as cur:
+        cur.execute(
+            f"""SELECT {_LOCATION_COLUMNS}, latitude, longitude
+                FROM trip_report_info
+                WHERE {_HAS_GEO} AND hike_name IS NOT NULL AND hike_name <> '' AND {box}
+                ORDER BY id LIMIT %(limit)s""",
+            params,
+        )
+        rows = cur.fetchall()
+    return rows[:limit], len(rows) > limit
+
+
 def get_trip_report_info_by_id(info_id):
     """Return one trip_report_info row by id, or None."""
     with get_cursor() as cur:
         cur.execute(
             """SELECT id, hike_name, summarized_description, source_url, distance,
-                      elevation_gain, highpoint, difficulty, trip_report_1, trip_report_2, lat, long
+                      elevation_gain, highpoint, difficulty, trip_report_1, trip_report_2, lat, long,
+                      distance_miles, elevation_gain_feet, highpoint_feet, latitude, longitude
                FROM trip_report_info WHERE id = %s""",
             (info_id,),
         )
@@ -91,7 +347,8 @@ def get_trip_report_info_for_trip(trip_id):
         cur.execute(
             """SELECT tri.id, tri.hike_name, tri.summarized_description, tri.source_url,
                       tri.distance, tri.elevation_gain, tri.highpoint, tri.difficulty,
-                      tri.trip_report_1, tri.trip_report_2, tri.lat, tri.long
+                      tri.trip_report_1, tri.trip_report_2, tri.lat, tri.long,
+                      tri.distance_miles, tri.elevation_gain_feet, tri.highpoint_feet, tri.latitude, tri.longitude
                FROM trips t
                JOIN trip_report_info tri ON tri.id = t.trip_report_info_id
                WHERE t.id = %s""",
@@ -0,0 +1,57 @@
+"""
+TrailFeathers - Per-trip rollups (migration 017): rebuild and consistency check.
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+trip_rollups keeps each trip's head count, gear coverage per requirement type and pack weights, updated
+by triggers on trip_gear, trip_collaborators and gear, so checklists (db.requirements) and the trip
+dashboard read one row per trip instead of aggregating the live tables. trip_rollups_live computes the
+same from scratch; rebuild and check compare against it. scripts/trip_rollups.py runs both.
+"""
+from .connection import get_cursor
+
+
+def rebuild_trip_rollups(batch=500):
+    """Recompute every trip's rollup from the live tables, batch trips per transaction. Returns the
+    number of trips processed."""
+    done = 0
+    last_id = 0
+    while True:
+        with get_cursor() as cur:
+            cur.execute("SELECT id FROM trips WHERE id > %s ORDER BY id LIMIT %s", (last_id, batch))
+            ids = [row["id"] for row in cur.fetchall()]
+            if not ids:
+                return done
+            cur.execute("SELECT refresh_trip_rollups(%s::bigint[])", (ids,))
+        done += len(ids)
+        last_id = ids[-1]
+
+
+def check_trip_rollups(limit=100):
+    """Return up to limit trips whose stored rollup differs from trip_rollups_live (missing rows count as
+    zeros), each with stored and live values: trip_id, head_count, live_head_count, coverage,
+    live_coverage, member_weight_oz, live_member_weight_oz, total_weight_oz, live_total_weight_oz."""
+    with get_cursor() as cur:
+        cur.execute(
+            """SELECT l.trip_id,
+                      r.head_count, l.head_count AS live_head_count,
+                      r.coverage, l.coverage AS live_coverage,
+                      r.member_weight_oz, l.member_weight_oz AS live_member_weight_oz,
+                      r.total_weight_oz::float8, l.total_weight_oz::float8 AS live_total_weight_oz
+               FROM trip_rollups_live l
+               LEFT JOIN trip_rollups r ON r.trip_id = l.trip_id
+               WHERE (COALESCE(r.head_count, 0), COALESCE(r.coverage, '{}'::jsonb),
+                      COALESCE(r.member_weight_oz, '{}'::jsonb), COALESCE(r.total_weight_oz, 0))
+                     IS DISTINCT FROM (l.head_count, l.coverage, l.member_weight_oz, l.total_weight_oz)
+               ORDER BY l.trip_id
+               LIMIT %s""",
+            (limit,),
+        )
+        return cur.fetchall()
+
+
+def repair_trip_rollups(trip_ids):
+    """Recompute the rollups of trip_ids (e.g. those check_trip_rollups reported)."""
+    with get_cursor() as cur:
+        cur.execute("SELECT refresh_trip_rollups(%s::bigint[])", (list(trip_ids),))
@@ -5,6 +5,7 @@ Authors: Kim, Smith, Domst, and Snider
 Last updated: 3/13/26
 """
 from .connection import get_cursor
+from .trip_dashboard import invalidate_trip_dashboard
 
 # Allowed activity_type values for trips (validated on create/update).
 ACTIVITY_TYPES = frozenset({
@@ -105,6 +106,7 @@ def update_trip(trip_id, user_id, payload):
         # Collaborator: only allow updating notes
         with get_cursor() as cur:
             cur.execute("""UPDATE trips SET notes = %s WHERE id = %s""", (notes, trip_id))
+        invalidate_trip_dashboard(trip_id)
         return
 
     # Creator: update all fields
@@ -138,6 +140,7 @@ def update_trip(trip_id, user_id, payload):
                WHERE id = %s""",
             (trip_name, trail_name, activity_type, intended_start_date, info_id, notes, trip_id),
         )
+    invalidate_trip_dashboard(trip_id)
 
 
 def delete_trip(trip_id, user_id):
@@ -149,6 +152,7 @@ def delete_trip(trip_id, user_id):
         raise ValueError("Only the trip creator can delete this trip.")
     with get_cursor() as cur:
         cur.execute("DELETE FROM trips WHERE id = %s", (trip_id,))
+    invalidate_trip_dashboard(trip_id)
 
 
 def user_has_trip_access(user_id, trip_id):
@@ -164,6 +168,35 @@ def user_has_trip_access(user_id, trip_id):
         return cur.fetchone() is not None
 
 
+def list_trip_weather_locations(user_id, trip_ids=None):
+    """Return id, intended_start_date, latitude, longitude (trip_report_info; None if no location) for the
+    given trips the user can see (creator, collaborator or pending invitee), in one query. With
+    trip_ids None, returns all trips the user is creator or collaborator on."""
+    with get_cursor() as cur:
+        if trip_ids is None:
+            cur.execute(
+                """SELECT t.id, t.intended_start_date, tri.latitude, tri.longitude
+                   FROM trips t
+                   LEFT JOIN trip_report_info tri ON tri.id = t.trip_report_info_id
+                   WHERE t.creator_id = %(uid)s
+                      OR EXISTS (SELECT 1 FROM trip_collaborators tc WHERE tc.trip_id = t.id AND tc.user_id = %(uid)s)""",
+                {"uid": user_id},
+            )
+        else:
+            cur.execute(
+                """SELECT t.id, t.intended_start_date, tri.latitude, tri.longitude
+                   FROM trips t
+                   LEFT JOIN trip_report_info tri ON tri.id = t.trip_report_info_id
+                   WHERE t.id = ANY(%(ids)s)
+                     AND (t.creator_id = %(uid)s
+                          OR EXISTS (SELECT 1 FROM trip_collaborators tc WHERE tc.trip_id = t.id AND tc.user_id = %(uid)s)
+                          OR EXISTS (SELECT 1 FROM trip_invites ti
+                                     WHERE ti.trip_id = t.id AND ti.invitee_id = %(uid)s AND ti.status = 'pending'))""",
+                {"uid": user_id, "ids": list(trip_ids)},
+            )
+        return cur.fetchall()
+
+
 def leave_trip(trip_id, user_id):
     """Remove the current user from a trip (disband). Only members can leave; creator must delete the trip."""
     trip = get_trip(trip_id)
@@ -178,6 +211,7 @@ def leave_trip(trip_id, user_id):
         )
         if cur.rowcount == 0:
             raise ValueError("You are not a member of this trip.")
+    invalidate_trip_dashboard(trip_id)
 
 
 def list_trip_collaborators(trip_id):
@@ -204,3 +238,4 @@ def add_trip_collaborator(trip_id, user_id, role="member"):
             """INSERT INTO trip_collaborators (trip_id, user_id, role) VALUES (%s, %s, %s)""",
             (trip_id, user_id, role),
         )
+    invalidate_trip_dashboard(trip_id)
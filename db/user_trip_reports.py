@@ -4,7 +4,11 @@ Group: TrailFeathers
 Authors: Kim, Smith, Domst, and Snider
 Last updated: 3/13/26
 """
-from .connection import get_cursor
+from .blob_gc import lock_blob, release_blob
+from .blobs import blob_size, blob_store
+from .connection import after_commit, get_cursor
+from .image_variants import schedule_variants
+from .legacy_images import has_image_sql, promote_legacy_image
 from .trip_reports import get_trip_report_info_by_id
 
 
@@ -24,60 +28,79 @@ def list_user_trip_reports(user_id):
 
 
 def get_user_trip_report(report_id, user_id=None):
-    """Return one trip report by id. If user_id given, only return if owner; else return any (for public view). Includes hike_name, image_uploaded."""
+    """Return one trip report by id. If user_id given, only return if owner; else return any (for public view). Includes hike_name, image_uploaded, image_hash."""
+    owner_sql = " AND utr.user_id = %s" if user_id is not None else ""
+    params = (report_id, user_id) if user_id is not None else (report_id,)
     with get_cursor() as cur:
-        if user_id is not None:
-            cur.execute(
-                """SELECT utr.id, utr.user_id, utr.trip_report_info_id, utr.title, utr.body, utr.date_hiked, utr.created_at, utr.updated_at,
-                          tri.hike_name,
-                          (utr.image IS NOT NULL) AS image_uploaded
-                   FROM user_trip_reports utr
-                   JOIN trip_report_info tri ON tri.id = utr.trip_report_info_id
-                   WHERE utr.id = %s AND utr.user_id = %s""",
-                (report_id, user_id),
-            )
-        else:
-            cur.execute(
-                """SELECT utr.id, utr.user_id, utr.trip_report_info_id, utr.title, utr.body, utr.date_hiked, utr.created_at, utr.updated_at,
-                          tri.hike_name,
-                          (utr.image IS NOT NULL) AS image_uploaded
-                   FROM user_trip_reports utr
-                   JOIN trip_report_info tri ON tri.id = utr.trip_report_info_id
-                   WHERE utr.id = %s""",
-                (report_id,),
-            )
+        cur.execute(
+            """SELECT utr.id, utr.user_id, utr.trip_report_info_id, utr.title, utr.body, utr.date_hiked, utr.created_at, utr.updated_at,
+                      tri.hike_name,
+                      utr.image_hash, """ + has_image_sql("user_trip_reports", "utr") + """ AS image_uploaded
+               FROM user_trip_reports utr
+               JOIN trip_report_info tri ON tri.id = utr.trip_report_info_id
+               WHERE utr.id = %s""" + owner_sql,
+            params,
+        )
         return cur.fetchone()
 
 
-def set_trip_report_image_upload(report_id, user_id, image_bytes, media_type):
-    """Store uploaded image for a trip report. Owner only. Max 5MB. Raises ValueError if not found or invalid."""
-    report = get_user_trip_report(report_id, user_id)
-    if not report:
+def user_owns_trip_report(report_id, user_id):
+    """True if report_id exists and belongs to user_id. Primary key lookup only (no join, no image data)."""
+    with get_cursor() as cur:
+        cur.execute("""SELECT 1 FROM user_trip_reports WHERE id = %s AND user_id = %s""", (report_id, user_id))
+        return cur.fetchone() is not None
+
+
+MAX_TRIP_REPORT_IMAGE_BYTES = 5 * 1024 * 1024
+
+
+def set_trip_report_image_upload(report_id, user_id, image, media_type):
+    """Store uploaded image for a trip report in the blob store and point the report at it; its
+    thumbnails are rendered in the background after commit, and the image it replaces is released
+    (db.blob_gc). image is bytes or a db.blobs.SpooledBlob.
+    Owner only. Max 5MB. Returns the blob key. Raises ValueError if not found or invalid."""
+    if not user_owns_trip_report(report_id, user_id):
         raise ValueError("Trip report not found.")
-    if not image_bytes or len(image_bytes) > 5 * 1024 * 1024:
+    if not 0 < blob_size(image) <= MAX_TRIP_REPORT_IMAGE_BYTES:
         raise ValueError("Image required and must be under 5MB.")
     mt = (media_type or "image/jpeg").strip().lower()
     if mt not in ("image/jpeg", "image/png", "image/gif", "image/webp"):
         raise ValueError("Allowed types: image/jpeg, image/png, image/gif, image/webp")
+    key = blob_store.put(image, mt)
     with get_cursor() as cur:
+        lock_blob(cur, key)
+        blob_store.put(image, mt)  # no-op unless a release of the same bytes deleted it meanwhile
         cur.execute(
-            """UPDATE user_trip_reports SET image = %s, image_media_type = %s, updated_at = NOW()
-               WHERE id = %s AND user_id = %s""",
-            (image_bytes, mt, report_id, user_id),
+            """UPDATE user_trip_reports utr SET image_hash = %s, image_media_type = %s, updated_at = NOW()
+               FROM (SELECT id, image_hash FROM user_trip_reports WHERE id = %s AND user_id = %s FOR UPDATE) old
+               WHERE utr.id = old.id
+               RETURNING old.image_hash AS old_hash""",
+            (key, mt, report_id, user_id),
         )
+        row = cur.fetchone()
+        if row is None:
+            raise ValueError("Trip report not found.")  # deleted since the check above
+    if row["old_hash"] != key:
+        release_blob(row["old_hash"])
+    after_commit(lambda: schedule_variants(key))
+    return key
 
 
 def get_trip_report_image_payload(report_id):
-    """Return dict with keys bytes, media_type if report has image; else None."""
+    """Return dict with keys hash (blob key), media_type if report has image; else None. A pre-015
+    BYTEA image is moved into the blob store first (db.legacy_images)."""
     with get_cursor() as cur:
         cur.execute(
-            """SELECT image, image_media_type FROM user_trip_reports WHERE id = %s AND image IS NOT NULL""",
+            """SELECT image_hash, image_media_type FROM user_trip_reports WHERE id = %s""",
             (report_id,),
         )
         row = cur.fetchone()
-        if not row or not row.get("image"):
-            return None
-        return {"bytes": row["image"], "media_type": row.get("image_media_type") or "image/jpeg"}
+    if not row:
+        return None
+    key = row["image_hash"] or promote_legacy_image("user_trip_reports", report_id)
+    if not key:
+        return None
+    return {"hash": key, "media_type": row.get("image_media_type") or "image/jpeg"}
 
 
 def create_user_trip_report(user_id, trip_report_info_id, title, body="", date_hiked=None):
@@ -100,8 +123,7 @@ def create_user_trip_report(user_id, trip_report_info_id, title, body="", date_h
 
 def update_user_trip_report(report_id, user_id, trip_report_info_id=None, title=None, body=None, date_hiked=None):
     """Update a trip report. Only owner. Optional fields: trip_report_info_id, title, body, date_hiked."""
-    report = get_user_trip_report(report_id, user_id)
-    if not report:
+    if not user_owns_trip_report(report_id, user_id):
         raise ValueError("Trip report not found.")
     updates = []
     params = []
@@ -135,11 +157,16 @@ def update_user_trip_report(report_id, user_id, trip_report_info_id=None, title=
 
 
 def delete_user_trip_report(report_id, user_id):
-    """Delete a trip report. Only owner. Raises ValueError if not found."""
-    report = get_user_trip_report(report_id, user_id)
-    if not report:
-        raise ValueError("Trip report not found.")
+    """Delete a trip report. Only owner. Its image blob is deleted after commit if nothing else uses it.
+    Raises ValueError if not found."""
     with get_cursor() as cur:
-        cur.execute("""DELETE FROM user_trip_reports WHERE id = %s AND user_id = %s""", (report_id, user_id))
+        cur.execute(
+            """DELETE FROM user_trip_reports WHERE id = %s AND user_id = %s RETURNING image_hash""",
+            (report_id, user_id),
+        )
+        row = cur.fetchone()
+        if row is None:
+            raise ValueError("Trip report not found.")
+    release_blob(row["image_hash"])
 
 
@@ -34,6 +34,12 @@ def create_user(username, password_hash):
         return cur.fetchone()
 
 
+def update_user_password_hash(user_id, password_hash):
+    """Replace a user's password hash (e.g. re-hashed at a new bcrypt cost)."""
+    with get_cursor() as cur:
+        cur.execute("UPDATE users SET password_hash = %s WHERE id = %s", (password_hash, user_id))
+
+
 def user_exists_by_username(username):
     """True if a user with this username exists."""
     with get_cursor() as cur:
@@ -0,0 +1,73 @@
+"""
+TrailFeathers - Cheap version stamps for conditional GETs (ETags); used by tf_server.conditional.
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+Shared tables (the hike catalog, requirement types) are versioned by a counter that a statement
+trigger bumps on every change (migration 014, table_versions). Per-user rows are versioned by their
+row count and newest row version (xmin, which Postgres changes on every insert and update); the count
+catches deletes. Each function is one small indexed query, far cheaper than building the payload.
+"""
+from .connection import get_cursor
+
+_CATALOG_VERSION_SQL = (
+    "(SELECT coalesce(max(version), 0) FROM table_versions WHERE table_name = 'trip_report_info')"
+)
+
+
+def _rows_version_sql(table):
+    return (
+        f"(SELECT count(*) || ':' || coalesce(max(xmin::text::bigint), 0) FROM {table} WHERE user_id = u.id)"
+    )
+
+
+def table_version(table_name):
+    """Return the change counter for a table in table_versions (0 if never recorded)."""
+    with get_cursor() as cur:
+        cur.execute("SELECT version FROM table_versions WHERE table_name = %s", (table_name,))
+        row = cur.fetchone()
+        return row["version"] if row else 0
+
+
+def wishlist_version(user_id):
+    """Version of a user's wishlist response: the wishlist rows plus the catalog they join."""
+    with get_cursor() as cur:
+        cur.execute(
+            f"""SELECT {_rows_version_sql('user_wishlist')} AS rows, {_CATALOG_VERSION_SQL} AS catalog
+                FROM users u WHERE u.id = %s""",
+            (user_id,),
+        )
+        row = cur.fetchone()
+        return (row["rows"], row["catalog"]) if row else None
+
+
+def favorites_version(user_id):
+    """Version of a user's favorite hikes response: the favorites rows plus the catalog they join."""
+    with get_cursor() as cur:
+        cur.execute(
+            f"""SELECT {_rows_version_sql('user_favorite_hikes')} AS rows, {_CATALOG_VERSION_SQL} AS catalog
+                FROM users u WHERE u.id = %s""",
+            (user_id,),
+        )
+        row = cur.fetchone()
+        return (row["rows"], row["catalog"]) if row else None
+
+
+def public_profile_version(username):
+    """Version of the public profile for username: profile, top four, trip reports and catalog.
+    None if there is no such user."""
+    with get_cursor() as cur:
+        cur.execute(
+            f"""SELECT u.id,
+                       (SELECT xmin::text FROM user_profiles WHERE user_id = u.id) AS profile,
+                       {_rows_version_sql('user_top_four_hikes')} AS top_four,
+                       {_rows_version_sql('user_trip_reports')} AS reports,
+                       {_CATALOG_VERSION_SQL} AS catalog
+                FROM users u WHERE u.username = %s""",
+            (username,),
+        )
+        row = cur.fetchone()
+        if not row:
+            return None
+        return (row["id"], row["profile"], row["top_four"], row["reports"], row["catalog"])
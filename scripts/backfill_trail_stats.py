@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+TrailFeathers - Backfill trip_report_info's typed stat columns (migration 010) from the text columns.
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+Usage: DATABASE_URL=... python scripts/backfill_trail_stats.py [--all] [--batch N]
+       python scripts/backfill_trail_stats.py --check-csv
+Parses distance/elevation_gain/highpoint/lat/long with db.trail_stats (the same parser
+insert_trip_report_info uses) and writes distance_miles, elevation_gain_feet, highpoint_feet,
+latitude, longitude in batches of N rows (default 500), one transaction per batch. By default only
+rows whose typed columns are all NULL are touched; --all re-parses every row. --check-csv needs no
+DB: it runs the parser over LLM/*.csv and reports any non-empty value it cannot parse.
+"""
+import csv
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from db import get_cursor, unit_of_work  # noqa: E402
+from db.trail_stats import parse_coordinate, parse_distance_miles, parse_feet, parse_trail_stats  # noqa: E402
+
+_CSV_COLUMNS = {
+    # column name (lowercased, "_1" suffix stripped) -> parser
+    "length": parse_distance_miles,
+    "elevation gain": parse_feet,
+    "highest point": parse_feet,
+    "latitude": lambda v: parse_coordinate(v, 90),
+    "longitude": lambda v: parse_coordinate(v, 180),
+}
+
+
+def check_csv():
+    failures = 0
+    for path in sorted((ROOT / "LLM").glob("*.csv")):
+        with open(path, newline="", encoding="utf-8", errors="replace") as f:
+            rows = list(csv.DictReader(f))
+        for column in rows[0].keys() if rows else ():
+            parser = _CSV_COLUMNS.get(column.lower().removesuffix("_1"))
+            if parser is None:
+                continue
+            bad = [r[column] for r in rows if (r[column] or "").strip() and parser(r[column]) is None]
+            parsed = sum(1 for r in rows if parser(r[column]) is not None)
+            failures += len(bad)
+            print(f"{path.name:<24} {column:<18} parsed={parsed:4d}/{len(rows)} unparsed={bad[:5]}")
+    return failures
+
+
+def backfill(reparse_all, batch):
+    where = "" if reparse_all else (
+        "WHERE distance_miles IS NULL AND elevation_gain_feet IS NULL AND highpoint_feet IS NULL"
+        " AND latitude IS NULL AND longitude IS NULL"
+    )
+    last_id = 0
+    updated = 0
+    while True:
+        with unit_of_work():
+            with get_cursor() as cur:
+                cur.execute(
+                    f"""SELECT id, distance, elevation_gain, highpoint, lat, long
+                        FROM trip_report_info
+                        {where + ' AND' if where else 'WHERE'} id > %s
+                        ORDER BY id LIMIT %s""",
+                    (last_id, batch),
+                )
+                rows = cur.fetchall()
+                if not rows:
+                    break
+                for r in rows:
+                    stats = parse_trail_stats(r["distance"], r["elevation_gain"], r["highpoint"], r["lat"], r["long"])
+                    cur.execute(
+                        """UPDATE trip_report_info
+                           SET distance_miles = %s, elevation_gain_feet = %s, highpoint_feet = %s,
+                               latitude = %s, longitude = %s
+                           WHERE id = %s""",
+                        (stats["distance_miles"], stats["elevation_gain_feet"], stats["highpoint_feet"],
+                         stats["latitude"], stats["longitude"], r["id"]),
+                    )
+                last_id = rows[-1]["id"]
+                updated += len(rows)
+        print(f"updated {updated} rows (through id {last_id})")
+    print(f"done: {updated} rows")
+
+
+def main():
+    args = sys.argv[1:]
+    if "--check-csv" in args:
+        raise SystemExit(1 if check_csv() else 0)
+    batch = int(args[args.index("--batch") + 1]) if "--batch" in args else 500
+    backfill("--all" in args, batch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+TrailFeathers - Benchmark the gear assignment planner on synthetic group trips.
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+Usage: python scripts/bench_gear_planner.py [members] [gear_items] [trips] [seed]
+e.g.   python scripts/bench_gear_planner.py 20 1000 50 1
+No database needed: builds dashboard payloads in memory (the shape of db.get_trip_dashboard_shared)
+with `members` collaborators owning `gear_items` pieces of gear over 10 requirement types (some items
+without a weight, a few already assigned) and per_person / per_group / per_N_persons checklist rows.
+For each trip runs tf_server.gear_planner.plan_gear with the default time budget and with none (greedy
+only), and compares total added weight and the heaviest pack with a naive plan: lightest listed weight
+first, each carried by its owner. Weights missing from the data are scored as the planner counts them. Checks that every plan meets what the pool can meet.
+"""
+import math
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tf_server.gear_planner import DEFAULT_TIME_BUDGET_MS, plan_gear  # noqa: E402
+
+_TYPES = 10
+_RULES = (("per_person", 1, None), ("per_group", 2, None), ("per_N_persons", 1, 2), ("per_N_persons", 1, 4))
+
+
+def _synthetic_trip(rng, members, gear_items):
+    collaborators = [{"id": m, "username": f"member{m}", "role": "member"} for m in range(1, members + 1)]
+    pool = []
+    for gear_id in range(1, gear_items + 1):
+        type_id = rng.randint(1, _TYPES)
+        capacity = rng.choice((None, None, 1, 2, 2, 3, 4))
+        per_person = rng.uniform(4, 40)
+        pool.append({
+            "id": gear_id,
+            "user_id": rng.randint(1, members),
+            "name": f"gear {gear_id}",
+            "requirement_type_id": type_id,
+            "capacity_persons": capacity,
+            "weight_oz": None if rng.random() < 0.05 else round(per_person * (capacity or 1) ** 0.8, 1),
+            "owner_username": None,
+            "is_assigned": rng.random() < 0.02,
+        })
+    assigned = [
+        {"assigned_to_user_id": g["user_id"], "weight_oz": g["weight_oz"], "quantity": 1,
+         "requirement_type_id": g["requirement_type_id"], "capacity_persons": g["capacity_persons"]}
+        for g in pool if g["is_assigned"]
+    ]
+    checklist = []
+    for type_id in range(1, _TYPES + 1):
+        rule, quantity, n_persons = rng.choice(_RULES)
+        if rule == "per_person":
+            required = quantity * members
+        elif rule == "per_group":
+            required = quantity
+        else:
+            required = quantity * math.ceil(members / n_persons)
+        covered = sum(a["capacity_persons"] or 1 for a in assigned if a["requirement_type_id"] == type_id)
+        checklist.append({"requirement_type_id": type_id, "requirement_display_name": f"type {type_id}",
+                          "required_count": required, "covered_count": covered})
+    return {"collaborators": collaborators, "gear_pool": pool, "assigned_gear": assigned, "checklist": checklist}
+
+
+def _scored_weights(dashboard):
+    """gear id -> weight as the planner counts it (no weight: heaviest known item of the type)."""
+    heaviest = {}
+    for g in dashboard["gear_pool"]:
+        if g["weight_oz"] is not None:
+            heaviest[g["requirement_type_id"]] = max(heaviest.get(g["requirement_type_id"], 0), g["weight_oz"])
+    return {g["id"]: g["weight_oz"] if g["weight_oz"] is not None else heaviest.get(g["requirement_type_id"], 1.0)
+            for g in dashboard["gear_pool"]}
+
+
+def _naive(dashboard, weights):
+    """Lightest listed weight first (a missing weight looks free) until covered, each carried by its owner."""
+    loads = {c["id"]: 0.0 for c in dashboard["collaborators"]}
+    for a in dashboard["assigned_gear"]:
+        loads[a["assigned_to_user_id"]] += a["weight_oz"] or 0
+    total = 0.0
+    for req in dashboard["checklist"]:
+        covered = req["covered_count"]
+        items = [g for g in dashboard["gear_pool"]
+                 if g["requirement_type_id"] == req["requirement_type_id"] and not g["is_assigned"]]
+        for g in sorted(items, key=lambda g: g["weight_oz"] or 0):
+            if covered >= req["required_count"]:
+                break
+            covered += g["capacity_persons"] or 1
+            total += weights[g["id"]]
+            loads[g["user_id"]] += weights[g["id"]]
+    return total, max(loads.values())
+
+
+def _check(dashboard, plan):
+    pool = {}
+    for g in dashboard["gear_pool"]:
+        if not g["is_assigned"]:
+            pool[g["requirement_type_id"]] = pool.get(g["requirement_type_id"], 0) + (g["capacity_persons"] or 1)
+    ids = [a["gear_id"] for a in plan["assignments"]]
+    assert len(ids) == len(set(ids)), "gear picked twice"
+    for req in plan["requirements"]:
+        possible = req["covered_before"] + pool.get(req["requirement_type_id"], 0)
+        assert req["status"] == "met" or possible < req["required_count"], req
+
+
+def bench(members, gear_items, trips, seed):
+    rng = random.Random(seed)
+    rows = {"exact": [], "greedy": [], "naive": []}
+    for _ in range(trips):
+        dashboard = _synthetic_trip(rng, members, gear_items)
+        for label, budget in (("exact", DEFAULT_TIME_BUDGET_MS), ("greedy", 0)):
+            start = time.perf_counter()
+            plan = plan_gear(dashboard, time_budget_ms=budget)
+            elapsed = (time.perf_counter() - start) * 1000
+            _check(dashboard, plan)
+            rows[label].append((elapsed, plan["added_weight_oz"], max(plan["carried_weight_oz"].values()), plan["exact"]))
+        weights = _scored_weights(dashboard)
+        start = time.perf_counter()
+        total, heaviest = _naive(dashboard, weights)
+        rows["naive"].append(((time.perf_counter() - start) * 1000, total, heaviest, True))
+
+    print(f"{trips} trips, {members} members, {gear_items} gear items, {_TYPES} requirement types")
+    for label, data in rows.items():
+        times = sorted(r[0] for r in data)
+        print(
+            f"  {label:<7} mean={statistics.mean(times):8.2f}ms p95={times[max(0, int(len(times) * 0.95) - 1)]:8.2f}ms"
+            f"  added weight={statistics.mean(r[1] for r in data):9.1f}oz"
+            f"  heaviest pack={statistics.mean(r[2] for r in data):8.1f}oz"
+            f"  exact={sum(r[3] for r in data)}/{len(data)}"
+        )
+
+
+def main():
+    members = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    gear_items = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    trips = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    seed = int(sys.argv[4]) if len(sys.argv) > 4 else 1
+    bench(members, gear_items, trips, seed)
+
+
+if __name__ == "__main__":
+    main()
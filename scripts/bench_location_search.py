@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+TrailFeathers - Benchmark catalog text search: full catalog + substring filter vs /api/locations/search.
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+Usage: DATABASE_URL=... python scripts/bench_location_search.py [rows] [iterations]
+Inserts rows (default 100000) synthetic trip_report_info entries (search_vector is generated), inside
+one transaction (migrations 010-012 and 018 applied), runs ANALYZE, then times the legacy path (download the
+whole catalog and substring-match hike_name, as the dropdown does) against search_trip_report_info_text
+for exact, prefix, typo and description-only queries. Rolls back, so the catalog is left unchanged.
+"""
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import db  # noqa: E402
+from db import begin_unit_of_work, get_cursor  # noqa: E402
+
+_SEED_SQL = """
+INSERT INTO trip_report_info (summarized_description, hike_name, trip_report_1, difficulty)
+    SELECT 'A ' || (ARRAY['steep','gentle','rocky','shaded','sunny'])[1 + i % 5] || ' trail through '
+               || (ARRAY['old-growth forest','alpine meadows','a burn zone','basalt cliffs'])[1 + i % 4]
+               || ' to a ' || (ARRAY['waterfall','lookout','lake','glacier view','hot spring'])[1 + i % 7 % 5] || '.',
+           initcap(w.word) || ' ' || (ARRAY['Lake','Peak','Falls','Ridge','Loop','Meadows'])[1 + i % 6] || ' ' || i,
+           'Saw ' || (ARRAY['mountain goats','huckleberries','marmots','wildflowers'])[1 + i % 4] || ' near the top.',
+           (ARRAY['Easy','Moderate','Hard'])[1 + i % 3]
+    FROM generate_series(1, %(n)s) AS i,
+         LATERAL (SELECT substr(md5(i::text), 1, 6) AS word) w
+"""
+
+
+def _time(fn, iterations):
+    timings = []
+    result = None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.mean(timings), timings[max(0, int(len(timings) * 0.95) - 1)], result
+
+
+def _legacy(query):
+    query = query.lower()
+    return [r for r in db.list_trip_report_info_for_selection() if query in (r["hike_name"] or "").lower()]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    unit = begin_unit_of_work()
+    try:
+        with get_cursor() as cur:
+            cur.execute(_SEED_SQL, {"n": n})
+            cur.execute("ANALYZE trip_report_info")
+            cur.execute("SELECT hike_name FROM trip_report_info WHERE hike_name LIKE '% 4242'")
+            name = cur.fetchone()["hike_name"]
+        typo = name[0] + name[2:]  # drop one letter
+        cases = [
+            ("legacy: full catalog + substring", lambda: _legacy(name.split()[0])),
+            (f"exact name '{name}'", lambda: db.search_trip_report_info_text(name)),
+            (f"prefix '{name[:4]}'", lambda: db.search_trip_report_info_text(name[:4])),
+            (f"typo '{typo}'", lambda: db.search_trip_report_info_text(typo)),
+            ("description 'waterfall goats'", lambda: db.search_trip_report_info_text("waterfall goats")),
+            ('phrase "alpine meadows" -lake', lambda: db.search_trip_report_info_text('"alpine meadows" -lake')),
+        ]
+        print(f"catalog +{n} rows")
+        for label, fn in cases:
+            mean, p95, rows = _time(fn, iterations)
+            top = rows[0]["hike_name"] if rows else "-"
+            print(f"  {label:<36} mean={mean:8.2f}ms p95={p95:8.2f}ms rows={len(rows):6d} top={top}")
+    finally:
+        unit.finish()  # rolls back the synthetic rows
+
+
+if __name__ == "__main__":
+    main()
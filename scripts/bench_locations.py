@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+TrailFeathers - Benchmark /api/locations queries: full catalog vs filtered keyset pages.
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+Usage: DATABASE_URL=... python scripts/bench_locations.py [sizes] [iterations]
+e.g.   python scripts/bench_locations.py 10000,100000 20
+For each size, inserts that many synthetic trip_report_info rows inside one transaction (migrations
+010-011 applied), runs ANALYZE, times the legacy full-catalog read and several paged searches, and
+prints mean/p95 latency and response rows; then rolls back, so the catalog is left unchanged.
+"""
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import db  # noqa: E402
+from db import begin_unit_of_work, get_cursor  # noqa: E402
+
+_SEED_SQL = """
+INSERT INTO trip_report_info (summarized_description, hike_name, distance, elevation_gain, difficulty,
+                              distance_miles, elevation_gain_feet, highpoint_feet)
+SELECT 'synthetic',
+       initcap(w.word) || ' ' || (ARRAY['Lake','Peak','Falls','Ridge','Loop','Meadows'])[1 + i % 6] || ' ' || i,
+       d || ' miles, roundtrip', e || ' feet',
+       (ARRAY['Easy','Easy/Moderate','Moderate','Moderate/Hard','Hard'])[1 + i % 5],
+       CASE WHEN i % 10 = 0 THEN NULL ELSE d END, e, e + 1000
+FROM generate_series(1, %(n)s) AS i,
+     LATERAL (SELECT substr(md5(i::text), 1, 6) AS word) w,
+     LATERAL (SELECT round((random() * 25)::numeric, 1)::float8 AS d, (random() * 5000)::int AS e) v
+"""
+
+
+def _time(fn, iterations):
+    timings = []
+    result = None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.mean(timings), timings[max(0, int(len(timings) * 0.95) - 1)], result
+
+
+def _walk(pages, **kwargs):
+    after = None
+    for _ in range(pages):
+        rows, after = db.search_trip_report_info(after=after, **kwargs)
+        if after is None:
+            break
+    return rows
+
+
+def bench(n, iterations):
+    unit = begin_unit_of_work()
+    try:
+        with get_cursor() as cur:
+            cur.execute(_SEED_SQL, {"n": n})
+            cur.execute("ANALYZE trip_report_info")
+        cases = [
+            ("full catalog (legacy)", db.list_trip_report_info_for_selection),
+            ("page 1 by name", lambda: db.search_trip_report_info()[0]),
+            ("prefix 'a'", lambda: db.search_trip_report_info(name_prefix="a")[0]),
+            ("moderate, 5-10 mi, by distance", lambda: db.search_trip_report_info(
+                difficulties=["Moderate"], min_distance=5, max_distance=10, sort="distance")[0]),
+            ("by -elevation", lambda: db.search_trip_report_info(sort="elevation", descending=True)[0]),
+            ("20 pages by name (keyset)", lambda: _walk(20)),
+            ("20 pages by distance (keyset)", lambda: _walk(20, sort="distance")),
+        ]
+        print(f"catalog +{n} rows")
+        for label, fn in cases:
+            mean, p95, rows = _time(fn, iterations)
+            print(f"  {label:<32} mean={mean:8.2f}ms p95={p95:8.2f}ms rows={len(rows)}")
+    finally:
+        unit.finish()  # rolls back the synthetic rows
+
+
+def main():
+    sizes = [int(s) for s in (sys.argv[1] if len(sys.argv) > 1 else "10000,100000").split(",")]
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    for n in sizes:
+        bench(n, iterations)
+
+
+if __name__ == "__main__":
+    main()
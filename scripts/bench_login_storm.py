@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+TrailFeathers - Load benchmark: latency of non-auth endpoints while a login storm is running.
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+Usage: python scripts/bench_login_storm.py <base_url> <username> <password> [storm_threads] [seconds] [probe_path]
+e.g.   python scripts/bench_login_storm.py http://localhost:5000 alice secret 32 10 /
+Run against a server started the way production runs it (gunicorn app:app -w 2 --threads 8), once
+with PASSWORD_HASH_WORKERS=0 (inline hashing) and once with the default pool, and compare. Probes
+the non-auth path first with no load, then while storm_threads clients post logins in a loop, and
+prints probe p50/p99 for both phases plus the login status counts (200 / 401 / 503).
+"""
+import json
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+
+
+def _request(url, body=None):
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            resp.read()
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def _probe(url, seconds):
+    timings = []
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        _request(url)
+        timings.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.02)
+    timings.sort()
+    return timings
+
+
+def _report(label, timings):
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(
+        f"{label:<12} n={len(timings):5d} p50={statistics.median(timings):8.2f}ms "
+        f"p99={p99:8.2f}ms max={timings[-1]:8.2f}ms"
+    )
+
+
+def main():
+    if len(sys.argv) < 4:
+        raise SystemExit(__doc__)
+    base, username, password = sys.argv[1].rstrip("/"), sys.argv[2], sys.argv[3]
+    storm_threads = int(sys.argv[4]) if len(sys.argv) > 4 else 32
+    seconds = float(sys.argv[5]) if len(sys.argv) > 5 else 10
+    probe_url = base + (sys.argv[6] if len(sys.argv) > 6 else "/")
+
+    _report("idle", _probe(probe_url, seconds / 2))
+
+    statuses = Counter()
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def storm():
+        while not stop.is_set():
+            status = _request(f"{base}/api/login", {"username": username, "password": password})
+            with lock:
+                statuses[status] += 1
+
+    threads = [threading.Thread(target=storm, daemon=True) for _ in range(storm_threads)]
+    for t in threads:
+        t.start()
+    try:
+        _report("login storm", _probe(probe_url, seconds))
+    finally:
+        stop.set()
+        for t in threads:
+            t.join(timeout=35)
+    print("login statuses:", dict(sorted(statuses.items())))
+
+
+if __name__ == "__main__":
+    main()
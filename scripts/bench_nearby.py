@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+TrailFeathers - Benchmark nearest-hike and map viewport queries as the catalog grows.
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+Usage: DATABASE_URL=... python scripts/bench_nearby.py [sizes] [iterations]
+e.g.   python scripts/bench_nearby.py 10000,100000,1000000 50
+For each size, inserts that many synthetic hikes scattered over WA/OR inside one transaction
+(migration 013 applied), runs ANALYZE, and times nearest_trip_report_info (k=10) and a ~50 x 35 mile
+list_trip_report_info_in_box at random points. The first nearest result set is checked against a
+brute-force great-circle ranking of every row. Rolls back, so the catalog is left unchanged.
+"""
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import db  # noqa: E402
+from db import begin_unit_of_work, get_cursor  # noqa: E402
+from db.trip_reports import haversine_miles  # noqa: E402
+
+_SEED_SQL = """
+INSERT INTO trip_report_info (summarized_description, hike_name, latitude, longitude)
+SELECT 'synthetic', 'Synthetic Hike ' || i, 42 + random() * 7, -124.5 + random() * 7.5
+FROM generate_series(1, %(n)s) AS i
+"""
+
+
+def _point(rng):
+    return 42 + rng.random() * 7, -124.5 + rng.random() * 7.5
+
+
+def _time(fn, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.mean(timings), timings[max(0, int(len(timings) * 0.95) - 1)]
+
+
+def _check_nearest(lat, lon, k=10):
+    got = [r["id"] for r in db.nearest_trip_report_info(lat, lon, k=k)]
+    with get_cursor() as cur:
+        cur.execute(
+            """SELECT id, latitude, longitude FROM trip_report_info
+               WHERE latitude IS NOT NULL AND longitude IS NOT NULL AND hike_name <> ''"""
+        )
+        ranked = sorted(cur.fetchall(), key=lambda r: (haversine_miles(lat, lon, r["latitude"], r["longitude"]), r["id"]))
+    return got == [r["id"] for r in ranked[:k]]
+
+
+def bench(n, iterations):
+    rng = random.Random(n)
+    unit = begin_unit_of_work()
+    try:
+        with get_cursor() as cur:
+            cur.execute(_SEED_SQL, {"n": n})
+            cur.execute("ANALYZE trip_report_info")
+        print(f"catalog +{n} rows  nearest matches brute force: {_check_nearest(*_point(rng))}")
+
+        def nearest():
+            db.nearest_trip_report_info(*_point(rng), k=10)
+
+        def viewport():
+            lat, lon = _point(rng)
+            db.list_trip_report_info_in_box(lat, lon, lat + 0.5, lon + 1.0)
+
+        for label, fn in (("nearest k=10", nearest), ("viewport 0.5 x 1.0 deg", viewport)):
+            mean, p95 = _time(fn, iterations)
+            print(f"  {label:<24} mean={mean:8.2f}ms p95={p95:8.2f}ms")
+    finally:
+        unit.finish()  # rolls back the synthetic rows
+
+
+def main():
+    sizes = [int(s) for s in (sys.argv[1] if len(sys.argv) > 1 else "10000,100000,1000000").split(",")]
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    for n in sizes:
+        bench(n, iterations)
+
+
+if __name__ == "__main__":
+    main()
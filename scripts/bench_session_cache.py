@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+TrailFeathers - Per-route query counts for session cache updates: full refresh vs incremental patch.
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+Usage: DATABASE_URL=... python scripts/bench_session_cache.py <username> <password> [rounds]
+Logs in through the Flask test client and repeatedly creates, updates and deletes a gear item and a
+trip, once with every mutation calling login.refresh_session_cache (the old behaviour) and once with
+the incremental cache_* helpers. Prints average statements per request for each route (from the
+X-DB-Queries counters in tf_server.unit_of_work). Writes real rows; each one is deleted again.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from flask import session  # noqa: E402
+
+from auth import login  # noqa: E402
+from tf_server import create_app  # noqa: E402
+from tf_server.unit_of_work import query_stats, reset_query_stats  # noqa: E402
+
+_INCREMENTAL = [
+    "cache_add_gear", "cache_replace_gear", "cache_remove_gear",
+    "cache_add_trip", "cache_replace_trip", "cache_remove_trip",
+    "cache_add_friend", "cache_remove_friend",
+]
+
+
+def _full_refresh(*_args):
+    login.refresh_session_cache(session["user_id"])
+
+
+def _exercise(client, rounds):
+    for i in range(rounds):
+        r = client.post("/api/gear", json={"name": f"bench item {i}", "type": "other", "weight_oz": 3})
+        gear_id = r.get_json()["id"]
+        client.put(f"/api/gear/{gear_id}", json={"name": f"bench item {i} v2", "type": "other"})
+        client.delete(f"/api/gear/{gear_id}")
+        r = client.post("/api/trips", json={"trip_name": f"bench trip {i}", "activity_type": "Backpacking"})
+        trip_id = r.get_json()["id"]
+        client.put(f"/api/trips/{trip_id}", json={"trip_name": f"bench trip {i} v2", "notes": "bench"})
+        client.delete(f"/api/trips/{trip_id}")
+        client.get("/api/gear")
+        client.get("/api/trips")
+
+
+def run(label, app, username, password, rounds, legacy):
+    saved = {name: getattr(login, name) for name in _INCREMENTAL}
+    if legacy:
+        for name in _INCREMENTAL:
+            setattr(login, name, _full_refresh)
+    try:
+        client = app.test_client()
+        r = client.post("/api/login", json={"username": username, "password": password})
+        if r.status_code != 200:
+            raise SystemExit(f"login failed: {r.status_code} {r.get_data(as_text=True)}")
+        reset_query_stats()
+        _exercise(client, rounds)
+    finally:
+        for name, fn in saved.items():
+            setattr(login, name, fn)
+    print(label)
+    for endpoint, s in query_stats().items():
+        print(f"  {endpoint:<28} requests={s['requests']:4d} avg={s['avg']:5.1f} max={s['max']:3d}")
+
+
+def main():
+    if len(sys.argv) < 3:
+        raise SystemExit(__doc__)
+    rounds = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    app = create_app()
+    run("full refresh", app, sys.argv[1], sys.argv[2], rounds, legacy=True)
+    run("incremental", app, sys.argv[1], sys.argv[2], rounds, legacy=False)
+
+
+if __name__ == "__main__":
+    main()
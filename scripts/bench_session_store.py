@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+TrailFeathers - Compare session cookie size and load/save latency: signed cookie vs server-side store.
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+Usage: python scripts/bench_session_store.py [gear_items] [friends] [trips] [iterations]
+Fills a session the way auth.login._populate_session_cache does for a power user (synthetic rows, no DB
+needed), then for each SESSION_TYPE (redis with REDIS_URL, sqlalchemy with SESSION_SQLALCHEMY_URL) reports
+the Set-Cookie size and mean time to save and reopen it.
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from flask import session  # noqa: E402
+
+
+def _synthetic_session(n_gear, n_friends, n_trips):
+    gear = [
+        {
+            "id": i,
+            "type": "Sleep System",
+            "name": f"Ultralight quilt #{i}",
+            "capacity": "1 person",
+            "weight_oz": 19.5,
+            "brand": "Enlightened Equipment",
+            "condition": "Good",
+            "notes": "Stuff sack in the closet",
+            "requirement_type_id": 3,
+            "capacity_persons": 1,
+            "created_at": "2026-03-01T12:00:00+00:00",
+            "requirement_key": "sleep_system",
+            "requirement_display_name": "Sleep System",
+        }
+        for i in range(n_gear)
+    ]
+    friends = [{"id": 1000 + i, "username": f"hiker_{i}"} for i in range(n_friends)]
+    trips = [
+        {
+            "id": i,
+            "trip_name": f"Weekend trip {i}",
+            "trail_name": "Marion Lake",
+            "activity_type": "Backpacking",
+            "creator_id": 1,
+            "creator_username": "power_user",
+            "trip_report_info_id": 42,
+            "notes": "Permit required",
+            "created_at": "2026-03-01T12:00:00+00:00",
+            "intended_start_date": "2026-07-04T00:00:00+00:00",
+        }
+        for i in range(n_trips)
+    ]
+    return {
+        "user": {"id": 1, "username": "power_user"},
+        "user_id": 1,
+        "gear": gear,
+        "friends": friends,
+        "trips": trips,
+    }
+
+
+def bench(session_type, data, iterations):
+    os.environ["SESSION_TYPE"] = session_type
+    from tf_server import create_app
+
+    app = create_app()
+    interface = app.session_interface
+    cookie_name = app.config["SESSION_COOKIE_NAME"]
+
+    save_times = []
+    cookie = None
+    for _ in range(iterations):
+        with app.test_request_context("/"):
+            session.update(data)
+            session.permanent = True
+            response = app.response_class()
+            start = time.perf_counter()
+            interface.save_session(app, session, response)
+            save_times.append((time.perf_counter() - start) * 1000)
+            cookie = response.headers.get("Set-Cookie", "")
+
+    value = cookie.split(";", 1)[0].split("=", 1)[1]
+    open_times = []
+    loaded = None
+    for _ in range(iterations):
+        with app.test_request_context("/", headers={"Cookie": f"{cookie_name}={value}"}) as ctx:
+            start = time.perf_counter()
+            loaded = interface.open_session(app, ctx.request)
+            open_times.append((time.perf_counter() - start) * 1000)
+    ok = len(loaded.get("gear") or []) == len(data["gear"])
+
+    print(
+        f"{session_type:<11} cookie={len(value):6d} B  save={statistics.mean(save_times):6.3f}ms  "
+        f"open={statistics.mean(open_times):6.3f}ms  roundtrip_ok={ok}  "
+        f"over_4KB={'yes' if len(cookie) > 4096 else 'no'}"
+    )
+
+
+def main():
+    n_gear = int(sys.argv[1]) if len(sys.argv) > 1 else 150
+    n_friends = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    n_trips = int(sys.argv[3]) if len(sys.argv) > 3 else 40
+    iterations = int(sys.argv[4]) if len(sys.argv) > 4 else 200
+    os.environ.setdefault("SESSION_FILE_DIR", tempfile.mkdtemp(prefix="tf_bench_sessions_"))
+    data = _synthetic_session(n_gear, n_friends, n_trips)
+    print(f"session with {n_gear} gear, {n_friends} friends, {n_trips} trips; {iterations} iterations")
+    bench("cookie", data, iterations)
+    bench("filesystem", data, iterations)
+    if os.getenv("REDIS_URL"):
+        bench("redis", data, iterations)
+    if os.getenv("SESSION_SQLALCHEMY_URL"):
+        bench("sqlalchemy", data, iterations)
+
+
+if __name__ == "__main__":
+    main()
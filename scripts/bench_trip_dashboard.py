@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+TrailFeathers - Benchmark trip dashboard reads: per-helper calls vs the aggregate in db.trip_dashboard.
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+Usage: DATABASE_URL=... python scripts/bench_trip_dashboard.py <trip_id> <user_id> [iterations]
+Prints queries, connection checkouts and mean/p50/p95 latency per dashboard build for both paths.
+"""
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import db  # noqa: E402
+from db import connection  # noqa: E402
+
+_counts = {"queries": 0, "checkouts": 0}
+
+
+class _CountingCursor:
+    def __init__(self, cur):
+        self._cur = cur
+
+    def execute(self, *args, **kwargs):
+        _counts["queries"] += 1
+        return self._cur.execute(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+
+def _install_counters():
+    dict_cursor = connection._dict_cursor
+    connection._dict_cursor = lambda conn: _CountingCursor(dict_cursor(conn))
+    pool = connection.get_pool()
+    if pool is not None:
+        getconn = pool.getconn
+
+        def counting_getconn():
+            _counts["checkouts"] += 1
+            return getconn()
+
+        pool.getconn = counting_getconn
+
+
+def legacy_dashboard(trip_id, user_id):
+    """The helper sequence _build_trip_dashboard ran before the aggregate query."""
+    trip = db.get_trip(trip_id)
+    db.list_incoming_trip_invites(user_id)
+    db.list_trip_collaborators(trip_id)
+    if trip["creator_id"] == user_id:
+        db.list_trip_invites_pending(trip_id)
+        db.list_friends(user_id)
+    db.get_trip_gear_pool(trip_id)
+    db.get_trip_assigned_gear(trip_id)
+    db.get_trip_requirement_summary(trip_id)
+    db.get_trip_report_info_for_trip(trip_id)
+
+
+def aggregate_dashboard(trip_id, user_id):
+    db.get_trip_dashboard_data(trip_id, user_id)
+
+
+def run(label, fn, trip_id, user_id, iterations):
+    fn(trip_id, user_id)  # warm the pool
+    _counts["queries"] = _counts["checkouts"] = 0
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(trip_id, user_id)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(
+        f"{label:<10} queries/build={_counts['queries'] / iterations:5.1f} "
+        f"checkouts/build={_counts['checkouts'] / iterations:5.1f} "
+        f"mean={statistics.mean(timings):7.2f}ms p50={timings[len(timings) // 2]:7.2f}ms "
+        f"p95={timings[int(len(timings) * 0.95) - 1]:7.2f}ms"
+    )
+
+
+def main():
+    if len(sys.argv) < 3:
+        raise SystemExit(__doc__)
+    trip_id = int(sys.argv[1])
+    user_id = int(sys.argv[2])
+    iterations = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    if db.get_trip(trip_id) is None:
+        raise SystemExit(f"Trip {trip_id} not found")
+    _install_counters()
+    run("legacy", legacy_dashboard, trip_id, user_id, iterations)
+    run("aggregate", aggregate_dashboard, trip_id, user_id, iterations)
+
+
+if __name__ == "__main__":
+    main()
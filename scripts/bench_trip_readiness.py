@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+TrailFeathers - Benchmark trips-list readiness: one set-based query vs a dashboard load per trip.
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+Usage: DATABASE_URL=... python scripts/bench_trip_readiness.py [trips] [iterations] [activity_type]
+e.g.   python scripts/bench_trip_readiness.py 500 20 hiking
+Inside one transaction (rolled back at the end), gives a synthetic user `trips` trips of activity_type
+(which should have activity_requirements rows), each with 4 members and 10 pieces of gear per member
+assigned, then times db.list_trip_readiness for all of them against get_trip_dashboard_shared for each
+trip (what finding out meant before). Checks that both agree on met/short counts.
+"""
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import db  # noqa: E402
+from db import begin_unit_of_work, get_cursor  # noqa: E402
+
+_MEMBERS = 4
+_GEAR_PER_MEMBER = 10
+
+_SEED_SQL = """
+WITH u AS (
+  INSERT INTO users (username, password_hash)
+  SELECT 'bench_ready_' || i || '_' || txid_current(), 'x' FROM generate_series(1, %(members)s) AS i
+  RETURNING id
+), g AS (
+  INSERT INTO gear (user_id, type, name, weight_oz, requirement_type_id, capacity_persons)
+  SELECT u.id, 'thing', 'gear ' || i, (random() * 40)::numeric(6, 1),
+         (SELECT id FROM requirement_types ORDER BY id OFFSET (i %% GREATEST((SELECT COUNT(*) FROM requirement_types), 1)) LIMIT 1),
+         CASE WHEN i %% 3 = 0 THEN 2 END
+  FROM u, generate_series(1, %(gear)s) AS i
+  RETURNING id, user_id
+), t AS (
+  INSERT INTO trips (creator_id, trip_name, trail_name, activity_type)
+  SELECT (SELECT min(id) FROM u), 'Bench trip ' || i, 'trail', %(activity)s
+  FROM generate_series(1, %(trips)s) AS i
+  RETURNING id
+), tc AS (
+  INSERT INTO trip_collaborators (trip_id, user_id, role)
+  SELECT t.id, u.id, CASE WHEN u.id = (SELECT min(id) FROM u) THEN 'creator' ELSE 'member' END FROM t, u
+)
+INSERT INTO trip_gear (trip_id, gear_id, assigned_to_user_id)
+SELECT t.id, g.id, g.user_id FROM t, g WHERE random() < 0.7
+"""
+
+
+def _time(fn, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.mean(timings), timings[max(0, int(len(timings) * 0.95) - 1)]
+
+
+def bench(trips, iterations, activity):
+    unit = begin_unit_of_work()
+    try:
+        with get_cursor() as cur:
+            cur.execute(
+                _SEED_SQL, {"members": _MEMBERS, "gear": _GEAR_PER_MEMBER, "trips": trips, "activity": activity}
+            )
+            cur.execute("SELECT id FROM users WHERE username = 'bench_ready_1_' || txid_current()")
+            user_id = cur.fetchone()["id"]
+            cur.execute("SELECT id FROM trips WHERE creator_id = %s", (user_id,))
+            trip_ids = [r["id"] for r in cur.fetchall()]
+            cur.execute("ANALYZE trip_gear")
+            cur.execute("ANALYZE trip_collaborators")
+        print(f"{len(trip_ids)} trips of {activity!r}, {_MEMBERS} members, {_GEAR_PER_MEMBER} gear each")
+
+        readiness = db.list_trip_readiness(user_id)
+        for trip_id in trip_ids[:20]:
+            checklist = db.get_trip_dashboard_shared(trip_id)["checklist"]
+            met = sum(1 for item in checklist if item["status"] == "met")
+            assert (readiness[trip_id]["met"], readiness[trip_id]["requirements"]) == (met, len(checklist)), trip_id
+
+        def per_trip():
+            for trip_id in trip_ids:
+                db.get_trip_dashboard_shared(trip_id)
+
+        for label, fn, n in (
+            ("list_trip_readiness", lambda: db.list_trip_readiness(user_id), iterations),
+            ("dashboard per trip", per_trip, max(1, iterations // 10)),
+        ):
+            mean, p95 = _time(fn, n)
+            print(f"  {label:<22} mean={mean:9.2f}ms p95={p95:9.2f}ms")
+    finally:
+        unit.finish()  # rolls back the synthetic rows
+
+
+def main():
+    trips = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    activity = sys.argv[3] if len(sys.argv) > 3 else "hiking"
+    bench(trips, iterations, activity)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+TrailFeathers - Benchmark trip report ownership checks and top-four thumbnails for image-heavy users.
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+Usage: DATABASE_URL=... python scripts/bench_trip_report_images.py [reports_per_user] [iterations] [image_kb]
+e.g.   python scripts/bench_trip_report_images.py 2000 200 512
+Inside one transaction (rolled back at the end), creates 20 synthetic users with reports_per_user trip
+reports each over 40 catalog hikes, two in three with an image_hash, and fills the four top-four slots.
+If the legacy BYTEA column user_trip_reports.image still exists (scripts/migrate_images_to_blobs.py
+without --drop-columns), image_kb of data is stored in it for those reports too, as before migration 015.
+Prints EXPLAIN (ANALYZE, BUFFERS) for list_top_four_hikes and times it, get_user_trip_report and
+user_owns_trip_report. Run before and after migration 016 to compare plans.
+"""
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import db  # noqa: E402
+from db import begin_unit_of_work, get_cursor  # noqa: E402
+from db.top_four import list_top_four_sql  # noqa: E402
+
+_USERS = 20
+_HIKES = 40
+
+_SEED_SQL = """
+WITH u AS (
+  INSERT INTO users (username, password_hash)
+  SELECT 'bench_images_' || i || '_' || txid_current(), 'x' FROM generate_series(1, %(users)s) AS i
+  RETURNING id
+), hikes AS (
+  SELECT array_agg(id) AS ids FROM (SELECT id FROM trip_report_info ORDER BY id LIMIT %(hikes)s) h
+)
+INSERT INTO user_trip_reports (user_id, trip_report_info_id, title, body, created_at, updated_at, image_hash, image_media_type)
+SELECT u.id, hikes.ids[1 + (r %% array_length(hikes.ids, 1))], 'Report ' || r, 'synthetic',
+       NOW() - r * INTERVAL '1 hour', NOW() - r * INTERVAL '1 hour',
+       CASE WHEN r %% 3 <> 0 THEN md5(u.id || ':' || r) || md5(r || ':' || u.id) END,
+       CASE WHEN r %% 3 <> 0 THEN 'image/jpeg' END
+FROM u, hikes, generate_series(1, %(reports)s) AS r
+"""
+
+_LEGACY_IMAGE_SQL = """
+UPDATE user_trip_reports
+SET image = (SELECT string_agg(md5(random()::text || g), '') FROM generate_series(1, %(chunks)s) g)::bytea
+WHERE user_id = ANY(%(users)s) AND image_hash IS NOT NULL
+"""
+
+_TOP_FOUR_SQL = """
+INSERT INTO user_top_four_hikes (user_id, position, trip_report_info_id)
+SELECT u, p, (SELECT trip_report_info_id FROM user_trip_reports WHERE user_id = u
+              GROUP BY trip_report_info_id ORDER BY trip_report_info_id OFFSET p - 1 LIMIT 1)
+FROM unnest(%(users)s::bigint[]) AS u, generate_series(1, 4) AS p
+ON CONFLICT (user_id, position) DO NOTHING
+"""
+
+
+def _time(fn, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.mean(timings), timings[max(0, int(len(timings) * 0.95) - 1)]
+
+
+def _has_legacy_image_column(cur):
+    cur.execute(
+        """SELECT 1 FROM information_schema.columns
+           WHERE table_name = 'user_trip_reports' AND column_name = 'image'"""
+    )
+    return cur.fetchone() is not None
+
+
+def _explain(cur, sql, params):
+    cur.execute("EXPLAIN (ANALYZE, BUFFERS, COSTS OFF) " + sql, params)
+    for row in cur.fetchall():
+        print("    " + next(iter(row.values())))
+
+
+def bench(reports, iterations, image_kb):
+    unit = begin_unit_of_work()
+    try:
+        with get_cursor() as cur:
+            cur.execute(_SEED_SQL, {"users": _USERS, "hikes": _HIKES, "reports": reports})
+            cur.execute("SELECT id FROM users WHERE username LIKE 'bench_images_%%_' || txid_current()")
+            users = [r["id"] for r in cur.fetchall()]
+            legacy = _has_legacy_image_column(cur) and image_kb > 0
+            if legacy:
+                cur.execute(_LEGACY_IMAGE_SQL, {"chunks": image_kb * 1024 // 32, "users": users})
+            cur.execute(_TOP_FOUR_SQL, {"users": users})
+            cur.execute("ANALYZE user_trip_reports")
+            cur.execute(
+                "SELECT id FROM user_trip_reports WHERE user_id = %s AND image_hash IS NOT NULL LIMIT 1",
+                (users[0],),
+            )
+            report_id = cur.fetchone()["id"]
+        legacy_note = f", {image_kb}KB legacy BYTEA per image" if legacy else ""
+        print(f"{len(users)} users x {reports} reports ({reports * 2 // 3} with images{legacy_note})")
+
+        print("  list_top_four_hikes plan:")
+        with get_cursor() as cur:
+            _explain(cur, list_top_four_sql(), {"user_id": users[0]})
+
+        cases = (
+            ("list_top_four_hikes", lambda: db.list_top_four_hikes(users[0])),
+            ("get_user_trip_report", lambda: db.get_user_trip_report(report_id, users[0])),
+            ("user_owns_trip_report", lambda: db.user_owns_trip_report(report_id, users[0])),
+        )
+        for label, fn in cases:
+            mean, p95 = _time(fn, iterations)
+            print(f"  {label:<24} mean={mean:8.2f}ms p95={p95:8.2f}ms")
+    finally:
+        unit.finish()  # rolls back the synthetic rows
+
+
+def main():
+    reports = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    image_kb = int(sys.argv[3]) if len(sys.argv) > 3 else 512
+    bench(reports, iterations, image_kb)
+
+
+if __name__ == "__main__":
+    main()
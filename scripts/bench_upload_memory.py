@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+TrailFeathers - Benchmark peak memory of image uploads: read-into-bytes vs streamed spool.
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+Usage: python scripts/bench_upload_memory.py [size_mb] [concurrent]
+e.g.   python scripts/bench_upload_memory.py 5 4
+Posts a size_mb JPEG-looking upload through the WSGI app to two routes that store it in a
+temporary blob store: "buffered" does f.read() + blob_store.put(bytes) like the old upload routes,
+"streamed" uses tf_server.uploads.receive_image + blob_store.put(spool). Reports tracemalloc peak per
+request and the projection for `concurrent` simultaneous uploads, and checks that an upload over the
+limit is refused with 413 before its body is read. No database needed.
+"""
+import io
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["BLOB_STORE"] = "local"
+os.environ["BLOB_DIR"] = tempfile.mkdtemp(prefix="tf_bench_blobs_")
+
+from flask import Flask, jsonify, request  # noqa: E402
+from werkzeug.test import EnvironBuilder  # noqa: E402
+
+from db.blobs import blob_store  # noqa: E402
+from tf_server.uploads import MULTIPART_OVERHEAD, UploadRejected, UploadRequest, receive_image  # noqa: E402
+
+
+def _app(limit):
+    app = Flask(__name__)
+    app.request_class = UploadRequest
+    app.config["MAX_CONTENT_LENGTH"] = limit + MULTIPART_OVERHEAD
+
+    @app.post("/buffered")
+    def buffered():
+        f = request.files["file"]
+        data = f.read()
+        return jsonify(key=blob_store.put(data, f.mimetype))
+
+    @app.post("/streamed")
+    def streamed():
+        try:
+            image, media_type = receive_image(limit)
+        except UploadRejected as e:
+            return jsonify(error=str(e)), e.status
+        return jsonify(key=blob_store.put(image, media_type))
+
+    return app
+
+
+def _payload(size):
+    return b"\xff\xd8\xff\xe0" + os.urandom(size - 4)
+
+
+def _peak(app, path, body):
+    """Run one upload through the WSGI app; return (status, JSON body, peak bytes allocated).
+    The request body is encoded before tracing starts, so only the server side is measured."""
+    builder = EnvironBuilder(path=path, method="POST", data={"file": (io.BytesIO(body), "photo.jpg")})
+    environ = builder.get_environ()
+    builder.close()
+    tracemalloc.start()
+    status = []
+    chunks = app.wsgi_app(environ, lambda s, h, *a: status.append(int(s.split()[0])))
+    out = b"".join(chunks)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return status[0], json.loads(out), peak
+
+
+def main():
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    concurrent = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    size = int(size_mb * 1024 * 1024)
+    app = _app(limit=size)
+    body = _payload(size)
+    mb = 1024 * 1024
+    print(f"upload {size / mb:.1f} MB, blobs in {os.environ['BLOB_DIR']}")
+    keys = set()
+    for path in ("/buffered", "/streamed"):
+        status, out, peak = _peak(app, path, body)
+        assert status == 200, out
+        keys.add(out["key"])
+        blob_store.delete(out["key"])
+        print(f"{path[1:]:>9}: peak {peak / mb:6.2f} MB/request, ~{concurrent * peak / mb:6.2f} MB for {concurrent} at once")
+    assert len(keys) == 1, "both paths must store the same blob"
+    status, out, _ = _peak(app, "/streamed", _payload(size + MULTIPART_OVERHEAD + 1))
+    print(f"over limit: {status} {out}")
+    assert status == 413
+
+
+if __name__ == "__main__":
+    main()
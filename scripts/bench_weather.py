@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+TrailFeathers - Exercise tf_server.weather against a local fake NWS server (no network needed).
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+Usage: python scripts/bench_weather.py [viewers] [upstream_delay_ms] [max_age_s]
+Starts a fake api.weather.gov on localhost that answers /points and /gridpoints with a delay and a
+Cache-Control max-age, then checks:
+  1. coalescing: `viewers` concurrent requests for one trail make one /points and one forecast call;
+  2. caching: a repeat request makes no upstream call and returns immediately;
+  3. stale-while-revalidate: after max-age expires the stale forecast is returned at once and one
+     background refresh is made;
+  4. failure backoff: with the fake server returning 503, an uncached location fails once and
+     further requests return None without calling upstream;
+  5. batch: get_forecast_periods_many over 6 trips at 3 distinct trailheads makes 3 /points calls,
+     concurrently (about one upstream delay in total, not three).
+Prints upstream call counts and latencies, and exits non-zero if an expectation fails.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+_calls = {"points": 0, "forecast": 0}
+_calls_lock = threading.Lock()
+_settings = {"delay": 0.2, "max_age": 2, "fail": False}
+
+
+class FakeNWS(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        kind = "points" if self.path.startswith("/points/") else "forecast"
+        with _calls_lock:
+            _calls[kind] += 1
+        time.sleep(_settings["delay"])
+        if _settings["fail"]:
+            self.send_response(503)
+            self.end_headers()
+            return
+        host = f"http://{self.headers['Host']}"
+        if kind == "points":
+            body = {"properties": {"forecast": f"{host}/gridpoints/PQR/100,50/forecast"}}
+            max_age = 86400
+        else:
+            body = {"properties": {"periods": [{
+                "name": "Today", "startTime": "2026-07-04T06:00:00-07:00", "endTime": "2026-07-04T18:00:00-07:00",
+                "temperature": 72, "temperatureUnit": "F", "shortForecast": "Sunny", "detailedForecast": "Sunny.",
+            }]}}
+            max_age = _settings["max_age"]
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/geo+json")
+        self.send_header("Cache-Control", f"public, max-age={max_age}")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def _check(label, ok):
+    print(f"  {'ok ' if ok else 'FAIL'} {label}")
+    return ok
+
+
+def main():
+    viewers = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    _settings["delay"] = (int(sys.argv[2]) if len(sys.argv) > 2 else 200) / 1000
+    _settings["max_age"] = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeNWS)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["NWS_BASE_URL"] = f"http://127.0.0.1:{server.server_port}"
+    os.environ.pop("REDIS_URL", None)
+    from tf_server import weather
+
+    ok = True
+    print(f"1. {viewers} concurrent viewers, cold cache")
+    with ThreadPoolExecutor(viewers) as ex:
+        results = list(ex.map(lambda _: _timed(weather.forecast_for_date, 45.5, -122.6, "2026-07-04"), range(viewers)))
+    print(f"     upstream points={_calls['points']} forecast={_calls['forecast']} "
+          f"max latency={max(ms for _, ms in results):.1f}ms")
+    ok &= _check("one /points and one forecast call", _calls == {"points": 1, "forecast": 1})
+    ok &= _check("every viewer got the forecast", all(r and r["is_trip_date"] for r, _ in results))
+
+    print("2. repeat request, warm cache")
+    result, ms = _timed(weather.forecast_for_date, 45.501, -122.599, "2026-07-04")
+    print(f"     latency={ms:.2f}ms")
+    ok &= _check("no upstream call", _calls == {"points": 1, "forecast": 1} and result is not None)
+
+    print(f"3. after max-age ({_settings['max_age']}s) expires")
+    time.sleep(_settings["max_age"] + 0.2)
+    result, ms = _timed(weather.forecast_for_date, 45.5, -122.6, "2026-07-04")
+    print(f"     stale latency={ms:.2f}ms")
+    ok &= _check("stale forecast served without waiting", result is not None and ms < _settings["delay"] * 1000)
+    time.sleep(_settings["delay"] + 0.3)
+    ok &= _check("one background refresh", _calls["forecast"] == 2)
+
+    print("4. upstream failing, uncached location")
+    _settings["fail"] = True
+    before = dict(_calls)
+    first, _ = _timed(weather.forecast_for_date, 44.0, -121.0, None)
+    second, ms = _timed(weather.forecast_for_date, 44.0, -121.0, None)
+    print(f"     second call latency={ms:.2f}ms")
+    ok &= _check("failure returns None", first is None and second is None)
+    ok &= _check("failure remembered (no second upstream call)", _calls["points"] == before["points"] + 1)
+
+    print("5. batch of 6 trips at 3 trailheads, cold cache")
+    _settings["fail"] = False
+    before = dict(_calls)
+    coords = [(46.1, -121.5), (46.1001, -121.5002), (47.2, -121.1), (47.2, -121.1), (48.3, -120.7), (48.3, -120.7)]
+    keys = [weather.forecast_key(lat, lon) for lat, lon in coords]
+    result, ms = _timed(weather.get_forecast_periods_many, keys)
+    print(f"     distinct keys={len(result)} points calls={_calls['points'] - before['points']} latency={ms:.1f}ms")
+    ok &= _check("one /points call per trailhead", _calls["points"] - before["points"] == 3)
+    ok &= _check("all forecasts returned", all(result.values()))
+    ok &= _check("fetched concurrently", ms < 3 * 2 * _settings["delay"] * 1000)
+
+    server.shutdown()
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+TrailFeathers - Check the SQL checklist engine against the original per-row Python evaluation.
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+Usage: DATABASE_URL=... python scripts/check_requirement_summary.py [cases] [seed]
+e.g.   python scripts/check_requirement_summary.py 200 1
+Property check: each case builds a random world inside one transaction (rolled back at the end):
+requirement types (display names repeat), activity_requirements of every rule (per_group, per_person,
+per_N_persons), users, gear with random requirement types and capacity_persons (or NULL), and trips
+with activity types padded with ASCII and Unicode whitespace, empty or unknown, 0-8 collaborators and
+random gear assignments. For every trip it compares get_trip_requirement_summary,
+get_trip_requirement_summaries and the dashboard checklist with reference_summary (the Python the
+engine replaced) and exits 1 on the first difference, printing the seed that reproduces it. Items must
+be identical field for field and in the same order; the one liberty is that items with equal
+display_name, which the original left in no defined order, come by requirement_type_id.
+"""
+import math
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import db  # noqa: E402
+from db import begin_unit_of_work, get_cursor, list_activity_requirements  # noqa: E402
+
+_ACTIVITIES = ("hiking", "camping", "backpacking", "climbing")
+# str.strip() removes Unicode whitespace too (NBSP, U+0085, U+001C-1F, U+2000-200A, U+3000, ...)
+_PADDING = ("", " ", "  ", "\t", "\n ", " \r\n", "\u00a0", "\x1c", "\x85 ", "\u2003", "\u3000", "\x0b\x0c")
+_NAMES = ("Tent", "Stove", "Water filter", "Bear can", "First aid")
+
+
+def _required_count_for_rule(rule, quantity, n_persons, num_people):
+    if rule == "per_group":
+        return quantity
+    if rule == "per_person":
+        return quantity * num_people
+    if rule == "per_N_persons" and n_persons and n_persons > 0:
+        return quantity * math.ceil(num_people / n_persons)
+    return 0
+
+
+def _covered_count_for_type(assigned_gear_rows):
+    total = 0
+    for row in assigned_gear_rows:
+        cap = row.get("capacity_persons")
+        total += cap if cap is not None else 1
+    return total
+
+
+def reference_summary(trip_id):
+    """get_trip_requirement_summary as it was: separate queries, then one Python loop per requirement."""
+    with get_cursor() as cur:
+        cur.execute("SELECT activity_type FROM trips WHERE id = %s", (trip_id,))
+        trip = cur.fetchone()
+        if not trip:
+            return None
+        activity_type = (trip.get("activity_type") or "").strip()
+        if not activity_type:
+            return []
+        reqs = list_activity_requirements(activity_type)
+        if not reqs:
+            return []
+        cur.execute("SELECT COUNT(*) AS n FROM trip_collaborators WHERE trip_id = %s", (trip_id,))
+        num_people = cur.fetchone()["n"]
+        cur.execute(
+            """SELECT g.id, g.requirement_type_id, g.capacity_persons
+               FROM trip_gear tg JOIN gear g ON g.id = tg.gear_id WHERE tg.trip_id = %s""",
+            (trip_id,),
+        )
+        assigned = cur.fetchall()
+    by_type = {}
+    for row in assigned:
+        if row.get("requirement_type_id") is not None:
+            by_type.setdefault(row["requirement_type_id"], []).append(row)
+    out = []
+    for ar in reqs:
+        required = _required_count_for_rule(ar["rule"], ar["quantity"], ar.get("n_persons"), num_people)
+        covered = _covered_count_for_type(by_type.get(ar["requirement_type_id"], []))
+        out.append({
+            "requirement_type_id": ar["requirement_type_id"],
+            "requirement_key": ar["requirement_key"],
+            "requirement_display_name": ar["requirement_display_name"],
+            "rule": ar["rule"],
+            "quantity": ar["quantity"],
+            "n_persons": ar.get("n_persons"),
+            "required_count": required,
+            "covered_count": covered,
+            "status": "met" if covered >= required else "short",
+        })
+    return out
+
+
+def _ties_by_id(items):
+    """The original ordered by display_name only, leaving ties in no particular order; the engine
+    breaks them by requirement_type_id. Apply that to the reference within each run of equal names."""
+    out = []
+    for item in items:
+        if out and out[-1][0]["requirement_display_name"] == item["requirement_display_name"]:
+            out[-1].append(item)
+        else:
+            out.append([item])
+    return [item for run in out for item in sorted(run, key=lambda i: i["requirement_type_id"])]
+
+
+def _build_world(cur, rng, tag):
+    """Insert a random world; return its trip ids."""
+    type_ids = []
+    for i in range(rng.randint(1, 8)):
+        cur.execute(
+            "INSERT INTO requirement_types (key, display_name) VALUES (%s, %s) RETURNING id",
+            (f"chk_{tag}_{i}", f"{rng.choice(_NAMES)} {tag}"),  # repeats: ties in display_name
+        )
+        type_ids.append(cur.fetchone()["id"])
+    activities = [f"{a}_{tag}" for a in _ACTIVITIES]
+    for activity in activities:
+        for type_id in rng.sample(type_ids, rng.randint(0, len(type_ids))):
+            rule = rng.choice(("per_group", "per_person", "per_N_persons"))
+            cur.execute(
+                """INSERT INTO activity_requirements (activity_type, requirement_type_id, rule, quantity, n_persons)
+                   VALUES (%s, %s, %s, %s, %s)""",
+                (activity, type_id, rule, rng.randint(0, 5), rng.randint(1, 6) if rule == "per_N_persons" else None),
+            )
+    users = []
+    for i in range(rng.randint(1, 10)):
+        cur.execute(
+            "INSERT INTO users (username, password_hash) VALUES (%s, 'x') RETURNING id", (f"chk_{tag}_{i}",)
+        )
+        users.append(cur.fetchone()["id"])
+    gear = []
+    for i in range(rng.randint(0, 30)):
+        cur.execute(
+            """INSERT INTO gear (user_id, type, name, requirement_type_id, capacity_persons)
+               VALUES (%s, 'thing', %s, %s, %s) RETURNING id""",
+            (
+                rng.choice(users),
+                f"gear {i}",
+                rng.choice(type_ids + [None]),
+                rng.choice((None, None, 1, 2, 3, 4, 6)),
+            ),
+        )
+        gear.append(cur.fetchone()["id"])
+    trips = []
+    for i in range(rng.randint(1, 6)):
+        activity = rng.choice(activities + ["", "   ", f"unknown_{tag}"])
+        activity = rng.choice(_PADDING) + activity + rng.choice(_PADDING)
+        creator = rng.choice(users)
+        cur.execute(
+            """INSERT INTO trips (creator_id, trip_name, trail_name, activity_type)
+               VALUES (%s, %s, 'trail', %s) RETURNING id""",
+            (creator, f"trip {i}", activity),
+        )
+        trip_id = cur.fetchone()["id"]
+        trips.append(trip_id)
+        for user_id in rng.sample(users, rng.randint(0, min(8, len(users)))):
+            cur.execute("INSERT INTO trip_collaborators (trip_id, user_id) VALUES (%s, %s)", (trip_id, user_id))
+        for gear_id in rng.sample(gear, rng.randint(0, len(gear))):
+            cur.execute("INSERT INTO trip_gear (trip_id, gear_id) VALUES (%s, %s)", (trip_id, gear_id))
+    return trips
+
+
+def _check_case(case_seed, tag):
+    """Build one random world and compare every trip in it; False (after printing why) on a difference."""
+    rng = random.Random(case_seed)
+    with get_cursor() as cur:
+        trips = _build_world(cur, rng, tag)
+    batch = db.get_trip_requirement_summaries(trips + [-1])
+    for trip_id in trips:
+        expected = reference_summary(trip_id)
+        if expected:
+            expected = _ties_by_id(expected)
+        got = {
+            "single": db.get_trip_requirement_summary(trip_id),
+            "batch": batch.get(trip_id),
+            "dashboard": db.get_trip_dashboard_shared(trip_id)["checklist"],
+        }
+        for label, value in got.items():
+            if value != expected:
+                print(f"MISMATCH ({label}) case seed {case_seed}, trip {trip_id}")
+                print(f"  expected {expected}")
+                print(f"  got      {value}")
+                return False
+    if -1 in batch or db.get_trip_requirement_summary(-1) is not None:
+        print("MISMATCH: missing trip reported")
+        return False
+    return True
+
+
+def check(cases, seed):
+    for case in range(cases):
+        unit = begin_unit_of_work()
+        try:
+            if not _check_case(seed * 1_000_003 + case, f"{seed}_{case}"):
+                return False
+        finally:
+            unit.finish()  # rolls back everything the case created
+    print(f"{cases} cases OK")
+    return True
+
+
+def main():
+    cases = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    sys.exit(0 if check(cases, seed) else 1)
+
+
+if __name__ == "__main__":
+    main()
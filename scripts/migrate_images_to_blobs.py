@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+TrailFeathers - Move uploaded images out of BYTEA columns into the blob store (after migration 015).
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+Usage: DATABASE_URL=... [BLOB_STORE=... BLOB_DIR=...] python scripts/migrate_images_to_blobs.py [--batch N] [--drop-columns]
+Copies user_trip_reports.image and user_profiles.avatar into db.blobs, records the key in image_hash /
+avatar_hash (unless a newer upload already set it) and clears the BYTEA value, N rows per transaction
+(default 10; rows hold up to 5MB). Safe to re-run, also while the app runs (it moves the same images on
+first read; db.legacy_images). With --drop-columns, once no BYTEA data is left the image and avatar
+columns are dropped; restart the app afterwards (it only rechecks for them once a minute).
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from db import get_cursor, unit_of_work  # noqa: E402
+from db.blobs import blob_store  # noqa: E402
+
+# table, id column, BYTEA column, hash column, media type column
+_TABLES = (
+    ("user_trip_reports", "id", "image", "image_hash", "image_media_type"),
+    ("user_profiles", "user_id", "avatar", "avatar_hash", "avatar_media_type"),
+)
+
+
+def _has_column(cur, table, column):
+    cur.execute(
+        """SELECT 1 FROM information_schema.columns
+           WHERE table_schema = 'public' AND table_name = %s AND column_name = %s""",
+        (table, column),
+    )
+    return cur.fetchone() is not None
+
+
+def move(table, id_col, data_col, hash_col, media_col, batch):
+    moved = 0
+    while True:
+        with unit_of_work():
+            with get_cursor() as cur:
+                if not _has_column(cur, table, data_col):
+                    print(f"{table}.{data_col}: already dropped")
+                    return
+                cur.execute(
+                    f"""SELECT {id_col} AS id, {data_col} AS data, {media_col} AS media_type
+                        FROM {table} WHERE {data_col} IS NOT NULL
+                        ORDER BY {id_col} LIMIT %s FOR UPDATE""",
+                    (batch,),
+                )
+                rows = cur.fetchall()
+                if not rows:
+                    break
+                for r in rows:
+                    data = r["data"]
+                    if isinstance(data, memoryview):
+                        data = data.tobytes()
+                    key = blob_store.put(bytes(data), r["media_type"])
+                    cur.execute(
+                        f"""UPDATE {table}
+                            SET {hash_col} = COALESCE({hash_col}, %s), {data_col} = NULL
+                            WHERE {id_col} = %s""",
+                        (key, r["id"]),
+                    )
+                moved += len(rows)
+        print(f"{table}: moved {moved}")
+    print(f"{table}: done, {moved} images moved")
+
+
+def drop_columns():
+    with unit_of_work():
+        with get_cursor() as cur:
+            for table, _, data_col, _, _ in _TABLES:
+                if not _has_column(cur, table, data_col):
+                    continue
+                cur.execute(f"SELECT count(*) AS n FROM {table} WHERE {data_col} IS NOT NULL")
+                left = cur.fetchone()["n"]
+                if left:
+                    raise SystemExit(f"{table}.{data_col} still has {left} values; not dropping")
+                cur.execute(f"ALTER TABLE {table} DROP COLUMN {data_col}")
+                print(f"dropped {table}.{data_col}")
+
+
+def main():
+    args = sys.argv[1:]
+    batch = int(args[args.index("--batch") + 1]) if "--batch" in args else 10
+    for spec in _TABLES:
+        move(*spec, batch)
+    if "--drop-columns" in args:
+        drop_columns()
+
+
+if __name__ == "__main__":
+    main()
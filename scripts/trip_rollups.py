@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+TrailFeathers - Rebuild or check the trigger-maintained trip_rollups table (migration 017).
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+Usage: DATABASE_URL=... python scripts/trip_rollups.py check [--limit N] [--repair]
+       DATABASE_URL=... python scripts/trip_rollups.py rebuild [--batch N]
+check compares every trip's stored rollup with one computed from trip_gear, trip_collaborators and gear
+(trip_rollups_live), prints up to N differences (default 20) and exits 1 if there are any; --repair
+recomputes those trips. rebuild recomputes all trips, N per transaction (default 500).
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from db import check_trip_rollups, rebuild_trip_rollups, repair_trip_rollups  # noqa: E402
+
+_FIELDS = ("head_count", "coverage", "member_weight_oz", "total_weight_oz")
+
+
+def _option(args, name, default):
+    return int(args[args.index(name) + 1]) if name in args else default
+
+
+def check(args):
+    rows = check_trip_rollups(limit=_option(args, "--limit", 20))
+    for row in rows:
+        diffs = [f"{f}: {row[f]!r} != live {row['live_' + f]!r}" for f in _FIELDS if row[f] != row["live_" + f]]
+        print(f"trip {row['trip_id']}: " + "; ".join(diffs))
+    if not rows:
+        print("trip_rollups consistent")
+        return 0
+    if "--repair" in args:
+        repair_trip_rollups([row["trip_id"] for row in rows])
+        print(f"repaired {len(rows)} trips; run check again to look for more")
+    return 1
+
+
+def main():
+    args = sys.argv[1:]
+    if not args or args[0] not in ("check", "rebuild"):
+        print(__doc__.strip().split("\n\n", 1)[1])
+        return 2
+    if args[0] == "rebuild":
+        print(f"rebuilt {rebuild_trip_rollups(batch=_option(args, '--batch', 500))} trips")
+        return 0
+    return check(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,8 +7,9 @@
  * Loads trip by ?id=; fetches /api/trips/<id>/dashboard. Renders trip info, weather, map, notes, team, gear pool.
  * Renders: trip info, weather (via /api/locations/weather), map (Google embed if coords), trail report
  * summary (AI summary / report 1 / report 2), notes (editable), team (members + invite), gear pool
- * and assigned gear, requirement checklist. View toggle: "Trip" vs "Pack" (shows gear block, hides
- * summary/notes/team). Uses API_BASE (config.js), escapeHtml and getWeatherIcon (utils.js).
+ * ("Add All" assigns an owner's remaining gear in one request) and assigned gear, requirement checklist.
+ * View toggle: "Trip" vs "Pack" (shows gear block, hides summary/notes/team). Uses API_BASE (config.js),
+ * escapeHtml and getWeatherIcon (utils.js).
  * Edit/delete/leave trip buttons call window.openEditTripModal, window.tripsDeleteTrip, window.tripsLeaveTrip.
  */
 import { API_BASE } from "./config.js";
@@ -425,8 +426,12 @@ document.addEventListener("DOMContentLoaded", () => {
           const editLink = isCurrentUser
             ? `<a href="inventory.html" class="gear-owner-edit-link">Edit My Gear</a>`
             : "";
+          const unassignedIds = items.filter((item) => !item.is_assigned).map((item) => item.id);
+          const addAllButton = unassignedIds.length > 1
+            ? `<button type="button" class="btn-small btn-add-all-gear" data-gear-ids="${unassignedIds.join(",")}">Add All</button>`
+            : "";
           return `<div class="gear-owner-section">
-            <h4 class="gear-owner-heading"><span>${escapeHtml(owner)}'s Gear</span>${editLink}</h4>
+            <h4 class="gear-owner-heading"><span>${escapeHtml(owner)}'s Gear</span>${editLink}${addAllButton}</h4>
             <ul class="gear-pool-items">
               ${items.map((item) => {
                 const isAssigned = item.is_assigned;
@@ -460,6 +465,25 @@ document.addEventListener("DOMContentLoaded", () => {
             } catch (_) {}
           });
         });
+        // One request for all of an owner's unassigned gear (POST /api/trips/<id>/gear with gear_ids)
+        poolList.querySelectorAll(".btn-add-all-gear").forEach((btn) => {
+          btn.addEventListener("click", async () => {
+            const gearIds = btn.getAttribute("data-gear-ids").split(",").map(Number);
+            btn.disabled = true;
+            try {
+              const r = await fetch(API_BASE + "/api/trips/" + tripIdParam + "/gear", {
+                method: "POST",
+                credentials: "include",
+                headers: { "Content-Type": "application/json" },
+                body: JSON.stringify({ gear_ids: gearIds }),
+              });
+              if (r.ok) loadTripDashboard();
+              else btn.disabled = false;
+            } catch (_) {
+              btn.disabled = false;
+            }
+          });
+        });
         poolList.querySelectorAll(".btn-remove-gear").forEach((btn) => {
           btn.addEventListener("click", async () => {
             const gearId = btn.getAttribute("data-gear-id");
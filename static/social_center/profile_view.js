@@ -96,7 +96,7 @@ function escapeHtml(text) {
           var reportId = (h && (h.latest_report_id || h.image_report_id)) ? (h.latest_report_id || h.image_report_id) : null;
           var imgReportId = (h && h.image_report_id) ? h.image_report_id : null;
           var thumbInner = imgReportId
-            ? '<img src="' + API_BASE + '/api/trip-reports/' + encodeURIComponent(imgReportId) + '/image" alt="' + escapeHtml(name) + ' photo" />'
+            ? '<img src="' + API_BASE + '/api/trip-reports/' + encodeURIComponent(imgReportId) + '/image?size=512" alt="' + escapeHtml(name) + ' photo" />'
             : '<span class="top-four-thumb-placeholder">Photo</span>';
           var thumb = reportId
             ? '<a class="top-four-thumb" href="trip_report_view.html?id=' + encodeURIComponent(reportId) + '" aria-label="View trip report for ' + escapeHtml(name) + '">' + thumbInner + '</a>'
@@ -292,7 +292,7 @@ function getLocationsOptionsHtml(locations, excludeIds = []) {
         const reportId = s && (s.latest_report_id || s.image_report_id) ? (s.latest_report_id || s.image_report_id) : null;
         const imgReportId = s && s.image_report_id ? s.image_report_id : null;
         const thumbInner = imgReportId
-          ? '<img src="' + API_BASE + '/api/trip-reports/' + encodeURIComponent(imgReportId) + '/image" alt="' + escapeHtml(name) + ' photo" />'
+          ? '<img src="' + API_BASE + '/api/trip-reports/' + encodeURIComponent(imgReportId) + '/image?size=512" alt="' + escapeHtml(name) + ' photo" />'
           : '<span class="top-four-thumb-placeholder">Photo</span>';
         const thumb = reportId
           ? '<a class="top-four-thumb" href="trip_report_view.html?id=' + encodeURIComponent(reportId) + '" aria-label="View trip report for ' + escapeHtml(name) + '">' + thumbInner + '</a>'
@@ -67,7 +67,7 @@
       var reportPlaceholder = document.getElementById("report-image-placeholder");
       if (data.image_uploaded && reportId) {
         if (reportPhoto) {
-          reportPhoto.src = API_BASE + "/api/trip-reports/" + reportId + "/image";
+          reportPhoto.src = API_BASE + "/api/trip-reports/" + reportId + "/image" + (data.image_version ? "?v=" + data.image_version : "");
           reportPhoto.alt = data.title || "Trip report photo";
           reportPhoto.classList.remove("hidden");
         }
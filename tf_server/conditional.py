@@ -0,0 +1,46 @@
+"""
+TrailFeathers - Conditional GET: strong ETags from data versions, 304 without building the body.
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+A route computes a cheap version of the data behind its response (db.versions) and passes it with a
+function that builds the response:
+
+    return conditional(wishlist_version(user["id"]), build)
+
+The ETag hashes the version with the request path and query string (and the deployed commit, so a
+release that changes a payload's shape invalidates old tags). If the request's If-None-Match holds
+it, an empty 304 is returned and build() never runs; otherwise build()'s 200 response is tagged.
+Responses are Cache-Control: private, no-cache, so browsers keep them but revalidate every time.
+"""
+import hashlib
+import os
+
+from flask import make_response, request
+
+_RELEASE = os.getenv("RENDER_GIT_COMMIT", "")
+_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(version):
+    """Strong ETag for this request's URL at version."""
+    raw = repr((_RELEASE, request.path, request.query_string, version))
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+def conditional(version, build):
+    """Answer 304 if the client has the current version, else return build()'s response with an ETag.
+    version None means unknown: build() runs and the response is not tagged."""
+    if version is None:
+        return build()
+    etag = make_etag(version)
+    if request.if_none_match.contains(etag):
+        response = make_response("", 304)
+    else:
+        response = make_response(build())
+        if response.status_code != 200:
+            return response
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = _CACHE_CONTROL
+    return response
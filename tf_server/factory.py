@@ -5,21 +5,66 @@ Authors: Kim, Smith, Domst, and Snider
 Last updated: 3/13/26
 """
 import os
+import tempfile
 from datetime import timedelta
 
 from flask import Flask
 from flask_cors import CORS
+from flask_session import Session
 
 from auth import login
+from db import MAX_TRIP_REPORT_IMAGE_BYTES
+
+from .uploads import MULTIPART_OVERHEAD, UploadRequest
+
+
+def _configure_session_store(app):
+    """Keep session data (user, gear, friends, trips caches) server-side when SESSION_TYPE is set; the
+    cookie then holds only a signed id.
+
+    SESSION_TYPE env: unset or cookie for Flask's built-in signed-cookie session (survives deploys and
+    restarts), filesystem (SESSION_FILE_DIR, defaults to a temp dir), redis (REDIS_URL) or sqlalchemy
+    (SESSION_SQLALCHEMY_URL, e.g. sqlite:///sessions.db or postgresql+psycopg://...). On Render a
+    filesystem store needs SESSION_FILE_DIR on a persistent disk: its temp dir is wiped on every deploy
+    and not shared between instances.
+    """
+    session_type = os.getenv("SESSION_TYPE", "cookie").strip().lower()
+    if session_type == "cookie":
+        return
+    if session_type == "filesystem" and os.getenv("RENDER") and not os.getenv("SESSION_FILE_DIR"):
+        raise RuntimeError(
+            "On Render the default session directory is on ephemeral disk: point SESSION_FILE_DIR at a "
+            "persistent disk, or use SESSION_TYPE=redis, sqlalchemy or cookie."
+        )
+    app.config["SESSION_TYPE"] = session_type
+    app.config["SESSION_USE_SIGNER"] = True
+    app.config["SESSION_KEY_PREFIX"] = "tf_session:"
+    if session_type == "filesystem":
+        app.config["SESSION_FILE_DIR"] = os.getenv(
+            "SESSION_FILE_DIR", os.path.join(tempfile.gettempdir(), "trailfeathers_sessions")
+        )
+    elif session_type == "redis":
+        import redis
+
+        app.config["SESSION_REDIS"] = redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    elif session_type == "sqlalchemy":
+        from flask_sqlalchemy import SQLAlchemy
+
+        app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("SESSION_SQLALCHEMY_URL", "sqlite:///sessions.db")
+        app.config["SESSION_SQLALCHEMY"] = SQLAlchemy(app)
+    Session(app)
 
 
 def create_app():
     app = Flask(__name__)
+    app.request_class = UploadRequest  # file uploads stream into bounded spools
 
     # ----------------------
     # Config
     # ----------------------
     app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "dev-insecure-secret-key-change-me")
+    # Largest request body: one trip report image plus multipart framing; larger ones get 413 unread
+    app.config["MAX_CONTENT_LENGTH"] = MAX_TRIP_REPORT_IMAGE_BYTES + MULTIPART_OVERHEAD
 
     app.config["SESSION_PERMANENT"] = True
     app.config["PERMANENT_SESSION_LIFETIME"] = timedelta(days=1)
@@ -27,6 +72,7 @@ def create_app():
     # SameSite=None so cookie is sent on cross-origin requests (GitHub Pages → Render); requires Secure
     app.config["SESSION_COOKIE_SAMESITE"] = "None" if os.getenv("RENDER") else "Lax"
     app.config["SESSION_COOKIE_SECURE"] = bool(os.getenv("RENDER"))
+    _configure_session_store(app)
 
     # ----------------------
     # CORS (sessions!)
@@ -47,6 +93,13 @@ def create_app():
         origins=origins,
     )
 
+    # ----------------------
+    # One DB transaction per request (shared by all db helpers)
+    # ----------------------
+    from .unit_of_work import register as register_unit_of_work
+
+    register_unit_of_work(app)
+
     # ----------------------
     # Preflight OPTIONS must return 2xx for CORS
     # ----------------------
@@ -59,7 +112,6 @@ def create_app():
     # ----------------------
     # Point login at this app and register auth view functions here so they're on the same app we run
     login.app = app
-    login.bcrypt.init_app(app)
     app.add_url_rule("/api/signup", view_func=login.signup, methods=["POST"])
     app.add_url_rule("/api/login", view_func=login.login_route, methods=["POST"])
     app.add_url_rule("/api/logout", view_func=login.logout_route, methods=["POST"])
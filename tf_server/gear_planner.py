@@ -0,0 +1,159 @@
+"""
+TrailFeathers - Gear assignment planner: which pool gear to bring, and who carries it.
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+plan_gear() works from a trip dashboard payload (db.get_trip_dashboard_shared: checklist, gear_pool,
+assigned_gear, collaborators). Gear already assigned stays; for every checklist requirement that is
+short it picks unassigned pool gear of that requirement type covering the shortfall at the least
+total weight (coverage per item: capacity_persons, 1 if NULL). Each requirement is a small 0/1
+covering knapsack, solved exactly by dynamic programming over the persons still needed; once the
+time budget is spent the remaining ones use a greedy pick (lightest per person covered first, then
+drop what isn't needed). Picked items then go to carriers by longest-processing-time: heaviest first,
+each to the member carrying least so far (counting what they already carry), the owner on ties.
+
+Gear without weight_oz counts as heavy as the heaviest known item of its type (1 oz if none is
+known), so it is not mistaken for free.
+"""
+import time
+
+DEFAULT_TIME_BUDGET_MS = 200
+MAX_TIME_BUDGET_MS = 2000
+_INF = float("inf")
+
+
+def _coverage(item):
+    cap = item.get("capacity_persons")
+    return cap if cap is not None else 1
+
+
+def _cover_exact(items, need, deadline):
+    """Subset of items [(coverage, weight, item)] covering need at least weight (fewest items on ties),
+    or None if the deadline passes first."""
+    best = [(_INF, 0)] * (need + 1)
+    chain = [None] * (need + 1)  # state -> (item index, chain of the state it came from)
+    best[0] = (0.0, 0)
+    for idx, (cov, weight, _) in enumerate(items):
+        if time.monotonic() > deadline:
+            return None
+        for c in range(need - 1, -1, -1):  # descending: each item used at most once
+            w, n = best[c]
+            if w == _INF:
+                continue
+            target = min(need, c + cov)
+            candidate = (w + weight, n + 1)
+            if candidate < best[target]:
+                best[target] = candidate
+                chain[target] = (idx, chain[c])
+    picked = []
+    node = chain[need]
+    while node is not None:
+        picked.append(items[node[0]])
+        node = node[1]
+    return picked
+
+
+def _cover_greedy(items, need):
+    """Lightest weight per person covered first until need is met, then drop (heaviest first) any
+    item the rest still cover without."""
+    picked = []
+    covered = 0
+    for entry in sorted(items, key=lambda e: (e[1] / e[0], e[1])):
+        if covered >= need:
+            break
+        picked.append(entry)
+        covered += entry[0]
+    for entry in sorted(picked, key=lambda e: -e[1]):
+        if covered - entry[0] >= need:
+            picked.remove(entry)
+            covered -= entry[0]
+    return picked
+
+
+def _carried_weights(assigned, members):
+    """Ounces each member already carries (assigned_to_user_id; unknown weights as 0)."""
+    loads = {m: 0.0 for m in members}
+    for g in assigned:
+        carrier = g.get("assigned_to_user_id")
+        if carrier in loads:
+            loads[carrier] += float(g.get("weight_oz") or 0) * (g.get("quantity") or 1)
+    return loads
+
+
+def plan_gear(dashboard, time_budget_ms=DEFAULT_TIME_BUDGET_MS):
+    """Propose gear to add so every checklist requirement is met. Returns a dict:
+    assignments [{gear_id, name, requirement_type_id, coverage, weight_oz, weight_known, owner_user_id,
+    owner_username, carrier_user_id, carrier_username}], requirements [{requirement_type_id,
+    requirement_display_name, required_count, covered_before, covered_after, status}], added_weight_oz,
+    carried_weight_oz {user_id: oz after the plan}, exact (False if any requirement fell back to greedy),
+    elapsed_ms."""
+    start = time.monotonic()
+    deadline = start + min(max(time_budget_ms, 0), MAX_TIME_BUDGET_MS) / 1000
+    members = {c["id"]: c["username"] for c in dashboard.get("collaborators") or []}
+    available = {}
+    for g in dashboard.get("gear_pool") or []:
+        if not g.get("is_assigned") and g.get("requirement_type_id") is not None:
+            available.setdefault(g["requirement_type_id"], []).append(g)
+
+    exact = True
+    picked = []
+    requirements = []
+    for req in dashboard.get("checklist") or []:
+        rt_id = req["requirement_type_id"]
+        need = req["required_count"] - req["covered_count"]
+        added = 0
+        if need > 0 and available.get(rt_id):
+            candidates = available.pop(rt_id)  # one checklist row per type, but never pick twice
+            known = [float(g["weight_oz"]) for g in candidates if g.get("weight_oz") is not None]
+            fallback = max(known) if known else 1.0
+            items = [
+                (_coverage(g), float(g["weight_oz"]) if g.get("weight_oz") is not None else fallback, g)
+                for g in candidates
+            ]
+            if sum(cov for cov, _, _ in items) <= need:
+                chosen = items  # everything there is, and still maybe short
+            else:
+                chosen = _cover_exact(items, need, deadline) if exact else None
+                if chosen is None:
+                    exact = False
+                    chosen = _cover_greedy(items, need)
+            picked.extend(chosen)
+            added = sum(cov for cov, _, _ in chosen)
+        covered_after = req["covered_count"] + added
+        requirements.append({
+            "requirement_type_id": rt_id,
+            "requirement_display_name": req.get("requirement_display_name"),
+            "required_count": req["required_count"],
+            "covered_before": req["covered_count"],
+            "covered_after": covered_after,
+            "status": "met" if covered_after >= req["required_count"] else "short",
+        })
+
+    loads = _carried_weights(dashboard.get("assigned_gear") or [], members)
+    assignments = []
+    for cov, weight, g in sorted(picked, key=lambda e: (-e[1], e[2]["id"])):
+        owner = g["user_id"]
+        carrier = min(loads, key=lambda m: (loads[m], m != owner, m)) if loads else owner
+        if carrier in loads:
+            loads[carrier] += weight
+        assignments.append({
+            "gear_id": g["id"],
+            "name": g.get("name"),
+            "requirement_type_id": g["requirement_type_id"],
+            "coverage": cov,
+            "weight_oz": weight,
+            "weight_known": g.get("weight_oz") is not None,
+            "owner_user_id": owner,
+            "owner_username": g.get("owner_username"),
+            "carrier_user_id": carrier,
+            "carrier_username": members.get(carrier),
+        })
+    return {
+        "assignments": assignments,
+        "requirements": requirements,
+        "added_weight_oz": round(sum(a["weight_oz"] for a in assignments), 2),
+        "carried_weight_oz": {m: round(w, 2) for m, w in loads.items()},
+        "exact": exact,
+        "elapsed_ms": round((time.monotonic() - start) * 1000, 2),
+    }
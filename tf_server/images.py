@@ -0,0 +1,73 @@
+"""
+TrailFeathers - Serving uploaded images from the blob store (db.blobs).
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+send_blob() answers an image request for a blob key. Local blobs go through send_file (sendfile when
+Gunicorn can, Range and If-None-Match/If-Modified-Since handled by Werkzeug); S3 blobs redirect to a
+presigned URL, and the redirect itself is cached only briefly. The ETag is the content hash. A URL
+whose ?v= matches the current hash (see image_version) can never point at other bytes, so it is
+cached as immutable for a year; unversioned URLs keep the old one-hour cache.
+
+send_image() adds ?size=128|512|1280: a downscaled variant (db.image_variants), WebP when the
+browser accepts it, else JPEG. The original is served when it is already that small or Pillow is
+not installed.
+"""
+from flask import jsonify, redirect, request, send_file
+
+from db.blobs import blob_store
+from db.image_variants import VARIANT_SIZES, variant
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "public, max-age=3600"
+_PRESIGNED_TTL = 3600
+_REDIRECT_CACHE_CONTROL = "private, max-age=300"
+_VERSION_LENGTH = 16
+
+
+def image_version(key):
+    """Short form of a blob key for ?v= in image URLs."""
+    return key[:_VERSION_LENGTH] if key else None
+
+
+def send_blob(key, media_type, private=False, version_key=None):
+    """Response serving blob key as media_type. private=True for per-user responses. version_key is
+    the blob ?v= refers to, if not key itself (e.g. the source of a variant)."""
+    versioned = request.args.get("v") == image_version(version_key or key)
+    cache_control = IMMUTABLE_CACHE_CONTROL if versioned else DEFAULT_CACHE_CONTROL
+    if private:
+        cache_control = cache_control.replace("public", "private")
+    path = blob_store.local_path(key)
+    if path is None:
+        url = blob_store.url(key, expires=_PRESIGNED_TTL)
+        if url is None:
+            response = jsonify(error="Image missing")
+            response.status_code = 404
+            return response
+        response = redirect(url, 302)
+        response.headers["Cache-Control"] = _REDIRECT_CACHE_CONTROL
+        return response
+    response = send_file(path, mimetype=media_type, conditional=True, etag=key)
+    response.headers["Cache-Control"] = cache_control
+    return response
+
+
+def send_image(key, media_type, private=False):
+    """send_blob for an uploaded image, honoring ?size= (400 if not one of VARIANT_SIZES)."""
+    size = request.args.get("size")
+    if not size:
+        return send_blob(key, media_type, private)
+    try:
+        size = int(size)
+        if size not in VARIANT_SIZES:
+            raise ValueError
+    except ValueError:
+        return jsonify(error=f"size must be one of {', '.join(map(str, VARIANT_SIZES))}"), 400
+    fmt = "webp" if "image/webp" in request.headers.get("Accept", "") else "jpeg"
+    found = variant(key, size, fmt)
+    if found is None:
+        return send_blob(key, media_type, private)
+    response = send_blob(found[0], found[1], private, version_key=key)
+    response.vary.add("Accept")
+    return response
@@ -7,7 +7,7 @@ Last updated: 3/13/26
 Friend requests: send, list incoming, accept, decline, cancel; friends list (from session cache);
 remove friend. Favorites: list, add, remove. Endpoints under /api/friends and /api/me/favorites.
 """
-from flask import jsonify, request, session
+from flask import jsonify, request
 
 from db import (
     accept_friend_request,
@@ -15,6 +15,7 @@ from db import (
     cancel_friend_request,
     create_friend_request,
     decline_friend_request,
+    favorites_version,
     get_user_by_username,
     list_favorite_hikes,
     list_incoming_requests,
@@ -22,9 +23,11 @@ from db import (
     remove_friend,
 )
 
+from ..conditional import conditional
+
 
 def register(app, login):
-    """Register friends and favorites routes; login for require_auth() and refresh_session_cache()."""
+    """Register friends and favorites routes; login for require_auth() and the session friends cache helpers."""
 
     @app.post("/api/friends/request")
     def send_friend_request():
@@ -67,8 +70,9 @@ def register(app, login):
         user = login.require_auth()
         if not user:
             return jsonify(error="Not logged in"), 401
-        if accept_friend_request(request_id, user["id"]):
-            login.refresh_session_cache(user["id"])
+        friend = accept_friend_request(request_id, user["id"])
+        if friend:
+            login.cache_add_friend(friend)
             return jsonify(ok=True), 200
         return jsonify(error="Request not found or already handled"), 404
 
@@ -86,29 +90,31 @@ def register(app, login):
         user = login.require_auth()
         if not user:
             return jsonify(error="Not logged in"), 401
-        if session.get("friends") is None:
-            login.refresh_session_cache(user["id"])
-        return jsonify(session["friends"])
+        return jsonify(login.session_friends(user["id"]))
 
     @app.get("/api/me/favorites")
     def get_my_favorites():
         user = login.require_auth()
         if not user:
             return jsonify(error="Not logged in"), 401
-        rows = list_favorite_hikes(user["id"])
-        out = []
-        for r in rows:
-            out.append(
-                {
-                    "id": r["id"],
-                    "hike_name": r.get("hike_name") or "",
-                    "distance": r.get("distance"),
-                    "elevation_gain": r.get("elevation_gain"),
-                    "difficulty": r.get("difficulty"),
-                    "source_url": r.get("source_url"),
-                }
-            )
-        return jsonify(out)
+
+        def build():
+            rows = list_favorite_hikes(user["id"])
+            out = []
+            for r in rows:
+                out.append(
+                    {
+                        "id": r["id"],
+                        "hike_name": r.get("hike_name") or "",
+                        "distance": r.get("distance"),
+                        "elevation_gain": r.get("elevation_gain"),
+                        "difficulty": r.get("difficulty"),
+                        "source_url": r.get("source_url"),
+                    }
+                )
+            return jsonify(out)
+
+        return conditional((user["id"], favorites_version(user["id"])), build)
 
     @app.post("/api/me/favorites")
     def post_my_favorites():
@@ -143,7 +149,7 @@ def register(app, login):
         if not user:
             return jsonify(error="Not logged in"), 401
         if remove_friend(user["id"], friend_user_id):
-            login.refresh_session_cache(user["id"])
+            login.cache_remove_friend(friend_user_id)
             return "", 204
         return jsonify(error="Not friends or not found"), 404
 
@@ -153,7 +159,6 @@ def register(app, login):
         if not user:
             return jsonify(error="Not logged in"), 401
         if cancel_friend_request(request_id, user["id"]):
-            login.refresh_session_cache(user["id"])
             return "", 204
         return jsonify(error="Request not found or already handled"), 404
 
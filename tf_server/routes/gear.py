@@ -5,9 +5,9 @@ Authors: Kim, Smith, Domst, and Snider
 Last updated: 3/13/26
 
 Endpoints: POST /api/gear, GET /api/gear (from session cache), GET/PUT/DELETE /api/gear/<id>.
-Session gear cache refreshed on create/update/delete.
+Create/update/delete patch the one affected row in the session gear cache.
 """
-from flask import jsonify, request, session
+from flask import jsonify, request
 
 from db import (
     add_gear_item,
@@ -18,7 +18,7 @@ from db import (
 
 
 def register(app, login):
-    """Register gear routes; login for require_auth() and refresh_session_cache()."""
+    """Register gear routes; login for require_auth() and the session gear cache helpers."""
 
     @app.post("/api/gear")
     def create_gear():
@@ -33,7 +33,9 @@ def register(app, login):
         except ValueError as e:
             return jsonify(error=str(e)), 400
 
-        login.refresh_session_cache(user["id"])
+        item = get_gear_item(item_id, user["id"])
+        if item:
+            login.cache_add_gear(item)
         return jsonify(ok=True, id=item_id), 201
 
     @app.get("/api/gear")
@@ -41,9 +43,7 @@ def register(app, login):
         user = login.require_auth()
         if not user:
             return jsonify(error="Not logged in"), 401
-        if session.get("gear") is None:
-            login.refresh_session_cache(user["id"])
-        return jsonify(session["gear"])
+        return jsonify(login.session_gear(user["id"]))
 
     @app.get("/api/gear/<int:gear_id>")
     def get_gear_by_id(gear_id):
@@ -68,8 +68,8 @@ def register(app, login):
         payload = request.get_json(silent=True) or {}
         try:
             update_gear_item(gear_id, user["id"], payload)
-            login.refresh_session_cache(user["id"])
             item = get_gear_item(gear_id, user["id"])
+            login.cache_replace_gear(item)
             row = dict(item)
             if row.get("created_at") and hasattr(row["created_at"], "isoformat"):
                 row["created_at"] = row["created_at"].isoformat()
@@ -86,7 +86,7 @@ def register(app, login):
             return jsonify(error="Not logged in"), 401
         try:
             delete_gear_item(gear_id, user["id"])
-            login.refresh_session_cache(user["id"])
+            login.cache_remove_gear(gear_id)
             return "", 204
         except ValueError:
             return jsonify(error="Not found"), 404
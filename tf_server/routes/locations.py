@@ -3,10 +3,202 @@ TrailFeathers - Locations (hike catalog) API: GET /api/locations returns trip_re
 Group: TrailFeathers
 Authors: Kim, Smith, Domst, and Snider
 Last updated: 3/13/26
+
+Without query parameters the whole catalog is returned as a list (what the dropdowns expect). With any
+of q (name prefix), difficulty (comma-separated), min_distance/max_distance (miles),
+min_elevation/max_elevation (feet), sort (name, distance, elevation, highpoint; prefix - for
+descending), limit (1-200, default 50) or cursor, one page is returned as {items, next_cursor};
+pass next_cursor back as cursor for the following page.
+
+GET /api/locations/search?q=...&limit= (1-50, default 20) is ranked free-text search over names,
+summaries and trip reports, tolerant of typos and partial words, with <mark>-highlighted
+hike_name_highlight and snippet.
+
+GET /api/locations/nearby?lat=&lon= (or ?trip_id= for the trip's hike) returns the k (1-50, default
+10) nearest hikes with miles_away. GET /api/locations/bbox?south=&west=&north=&east= returns up to
+limit (1-1000, default 500) hikes inside a map viewport as {items, truncated}.
+
+Catalog-only responses carry an ETag from the catalog's version (tf_server.conditional), so an
+unchanged catalog is revalidated with one query and a 304.
 """
-from flask import jsonify
+import base64
+import json
+import math
+
+from flask import jsonify, request
+
+from db import (
+    get_trip_report_info_for_trip,
+    has_pending_invite_to_trip,
+    list_trip_report_info_for_selection,
+    list_trip_report_info_in_box,
+    nearest_trip_report_info,
+    search_trip_report_info,
+    search_trip_report_info_text,
+    table_version,
+    user_has_trip_access,
+)
+
+from ..conditional import conditional
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 50
+DEFAULT_NEARBY = 10
+MAX_NEARBY = 50
+DEFAULT_BOX_LIMIT = 500
+MAX_BOX_LIMIT = 1000
+_PAGE_PARAMS = (
+    "q", "difficulty", "min_distance", "max_distance", "min_elevation", "max_elevation",
+    "sort", "limit", "cursor",
+)
+
+
+def _location_to_json(r):
+    return {
+        "id": r["id"],
+        "hike_name": r.get("hike_name") or "",
+        "distance": r.get("distance"),
+        "elevation_gain": r.get("elevation_gain"),
+        "difficulty": r.get("difficulty"),
+        "source_url": r.get("source_url"),
+    }
+
+
+def _encode_cursor(sort, after):
+    raw = json.dumps([sort, after[0], after[1]], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor, sort):
+    """Return the (value, id) keyset from a cursor made for the same sort. Raises ValueError."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, value, row_id = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if cursor_sort != sort or not isinstance(row_id, int) or isinstance(row_id, bool):
+        raise ValueError("Cursor does not match this sort")
+    # The value goes into a row comparison against the sort column: text for name, a finite number
+    # (or None, past the end of the values) for the numeric sorts
+    if sort.lstrip("-") == "name":
+        valid = isinstance(value, str)
+    else:
+        valid = value is None or (
+            isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+        )
+    if not valid:
+        raise ValueError("Invalid cursor")
+    return value, row_id
+
+
+def _number_arg(name):
+    value = request.args.get(name)
+    if value is None or value.strip() == "":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number")
+
+
+def _int_arg(name, default, maximum):
+    try:
+        value = int(request.args.get(name) or default)
+    except ValueError:
+        value = 0
+    if not 1 <= value <= maximum:
+        raise ValueError(f"{name} must be between 1 and {maximum}")
+    return value
+
 
-from db import list_trip_report_info_for_selection
+def _geo_location_to_json(r):
+    item = _location_to_json(r)
+    item["latitude"] = r.get("latitude")
+    item["longitude"] = r.get("longitude")
+    if "miles_away" in r:
+        item["miles_away"] = r["miles_away"]
+    return item
+
+
+def _catalog_response():
+    """The whole catalog, or one filtered page of it per the query parameters."""
+    if not any(p in request.args for p in _PAGE_PARAMS):
+        return jsonify([_location_to_json(r) for r in list_trip_report_info_for_selection()])
+
+    sort = (request.args.get("sort") or "name").strip()
+    descending = sort.startswith("-")
+    sort = sort.lstrip("-")
+    try:
+        limit = int(request.args.get("limit") or DEFAULT_PAGE_SIZE)
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError
+    except ValueError:
+        return jsonify(error=f"limit must be between 1 and {MAX_PAGE_SIZE}"), 400
+    try:
+        cursor = request.args.get("cursor")
+        after = _decode_cursor(cursor, request.args.get("sort") or "name") if cursor else None
+        difficulties = [d.strip() for d in (request.args.get("difficulty") or "").split(",") if d.strip()]
+        rows, next_after = search_trip_report_info(
+            name_prefix=(request.args.get("q") or "").strip() or None,
+            difficulties=difficulties or None,
+            min_distance=_number_arg("min_distance"),
+            max_distance=_number_arg("max_distance"),
+            min_elevation=_number_arg("min_elevation"),
+            max_elevation=_number_arg("max_elevation"),
+            sort=sort,
+            descending=descending,
+            after=after,
+            limit=limit,
+        )
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    items = []
+    for r in rows:
+        item = _location_to_json(r)
+        item["distance_miles"] = r.get("distance_miles")
+        item["elevation_gain_feet"] = r.get("elevation_gain_feet")
+        items.append(item)
+    next_cursor = _encode_cursor(request.args.get("sort") or "name", next_after) if next_after else None
+    return jsonify(items=items, next_cursor=next_cursor)
+
+
+def _search_response():
+    """Ranked text search results for q."""
+    try:
+        limit = int(request.args.get("limit") or DEFAULT_SEARCH_LIMIT)
+        if not 1 <= limit <= MAX_SEARCH_LIMIT:
+            raise ValueError
+    except ValueError:
+        return jsonify(error=f"limit must be between 1 and {MAX_SEARCH_LIMIT}"), 400
+    try:
+        rows = search_trip_report_info_text(request.args.get("q"), limit=limit)
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    items = []
+    for r in rows:
+        item = _location_to_json(r)
+        item["distance_miles"] = r.get("distance_miles")
+        item["elevation_gain_feet"] = r.get("elevation_gain_feet")
+        item["rank"] = r.get("rank")
+        item["hike_name_highlight"] = r.get("hike_name_highlight") or ""
+        item["snippet"] = r.get("snippet") or ""
+        items.append(item)
+    return jsonify(items=items)
+
+
+def _box_response():
+    """Hikes inside the south/west/north/east viewport."""
+    try:
+        limit = _int_arg("limit", DEFAULT_BOX_LIMIT, MAX_BOX_LIMIT)
+        edges = {name: _number_arg(name) for name in ("south", "west", "north", "east")}
+        if any(v is None for v in edges.values()):
+            return jsonify(error="south, west, north and east are required"), 400
+        rows, truncated = list_trip_report_info_in_box(limit=limit, **edges)
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    return jsonify(items=[_geo_location_to_json(r) for r in rows], truncated=truncated)
 
 
 def register(app, login):
@@ -14,22 +206,57 @@ def register(app, login):
 
     @app.get("/api/locations")
     def get_locations():
-        """Return location catalog (trip_report_info) for dropdowns."""
+        """Return location catalog (trip_report_info) for dropdowns, or one filtered page of it."""
+        user = login.require_auth()
+        if not user:
+            return jsonify(error="Not logged in"), 401
+        return conditional(table_version("trip_report_info"), _catalog_response)
+
+    @app.get("/api/locations/search")
+    def search_locations():
+        """Return catalog entries matching q, best first."""
         user = login.require_auth()
         if not user:
             return jsonify(error="Not logged in"), 401
-        rows = list_trip_report_info_for_selection()
-        out = []
-        for r in rows:
-            out.append(
-                {
-                    "id": r["id"],
-                    "hike_name": r.get("hike_name") or "",
-                    "distance": r.get("distance"),
-                    "elevation_gain": r.get("elevation_gain"),
-                    "difficulty": r.get("difficulty"),
-                    "source_url": r.get("source_url"),
-                }
-            )
-        return jsonify(out)
+        return conditional(table_version("trip_report_info"), _search_response)
 
+    @app.get("/api/locations/nearby")
+    def get_nearby_locations():
+        """Return the hikes closest to lat/lon or to a trip's hike."""
+        user = login.require_auth()
+        if not user:
+            return jsonify(error="Not logged in"), 401
+        try:
+            k = _int_arg("k", DEFAULT_NEARBY, MAX_NEARBY)
+            exclude_id = None
+            trip_id = request.args.get("trip_id")
+            if trip_id:
+                try:
+                    trip_id = int(trip_id)
+                except ValueError:
+                    return jsonify(error="trip_id must be an integer"), 400
+                if not user_has_trip_access(user["id"], trip_id) and not has_pending_invite_to_trip(
+                    user["id"], trip_id
+                ):
+                    return jsonify(error="Not found"), 404
+                info = get_trip_report_info_for_trip(trip_id)
+                if not info or info.get("latitude") is None or info.get("longitude") is None:
+                    return jsonify(error="no_coordinates"), 200
+                lat, lon, exclude_id = info["latitude"], info["longitude"], info["id"]
+            else:
+                lat = _number_arg("lat")
+                lon = _number_arg("lon")
+                if lat is None or lon is None:
+                    return jsonify(error="lat and lon, or trip_id, are required"), 400
+            rows = nearest_trip_report_info(lat, lon, k=k, exclude_id=exclude_id)
+        except ValueError as e:
+            return jsonify(error=str(e)), 400
+        return jsonify(items=[_geo_location_to_json(r) for r in rows])
+
+    @app.get("/api/locations/bbox")
+    def get_locations_in_box():
+        """Return the hikes inside a map viewport."""
+        user = login.require_auth()
+        if not user:
+            return jsonify(error="Not logged in"), 401
+        return conditional(table_version("trip_report_info"), _box_response)
@@ -9,17 +9,20 @@ Endpoints: GET/PUT /api/me/profile (display_name, bio, avatar_path); GET /api/pr
 and GET /api/users/<username>/avatar (serve avatar bytes); GET /api/users/<username>/profile
 (public profile with top four and trip reports); GET /api/users/<username>/relationship (friend
 status). Uses db: get_user_profile, upsert_user_profile, set_profile_avatar_upload,
-get_profile_avatar_payload, list_top_four_hikes, list_user_trip_reports, get_relationship,
-get_user_by_id, get_user_by_username; PROFILE_AVATAR_DIR_PREFIX. Avatar path validation
+get_profile_avatar_payload, get_avatar_by_username, list_top_four_hikes, list_user_trip_reports,
+get_relationship, get_user_by_id, get_user_by_username; PROFILE_AVATAR_DIR_PREFIX. Avatar URLs in JSON
+carry ?v=<avatar_version>, so browsers cache them as immutable until the avatar changes. Avatar path validation
 restricts to profile_ducks and blocks path traversal. register(app, login) registers all routes.
 """
 import os
 import urllib.parse
 
-from flask import Response, jsonify, request
+from flask import jsonify, request
 
 from db import (
+    MAX_AVATAR_BYTES,
     PROFILE_AVATAR_DIR_PREFIX,
+    get_avatar_by_username,
     get_profile_avatar_payload,
     get_relationship,
     get_user_by_id,
@@ -27,30 +30,39 @@ from db import (
     get_user_profile,
     list_top_four_hikes,
     list_user_trip_reports,
+    public_profile_version,
     set_profile_avatar_upload,
     upsert_user_profile,
 )
 
+from ..conditional import conditional
+from ..images import image_version, send_image
+from ..uploads import UploadRejected, receive_image
+
 
 def register(app, login):
     # ----------------------
     # Profile API
     # ----------------------
     def _profile_avatar_meta(profile, username):
-        """Build avatar fields for JSON: static path and/or upload flag."""
+        """Build avatar fields for JSON: static path and/or upload flag, versioned upload URLs."""
         if not profile:
             return {"avatar_path": None, "avatar_uploaded": False}
         path = profile.get("avatar_path")
         uploaded = bool(profile.get("avatar_uploaded"))
+        version = image_version(profile.get("avatar_hash"))
+        query = "?v=" + version if version else ""
         return {
             "avatar_path": path if path else None,
             "avatar_uploaded": uploaded,
-            "avatar_url_upload": (request.url_root.rstrip("/") + "/api/me/avatar") if uploaded else None,
+            "avatar_version": version,
+            "avatar_url_upload": (request.url_root.rstrip("/") + "/api/me/avatar" + query) if uploaded else None,
             "avatar_url_public": (
                 request.url_root.rstrip("/")
                 + "/api/users/"
                 + urllib.parse.quote(str(username), safe="")
                 + "/avatar"
+                + query
             )
             if uploaded
             else None,
@@ -96,6 +108,7 @@ def register(app, login):
             "bio": (profile.get("bio") if profile else None) or "",
             "avatar_path": avatar_path,
             "avatar_uploaded": avatar_uploaded,
+            "avatar_version": image_version(profile.get("avatar_hash")) if profile else None,
             "top_four": [
                 {
                     "position": r["position"],
@@ -186,19 +199,16 @@ def register(app, login):
 
     @app.post("/api/me/profile/avatar")
     def post_my_profile_avatar():
-        """Upload profile image (multipart file); clears preset path."""
+        """Upload profile image (multipart file, streamed; see tf_server.uploads); clears preset path."""
         user = login.require_auth()
         if not user:
             return jsonify(error="Not logged in"), 401
-        if "file" not in request.files:
-            return jsonify(error="Missing file."), 400
-        f = request.files["file"]
-        if not f or not f.filename:
-            return jsonify(error="Missing file."), 400
-        data = f.read()
-        media_type = f.mimetype or "image/jpeg"
         try:
-            set_profile_avatar_upload(user["id"], data, media_type)
+            image, media_type = receive_image(MAX_AVATAR_BYTES)
+        except UploadRejected as e:
+            return jsonify(error=str(e)), e.status
+        try:
+            set_profile_avatar_upload(user["id"], image, media_type)
         except ValueError as e:
             return jsonify(error=str(e)), 400
         profile = get_user_profile(user["id"])
@@ -211,13 +221,17 @@ def register(app, login):
         user = login.require_auth()
         if not user:
             return jsonify(error="Not logged in"), 401
-        target = get_user_by_username(username)
-        if not target:
-            return jsonify(error="User not found"), 404
-        payload = _public_profile_for_user(target["id"])
-        if not payload:
-            return jsonify(error="User not found"), 404
-        return jsonify(payload)
+
+        def build():
+            target = get_user_by_username(username)
+            if not target:
+                return jsonify(error="User not found"), 404
+            payload = _public_profile_for_user(target["id"])
+            if not payload:
+                return jsonify(error="User not found"), 404
+            return jsonify(payload)
+
+        return conditional(public_profile_version(username), build)
 
     @app.get("/api/me/avatar")
     def get_my_avatar():
@@ -228,26 +242,22 @@ def register(app, login):
         payload = get_profile_avatar_payload(user["id"])
         if not payload:
             return "", 204
-        return Response(
-            payload["bytes"],
-            mimetype=payload["media_type"],
-            headers={"Cache-Control": "private, max-age=3600"},
-        )
+        return send_image(payload["hash"], payload["media_type"], private=True)
 
     @app.get("/api/users/<path:username>/avatar")
     def get_user_avatar(username):
-        """Serve uploaded avatar for user by username. No auth so img src from static pages works cross-origin."""
-        target = get_user_by_username(username)
-        if not target:
+        """Serve uploaded avatar for user by username. No auth so img src from static pages works cross-origin.
+        Cached lookup (db.get_avatar_by_username); a ?v= it doesn't match re-reads the database, since the
+        entry may predate an upload made through another worker."""
+        avatar = get_avatar_by_username(username)
+        version = request.args.get("v")
+        if avatar and version and version != image_version(avatar["hash"]):
+            avatar = get_avatar_by_username(username, fresh=True)
+        if not avatar:
             return jsonify(error="User not found"), 404
-        payload = get_profile_avatar_payload(target["id"])
-        if not payload:
+        if not avatar["hash"]:
             return "", 204
-        return Response(
-            payload["bytes"],
-            mimetype=payload["media_type"],
-            headers={"Cache-Control": "private, max-age=3600"},
-        )
+        return send_image(avatar["hash"], avatar["media_type"], private=True)
 
     @app.get("/api/users/<path:username>/relationship")
     def get_user_relationship(username):
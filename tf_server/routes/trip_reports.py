@@ -7,9 +7,10 @@ Last updated: 3/13/26
 Endpoints: GET/POST /api/me/trip-reports, GET/PUT/DELETE /api/me/trip-reports/<id>, POST image,
 GET /api/trip-reports/<id> and /image (no auth for img src).
 """
-from flask import Response, jsonify, request
+from flask import jsonify, request
 
 from db import (
+    MAX_TRIP_REPORT_IMAGE_BYTES,
     create_user_trip_report,
     delete_user_trip_report,
     get_trip_report_image_payload,
@@ -19,6 +20,9 @@ from db import (
     update_user_trip_report,
 )
 
+from ..images import image_version, send_image
+from ..uploads import UploadRejected, receive_image
+
 
 def register(app, login):
     """Register trip report routes; login used for require_auth()."""
@@ -108,6 +112,7 @@ def register(app, login):
             else report.get("created_at"),
             "is_owner": is_owner,
             "image_uploaded": image_uploaded,
+            "image_version": image_version(report.get("image_hash")),
         }
         return jsonify(out)
 
@@ -150,19 +155,16 @@ def register(app, login):
 
     @app.post("/api/me/trip-reports/<int:report_id>/image")
     def post_trip_report_image(report_id):
-        """Upload trip report image (multipart file). Owner only. Max 5MB."""
+        """Upload trip report image (multipart file, streamed; see tf_server.uploads). Owner only. Max 5MB."""
         user = login.require_auth()
         if not user:
             return jsonify(error="Not logged in"), 401
-        if "file" not in request.files:
-            return jsonify(error="Missing file."), 400
-        f = request.files["file"]
-        if not f or not f.filename:
-            return jsonify(error="Missing file."), 400
-        data = f.read()
-        media_type = f.mimetype or "image/jpeg"
         try:
-            set_trip_report_image_upload(report_id, user["id"], data, media_type)
+            image, media_type = receive_image(MAX_TRIP_REPORT_IMAGE_BYTES)
+        except UploadRejected as e:
+            return jsonify(error=str(e)), e.status
+        try:
+            set_trip_report_image_upload(report_id, user["id"], image, media_type)
         except ValueError as e:
             return jsonify(error=str(e)), 400
         return jsonify({"ok": True})
@@ -173,11 +175,7 @@ def register(app, login):
         payload = get_trip_report_image_payload(report_id)
         if not payload:
             return "", 204
-        return Response(
-            payload["bytes"],
-            mimetype=payload["media_type"],
-            headers={"Cache-Control": "public, max-age=3600"},
-        )
+        return send_image(payload["hash"], payload["media_type"])
 
     @app.delete("/api/me/trip-reports/<int:report_id>")
     def delete_my_trip_report(report_id):
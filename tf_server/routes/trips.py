@@ -4,28 +4,31 @@ Group: TrailFeathers
 Authors: Kim, Smith, Domst, and Snider
 Last updated: 3/13/26
 
-Session cache used for trips list and dashboard; login.refresh_session_cache / invalidate_trip_dashboard_cache.
+Session cache used for trips list; mutations patch the affected trip (login.cache_*_trip). The dashboard's shared part is cached
+server-side per trip (db.get_cached_trip_dashboard_shared); db mutations invalidate it for all members.
 """
-import json
-import urllib.error
-import urllib.request
-from datetime import datetime
+from datetime import date, timedelta
 
-from flask import jsonify, request, session
+from flask import jsonify, request
 
 from db import (
     accept_trip_invite,
     assign_gear_to_trip,
+    assign_gear_to_trip_many,
     cancel_trip_invite,
     create_trip,
     create_trip_invite,
     decline_trip_invite,
     delete_trip,
+    get_cached_trip_dashboard_shared,
     get_trip,
     get_trip_assigned_gear,
+    get_trip_dashboard_shared,
+    get_trip_dashboard_viewer,
     get_trip_gear_pool,
     get_trip_id_for_invite,
     get_trip_report_info_for_trip,
+    get_trip_requirement_summaries,
     get_trip_requirement_summary,
     get_user_by_username,
     has_pending_invite_to_trip,
@@ -35,15 +38,79 @@ from db import (
     list_requirement_types,
     list_trip_collaborators,
     list_trip_invites_pending,
+    list_trip_readiness,
+    list_trip_weather_locations,
+    release_connection,
     remove_trip_collaborator,
+    table_version,
     unassign_gear_from_trip,
+    unassign_gear_from_trip_many,
     update_trip,
     user_has_trip_access,
 )
 
+from ..conditional import conditional
+from ..gear_planner import DEFAULT_TIME_BUDGET_MS, plan_gear
+from ..weather import (
+    forecast_for_date,
+    forecast_key,
+    get_forecast_periods_many,
+    pick_forecast_period,
+    prefetch_forecasts,
+)
+
+MAX_WEATHER_BATCH = 100
+MAX_CHECKLIST_BATCH = 200
+MAX_GEAR_BATCH = 500
+FORECAST_DAYS = 7  # NWS grid forecasts cover about a week
+_BIGINT_MAX = 2**63 - 1
+
+
+def _json_id(value):
+    """value if it is a JSON integer (not a bool) usable as a bigint id; else ValueError. No coercion:
+    "7", 7.0 and true are rejected, and so are ids a ::bigint cast would overflow on."""
+    if isinstance(value, bool) or not isinstance(value, int) or not 0 < value <= _BIGINT_MAX:
+        raise ValueError("Invalid id")
+    return value
+
 
 def register(app, login):
-    """Register trip routes; login for auth and session/dashboard cache."""
+    """Register trip routes; login for auth and session cache."""
+
+    def _checklist_to_json(summary):
+        """Serialize get_trip_requirement_summary items for API responses."""
+        return [
+            {
+                "requirement_type_id": s["requirement_type_id"],
+                "requirement_key": s["requirement_key"],
+                "requirement_display_name": s["requirement_display_name"],
+                "rule": s["rule"],
+                "quantity": s["quantity"],
+                "n_persons": s["n_persons"],
+                "required_count": s["required_count"],
+                "covered_count": s["covered_count"],
+                "status": s["status"],
+            }
+            for s in summary
+        ]
+
+    def _current_checklist(trip_id):
+        """Checklist after a gear change, for the response of the route that made it."""
+        return _checklist_to_json(get_trip_requirement_summary(trip_id) or [])
+
+    def _gear_ids_from_json():
+        """gear_ids list from the JSON body; ValueError if missing, empty, too long or not integer ids
+        (_json_id)."""
+        data = request.get_json(silent=True) or {}
+        gear_ids = data.get("gear_ids")
+        if not isinstance(gear_ids, list) or not gear_ids:
+            raise ValueError("gear_ids must be a non-empty list")
+        if len(gear_ids) > MAX_GEAR_BATCH:
+            raise ValueError(f"At most {MAX_GEAR_BATCH} gear ids per request")
+        try:
+            return [_json_id(g) for g in gear_ids]
+        except ValueError:
+            raise ValueError("gear_ids must be positive integer ids") from None
 
     def _trip_to_json(t):
         """Serialize trip row to JSON for API responses."""
@@ -74,19 +141,75 @@ def register(app, login):
         try:
             trip_id = create_trip(user["id"], payload)
             trip = get_trip(trip_id)
-            login.refresh_session_cache(user["id"])
+            login.cache_add_trip(trip)
             return jsonify(_trip_to_json(trip)), 201
         except ValueError as e:
             return jsonify(error=str(e)), 400
 
     @app.get("/api/trips")
     def get_trips():
+        """The user's trips (session cache). With ?readiness=1 each trip also gets readiness: checklist
+        met/short counts and assigned gear weight (db.list_trip_readiness), one query for all trips."""
+        user = login.require_auth()
+        if not user:
+            return jsonify(error="Not logged in"), 401
+        trips = login.session_trips(user["id"])
+        _prefetch_upcoming_weather(user["id"], trips)
+        if request.args.get("readiness") in ("1", "true"):
+            # Depends on other members' gear too, so computed per request rather than session-cached
+            readiness = list_trip_readiness(user["id"])
+            trips = [dict(t, readiness=readiness.get(t["id"])) for t in trips]
+        return jsonify(trips)
+
+    def _prefetch_upcoming_weather(user_id, trips):
+        """Start fetching forecasts for trips starting within the forecast window, so opening them
+        (or the bulk weather endpoint) hits a warm cache. Costs one query only if any trip qualifies."""
+        today = date.today()
+        horizon = (today + timedelta(days=FORECAST_DAYS)).isoformat()
+        ids = [
+            t["id"]
+            for t in trips
+            if t.get("trip_report_info_id") is not None
+            and t.get("intended_start_date")
+            and today.isoformat() <= t["intended_start_date"][:10] <= horizon
+        ]
+        if ids:
+            rows = list_trip_weather_locations(user_id, ids)
+            prefetch_forecasts(forecast_key(r["latitude"], r["longitude"]) for r in rows)
+
+    @app.get("/api/trips/weather")
+    def get_trips_weather():
+        """Forecasts for several trips in one response: ?ids=1,2,3 (default: all the user's trips).
+        Returns {trip_id: forecast} with the same per-trip shapes as /api/trips/<id>/weather;
+        trips sharing a location cost one upstream fetch."""
         user = login.require_auth()
         if not user:
             return jsonify(error="Not logged in"), 401
-        if session.get("trips") is None:
-            login.refresh_session_cache(user["id"])
-        return jsonify(session["trips"])
+        raw_ids = (request.args.get("ids") or "").strip()
+        trip_ids = None
+        if raw_ids:
+            try:
+                trip_ids = {int(x) for x in raw_ids.split(",") if x.strip()}
+            except ValueError:
+                return jsonify(error="ids must be comma-separated integers"), 400
+            if len(trip_ids) > MAX_WEATHER_BATCH:
+                return jsonify(error=f"At most {MAX_WEATHER_BATCH} ids per request"), 400
+        rows = list_trip_weather_locations(user["id"], trip_ids)
+        keys = {r["id"]: forecast_key(r["latitude"], r["longitude"]) for r in rows}
+        release_connection()  # don't hold a pooled connection idle in a transaction while NWS answers
+        periods = get_forecast_periods_many(keys.values())
+        out = {}
+        for r in rows:
+            key = keys[r["id"]]
+            if key is None:
+                out[r["id"]] = {"error": "no_coordinates"}
+            elif not periods.get(key):
+                out[r["id"]] = {"error": "forecast_unavailable", "message": "Weather service unavailable"}
+            else:
+                out[r["id"]] = pick_forecast_period(periods[key], r["intended_start_date"])
+        for trip_id in (trip_ids or ()):
+            out.setdefault(trip_id, {"error": "not_found"})
+        return jsonify(out)
 
     @app.get("/api/trips/<int:trip_id>")
     def get_trip_route(trip_id):
@@ -114,9 +237,8 @@ def register(app, login):
         payload = request.get_json(silent=True) or {}
         try:
             update_trip(trip_id, user["id"], payload)
-            login.refresh_session_cache(user["id"])
-            login.invalidate_trip_dashboard_cache(trip_id)
             trip = get_trip(trip_id)
+            login.cache_replace_trip(trip)
             out = _trip_to_json(trip)
             out["is_creator"] = trip["creator_id"] == user["id"]
             return jsonify(out)
@@ -131,8 +253,7 @@ def register(app, login):
             return jsonify(error="Not logged in"), 401
         try:
             delete_trip(trip_id, user["id"])
-            login.refresh_session_cache(user["id"])
-            login.invalidate_trip_dashboard_cache()
+            login.cache_remove_trip(trip_id)
             return "", 204
         except ValueError as e:
             return jsonify(error=str(e)), 403
@@ -144,94 +265,17 @@ def register(app, login):
             return jsonify(error="Not logged in"), 401
         try:
             leave_trip(trip_id, user["id"])
-            login.refresh_session_cache(user["id"])
-            login.invalidate_trip_dashboard_cache()
+            login.cache_remove_trip(trip_id)
             return "", 204
         except ValueError as e:
             return jsonify(error=str(e)), 403
 
-    def _build_trip_dashboard(trip_id, user):
-        """Build full dashboard payload for a trip (trip, collaborators, gear, checklist, etc.)."""
-        trip = get_trip(trip_id)
-        if not trip:
+    def _build_trip_dashboard_shared(trip_id):
+        """Build the viewer-independent dashboard payload (JSON-ready, cached server-side per trip)."""
+        data = get_trip_dashboard_shared(trip_id)
+        if not data:
             return None
-        trip_json = _trip_to_json(trip)
-        trip_json["is_creator"] = trip["creator_id"] == user["id"]
-
-        my_invites = list_incoming_trip_invites(user["id"])
-        pending_invite = next((i for i in my_invites if i["trip_id"] == trip_id), None)
-        if pending_invite:
-            ca = pending_invite.get("created_at")
-            pending_invite = {
-                "id": pending_invite["id"],
-                "trip_id": pending_invite["trip_id"],
-                "trip_name": pending_invite.get("trip_name"),
-                "inviter_username": pending_invite.get("inviter_username"),
-                "created_at": ca.isoformat() if hasattr(ca, "isoformat") else ca,
-            }
-        else:
-            pending_invite = None
-
-        collaborators = [
-            {"id": c["id"], "username": c["username"], "role": c["role"]}
-            for c in list_trip_collaborators(trip_id)
-        ]
-
-        pending_invites = []
-        friends = []
-        if trip_json.get("is_creator"):
-            rows = list_trip_invites_pending(trip_id)
-            for r in rows:
-                ca = r.get("created_at")
-                pending_invites.append(
-                    {
-                        "id": r["id"],
-                        "invitee_id": r["invitee_id"],
-                        "invitee_username": r["invitee_username"],
-                        "inviter_username": r["inviter_username"],
-                        "created_at": ca.isoformat() if hasattr(ca, "isoformat") else ca,
-                    }
-                )
-            all_friends = list_friends(user["id"])
-            collab_ids = {c["id"] for c in collaborators}
-            pending_invitee_ids = {p["invitee_id"] for p in pending_invites}
-            friends = [
-                {"id": f["id"], "username": f["username"]}
-                for f in all_friends
-                if f["id"] not in collab_ids and f["id"] not in pending_invitee_ids
-            ]
-
-        gear_pool = get_trip_gear_pool(trip_id)
-        gear_pool = [dict(row) for row in gear_pool]
-        for row in gear_pool:
-            if row.get("weight_oz") is not None:
-                row["weight_oz"] = float(row["weight_oz"])
-
-        assigned_gear = get_trip_assigned_gear(trip_id)
-        assigned_gear = [dict(row) for row in assigned_gear]
-        for row in assigned_gear:
-            if row.get("weight_oz") is not None:
-                row["weight_oz"] = float(row["weight_oz"])
-
-        summary = get_trip_requirement_summary(trip_id)
-        checklist = []
-        if summary:
-            for s in summary:
-                checklist.append(
-                    {
-                        "requirement_type_id": s["requirement_type_id"],
-                        "requirement_key": s["requirement_key"],
-                        "requirement_display_name": s["requirement_display_name"],
-                        "rule": s["rule"],
-                        "quantity": s["quantity"],
-                        "n_persons": s["n_persons"],
-                        "required_count": s["required_count"],
-                        "covered_count": s["covered_count"],
-                        "status": s["status"],
-                    }
-                )
-
-        trip_report_info = get_trip_report_info_for_trip(trip_id)
+        trip_report_info = data.get("trip_report_info")
         location_summary = None
         if trip_report_info:
             location_summary = {
@@ -244,20 +288,55 @@ def register(app, login):
                 "difficulty": trip_report_info.get("difficulty"),
                 "lat": trip_report_info.get("lat"),
                 "long": trip_report_info.get("long"),
+                "distance_miles": trip_report_info.get("distance_miles"),
+                "elevation_gain_feet": trip_report_info.get("elevation_gain_feet"),
+                "highpoint_feet": trip_report_info.get("highpoint_feet"),
+                "latitude": trip_report_info.get("latitude"),
+                "longitude": trip_report_info.get("longitude"),
                 "trip_report_1": trip_report_info.get("trip_report_1"),
                 "trip_report_2": trip_report_info.get("trip_report_2"),
             }
+        return {
+            "creator_id": data["creator_id"],
+            "trip": _trip_to_json(data),
+            "collaborators": data["collaborators"],
+            "pending_invites": data["pending_invites"],
+            "gear_pool": data["gear_pool"],
+            "assigned_gear": data["assigned_gear"],
+            "checklist": data["checklist"],
+            "location_summary": location_summary,
+        }
+
+    def _build_trip_dashboard(trip_id, user):
+        """Build full dashboard payload: cached shared part plus per-viewer is_creator, pending_invite, friends."""
+        shared = get_cached_trip_dashboard_shared(trip_id, lambda: _build_trip_dashboard_shared(trip_id))
+        if not shared:
+            return None
+        is_creator = shared["creator_id"] == user["id"]
+        trip_json = dict(shared["trip"])
+        trip_json["is_creator"] = is_creator
+
+        viewer = get_trip_dashboard_viewer(trip_id, user["id"])
+        pending_invite = viewer.get("pending_invite")
+        if pending_invite:
+            pending_invite = {
+                "id": pending_invite["id"],
+                "trip_id": pending_invite["trip_id"],
+                "trip_name": pending_invite.get("trip_name"),
+                "inviter_username": pending_invite.get("inviter_username"),
+                "created_at": pending_invite.get("created_at"),
+            }
 
         return {
             "trip": trip_json,
             "pending_invite": pending_invite,
-            "collaborators": collaborators,
-            "pending_invites": pending_invites,
-            "friends": friends,
-            "gear_pool": gear_pool,
-            "assigned_gear": assigned_gear,
-            "checklist": checklist,
-            "location_summary": location_summary,
+            "collaborators": shared["collaborators"],
+            "pending_invites": shared["pending_invites"] if is_creator else [],
+            "friends": viewer["friends"] if is_creator else [],
+            "gear_pool": shared["gear_pool"],
+            "assigned_gear": shared["assigned_gear"],
+            "checklist": shared["checklist"],
+            "location_summary": shared["location_summary"],
             "current_username": user.get("username"),
         }
 
@@ -270,100 +349,11 @@ def register(app, login):
             user["id"], trip_id
         ):
             return jsonify(error="Not found"), 404
-        cached = (session.get("trip_dashboard") or {}).get(str(trip_id))
-        if cached is not None:
-            return jsonify(cached)
         payload = _build_trip_dashboard(trip_id, user)
         if payload is None:
             return jsonify(error="Not found"), 404
-        if "trip_dashboard" not in session:
-            session["trip_dashboard"] = {}
-        session["trip_dashboard"][str(trip_id)] = payload
         return jsonify(payload)
 
-    def _fetch_nws_forecast(lat, lon, trip_date_str):
-        """Fetch NWS 7-day forecast for lat,lon. Return period for trip_date if in range, else first period.
-        Returns dict with for_date, is_trip_date, temperature, temperatureUnit, shortForecast, detailedForecast, periodName
-        or None on error.
-        """
-        try:
-            lat_f = float(str(lat).strip())
-            lon_f = float(str(lon).strip())
-            if not (-90 <= lat_f <= 90 and -180 <= lon_f <= 180):
-                return None
-        except (TypeError, ValueError):
-            return None
-        lat_s = f"{lat_f:.2f}"
-        lon_s = f"{lon_f:.2f}"
-        points_url = f"https://api.weather.gov/points/{lat_s},{lon_s}"
-        headers = {"User-Agent": "TrailFeathers/1.0 (https://github.com/trailfeathers)"}
-        req = urllib.request.Request(points_url, headers=headers)
-        try:
-            with urllib.request.urlopen(req, timeout=10) as resp:
-                data = json.loads(resp.read().decode())
-        except (urllib.error.HTTPError, urllib.error.URLError, OSError, json.JSONDecodeError):
-            return None
-        props = data.get("properties") or {}
-        forecast_url = (props.get("forecast") or "").strip()
-        if not forecast_url:
-            return None
-        req2 = urllib.request.Request(forecast_url, headers=headers)
-        try:
-            with urllib.request.urlopen(req2, timeout=10) as resp2:
-                forecast_data = json.loads(resp2.read().decode())
-        except (urllib.error.HTTPError, urllib.error.URLError, OSError, json.JSONDecodeError):
-            return None
-        periods = (forecast_data.get("properties") or {}).get("periods") or []
-        if not periods:
-            return None
-        trip_date = None
-        if trip_date_str:
-            if hasattr(trip_date_str, "isoformat"):
-                trip_date = trip_date_str
-            else:
-                s = str(trip_date_str).strip()[:10]
-                try:
-                    trip_date = datetime.strptime(s, "%Y-%m-%d").date()
-                except ValueError:
-                    pass
-        chosen = periods[0]
-        is_trip_date = False
-        if trip_date:
-            for p in periods:
-                start_s = (p.get("startTime") or "").strip()
-                end_s = (p.get("endTime") or "").strip()
-                if not start_s:
-                    continue
-                try:
-                    start_dt = datetime.fromisoformat(start_s.replace("Z", "+00:00"))
-                    start_d = start_dt.date()
-                except (ValueError, TypeError):
-                    continue
-                if end_s:
-                    try:
-                        end_dt = datetime.fromisoformat(end_s.replace("Z", "+00:00"))
-                        end_d = end_dt.date()
-                    except (ValueError, TypeError):
-                        end_d = start_d
-                else:
-                    end_d = start_d
-                if start_d <= trip_date <= end_d:
-                    chosen = p
-                    is_trip_date = True
-                    break
-        for_date = trip_date.isoformat() if trip_date else (chosen.get("startTime") or "")[:10]
-        if not for_date or len(for_date) > 10:
-            for_date = (chosen.get("startTime") or "")[:10]
-        return {
-            "for_date": for_date,
-            "is_trip_date": is_trip_date,
-            "temperature": chosen.get("temperature"),
-            "temperatureUnit": chosen.get("temperatureUnit") or "F",
-            "shortForecast": chosen.get("shortForecast") or "",
-            "detailedForecast": chosen.get("detailedForecast") or "",
-            "periodName": chosen.get("name") or "",
-        }
-
     @app.get("/api/trips/<int:trip_id>/weather")
     def get_trip_weather(trip_id):
         user = login.require_auth()
@@ -379,14 +369,15 @@ def register(app, login):
         trip_report_info = get_trip_report_info_for_trip(trip_id)
         if not trip_report_info:
             return jsonify(error="no_coordinates"), 200
-        lat = trip_report_info.get("lat")
-        lon = trip_report_info.get("long")
-        if lat is None or lon is None or not str(lat).strip() or not str(lon).strip():
+        lat = trip_report_info.get("latitude")
+        lon = trip_report_info.get("longitude")
+        if lat is None or lon is None:
             return jsonify(error="no_coordinates"), 200
         intended_start = trip.get("intended_start_date")
         if hasattr(intended_start, "isoformat"):
             intended_start = intended_start.isoformat()
-        result = _fetch_nws_forecast(lat, lon, intended_start)
+        release_connection()  # don't hold a pooled connection idle in a transaction while NWS answers
+        result = forecast_for_date(lat, lon, intended_start)
         if result is None:
             return jsonify(error="forecast_unavailable", message="Weather service unavailable"), 200
         return jsonify(result), 200
@@ -406,20 +397,29 @@ def register(app, login):
         summary = get_trip_requirement_summary(trip_id)
         if summary is None:
             return jsonify([])
-        out = []
-        for s in summary:
-            item = {
-                "requirement_type_id": s["requirement_type_id"],
-                "requirement_key": s["requirement_key"],
-                "requirement_display_name": s["requirement_display_name"],
-                "rule": s["rule"],
-                "quantity": s["quantity"],
-                "n_persons": s["n_persons"],
-                "required_count": s["required_count"],
-                "covered_count": s["covered_count"],
-                "status": s["status"],
-            }
-            out.append(item)
+        return jsonify(_checklist_to_json(summary))
+
+    @app.get("/api/trips/checklists")
+    def get_trips_checklists():
+        """Checklists for several trips in one query: ?ids=1,2,3 (default: all the user's trips).
+        Returns {trip_id: [item, ...]} with the items of /api/trips/<id>/checklist; {"error": "not_found"}
+        for requested trips the user can't see."""
+        user = login.require_auth()
+        if not user:
+            return jsonify(error="Not logged in"), 401
+        raw_ids = (request.args.get("ids") or "").strip()
+        trip_ids = None
+        if raw_ids:
+            try:
+                trip_ids = {int(x) for x in raw_ids.split(",") if x.strip()}
+            except ValueError:
+                return jsonify(error="ids must be comma-separated integers"), 400
+            if len(trip_ids) > MAX_CHECKLIST_BATCH:
+                return jsonify(error=f"At most {MAX_CHECKLIST_BATCH} ids per request"), 400
+        summaries = get_trip_requirement_summaries(trip_ids, user_id=user["id"])
+        out = {trip_id: _checklist_to_json(summary) for trip_id, summary in summaries.items()}
+        for trip_id in (trip_ids or ()):
+            out.setdefault(trip_id, {"error": "not_found"})
         return jsonify(out)
 
     @app.get("/api/requirement-types")
@@ -428,8 +428,12 @@ def register(app, login):
         user = login.require_auth()
         if not user:
             return jsonify(error="Not logged in"), 401
-        types = list_requirement_types()
-        return jsonify([{"id": t["id"], "key": t["key"], "display_name": t["display_name"]} for t in types])
+
+        def build():
+            types = list_requirement_types()
+            return jsonify([{"id": t["id"], "key": t["key"], "display_name": t["display_name"]} for t in types])
+
+        return conditional(table_version("requirement_types"), build)
 
     @app.get("/api/trips/<int:trip_id>/collaborators")
     def get_trip_collaborators(trip_id):
@@ -468,7 +472,6 @@ def register(app, login):
             return jsonify(error="Can only invite friends"), 400
         try:
             invite_id = create_trip_invite(trip_id, user["id"], invitee_id)
-            login.invalidate_trip_dashboard_cache(trip_id)
             return jsonify(ok=True, id=invite_id), 201
         except ValueError as e:
             return jsonify(error=str(e)), 400
@@ -521,11 +524,11 @@ def register(app, login):
         user = login.require_auth()
         if not user:
             return jsonify(error="Not logged in"), 401
-        if accept_trip_invite(invite_id, user["id"]):
-            login.refresh_session_cache(user["id"])
-            tid = get_trip_id_for_invite(invite_id)
-            if tid is not None:
-                login.invalidate_trip_dashboard_cache(tid)
+        trip_id = accept_trip_invite(invite_id, user["id"])
+        if trip_id:
+            trip = get_trip(trip_id)
+            if trip:
+                login.cache_add_trip(trip)
             return jsonify(ok=True), 200
         return jsonify(error="Invite not found or already responded to"), 404
 
@@ -535,9 +538,6 @@ def register(app, login):
         if not user:
             return jsonify(error="Not logged in"), 401
         if decline_trip_invite(invite_id, user["id"]):
-            tid = get_trip_id_for_invite(invite_id)
-            if tid is not None:
-                login.invalidate_trip_dashboard_cache(tid)
             return jsonify(ok=True), 200
         return jsonify(error="Invite not found or already responded to"), 404
 
@@ -553,7 +553,6 @@ def register(app, login):
             return jsonify(error="Only the trip creator can remove members"), 403
         try:
             remove_trip_collaborator(trip_id, user_id, user["id"])
-            login.invalidate_trip_dashboard_cache(trip_id)
             return "", 200
         except ValueError as e:
             return jsonify(error=str(e)), 400
@@ -570,7 +569,6 @@ def register(app, login):
         if not trip or trip["creator_id"] != user["id"]:
             return jsonify(error="Only the trip creator can cancel invites"), 404
         if cancel_trip_invite(invite_id, user["id"]):
-            login.invalidate_trip_dashboard_cache(trip_id)
             return "", 200
         return jsonify(error="Invite not found or already responded to"), 404
 
@@ -596,6 +594,83 @@ def register(app, login):
         assigned_gear = get_trip_assigned_gear(trip_id)
         return jsonify(assigned_gear)
 
+    @app.get("/api/trips/<int:trip_id>/gear/plan")
+    def plan_trip_gear_route(trip_id):
+        """Propose gear to add (and who carries it) so every checklist requirement is met at the least
+        weight; see tf_server.gear_planner. ?time_budget_ms= caps the exact search. Changes nothing."""
+        user = login.require_auth()
+        if not user:
+            return jsonify(error="Not logged in"), 401
+        if not user_has_trip_access(user["id"], trip_id):
+            return jsonify(error="Not found"), 404
+        shared = get_cached_trip_dashboard_shared(trip_id, lambda: _build_trip_dashboard_shared(trip_id))
+        if not shared:
+            return jsonify(error="Not found"), 404
+        budget = request.args.get("time_budget_ms", DEFAULT_TIME_BUDGET_MS, type=int)
+        return jsonify(plan_gear(shared, time_budget_ms=budget))
+
+    @app.post("/api/trips/<int:trip_id>/gear/plan")
+    def apply_trip_gear_plan_route(trip_id):
+        """Apply a plan: JSON {"assignments": [{"gear_id", "carrier_user_id"}, ...]} (carrier optional,
+        defaults to the owner), inserted in one batch. Returns the inserted gear ids and the new checklist."""
+        user = login.require_auth()
+        if not user:
+            return jsonify(error="Not logged in"), 401
+        if not user_has_trip_access(user["id"], trip_id):
+            return jsonify(error="Not found"), 404
+        data = request.get_json(silent=True) or {}
+        items = data.get("assignments")
+        if not isinstance(items, list) or not items:
+            return jsonify(error="assignments must be a non-empty list"), 400
+        if len(items) > MAX_GEAR_BATCH:
+            return jsonify(error=f"At most {MAX_GEAR_BATCH} assignments per request"), 400
+        try:
+            assignments = []
+            for item in items:
+                carrier = item.get("carrier_user_id")
+                carrier = _json_id(carrier) if carrier is not None else None
+                assignments.append((_json_id(item["gear_id"]), carrier))
+        except (AttributeError, KeyError, ValueError):
+            return jsonify(error="Each assignment needs an integer gear_id (and carrier_user_id if given)"), 400
+        try:
+            inserted = assign_gear_to_trip_many(trip_id, assignments)
+        except ValueError as e:
+            return jsonify(error=str(e)), 400
+        return jsonify(assigned=inserted, checklist=_current_checklist(trip_id)), 201
+
+    @app.post("/api/trips/<int:trip_id>/gear")
+    def assign_gear_to_trip_bulk_route(trip_id):
+        """Assign several pieces of gear: JSON {"gear_ids": [...]}, each carried by its owner. All owners
+        are checked in one query and the rows inserted in one statement (db.assign_gear_to_trip_many).
+        Returns the newly assigned ids and the updated checklist."""
+        user = login.require_auth()
+        if not user:
+            return jsonify(error="Not logged in"), 401
+        if not user_has_trip_access(user["id"], trip_id):
+            return jsonify(error="Not found"), 404
+        try:
+            gear_ids = _gear_ids_from_json()
+            inserted = assign_gear_to_trip_many(trip_id, [(gear_id, None) for gear_id in gear_ids])
+        except ValueError as e:
+            return jsonify(error=str(e)), 400
+        return jsonify(assigned=inserted, checklist=_current_checklist(trip_id)), 201
+
+    @app.delete("/api/trips/<int:trip_id>/gear")
+    def unassign_gear_from_trip_bulk_route(trip_id):
+        """Remove several gear assignments: JSON {"gear_ids": [...]}. Returns the removed ids and the
+        updated checklist."""
+        user = login.require_auth()
+        if not user:
+            return jsonify(error="Not logged in"), 401
+        if not user_has_trip_access(user["id"], trip_id):
+            return jsonify(error="Not found"), 404
+        try:
+            gear_ids = _gear_ids_from_json()
+        except ValueError as e:
+            return jsonify(error=str(e)), 400
+        removed = unassign_gear_from_trip_many(trip_id, gear_ids)
+        return jsonify(removed=removed, checklist=_current_checklist(trip_id)), 200
+
     @app.post("/api/trips/<int:trip_id>/gear/<int:gear_id>")
     def assign_gear_to_trip_route(trip_id, gear_id):
         """Assign a piece of gear to a trip"""
@@ -606,7 +681,6 @@ def register(app, login):
             return jsonify(error="Not found"), 404
         try:
             assign_gear_to_trip(trip_id, gear_id)
-            login.invalidate_trip_dashboard_cache(trip_id)
             return jsonify(ok=True), 201
         except ValueError as e:
             return jsonify(error=str(e)), 400
@@ -620,6 +694,5 @@ def register(app, login):
         if not user_has_trip_access(user["id"], trip_id):
             return jsonify(error="Not found"), 404
         unassign_gear_from_trip(trip_id, gear_id)
-        login.invalidate_trip_dashboard_cache(trip_id)
         return jsonify(ok=True), 200
 
@@ -4,11 +4,14 @@ Group: TrailFeathers
 Authors: Kim, Smith, Domst, and Snider
 Last updated: 3/13/26
 
-Endpoints: GET /api/me/wishlist, POST /api/me/wishlist (trip_report_info_id), DELETE /api/me/wishlist/<id>.
+Endpoints: GET /api/me/wishlist (conditional, ETag), POST /api/me/wishlist (trip_report_info_id),
+DELETE /api/me/wishlist/<id>.
 """
 from flask import jsonify, request
 
-from db import add_wishlist_item, list_wishlist, remove_wishlist_item
+from db import add_wishlist_item, list_wishlist, remove_wishlist_item, wishlist_version
+
+from ..conditional import conditional
 
 
 def register(app, login):
@@ -19,20 +22,24 @@ def register(app, login):
         user = login.require_auth()
         if not user:
             return jsonify(error="Not logged in"), 401
-        rows = list_wishlist(user["id"])
-        out = []
-        for r in rows:
-            out.append(
-                {
-                    "id": r["id"],
-                    "hike_name": r.get("hike_name") or "",
-                    "distance": r.get("distance"),
-                    "elevation_gain": r.get("elevation_gain"),
-                    "difficulty": r.get("difficulty"),
-                    "source_url": r.get("source_url"),
-                }
-            )
-        return jsonify(out)
+
+        def build():
+            rows = list_wishlist(user["id"])
+            out = []
+            for r in rows:
+                out.append(
+                    {
+                        "id": r["id"],
+                        "hike_name": r.get("hike_name") or "",
+                        "distance": r.get("distance"),
+                        "elevation_gain": r.get("elevation_gain"),
+                        "difficulty": r.get("difficulty"),
+                        "source_url": r.get("source_url"),
+                    }
+                )
+            return jsonify(out)
+
+        return conditional((user["id"], wishlist_version(user["id"])), build)
 
     @app.post("/api/me/wishlist")
     def post_my_wishlist():
@@ -0,0 +1,88 @@
+"""
+TrailFeathers - Request-scoped unit of work: one DB connection/transaction per HTTP request, kept on g.
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+Every db helper called while handling a request shares the transaction, so a handler such as
+post_trip (create_trip + get_trip + session cache update) is atomic and pays one commit instead of
+one per helper. The commit happens in after_request, before the response is sent, so a failed commit
+becomes a 500 rather than a silently lost write. Requests that raise, return 5xx, or hit a database
+error in a db helper are rolled back; a handler that swallowed such an error and answered 2xx/3xx
+gets a 500 instead (and a log line), since none of its writes were saved. The connection is only checked out if a helper actually runs a query, and a
+handler about to wait on an upstream service (trip weather) hands it back first with
+db.release_connection(), which commits what was done so far.
+
+Each response carries X-DB-Queries (statements the request executed) and the totals are kept per
+endpoint in this worker; query_stats() returns them, and GET /api/debug/query-stats serves them
+when DB_QUERY_STATS=1.
+"""
+import os
+import threading
+
+from flask import current_app, g, jsonify, request
+
+from db import begin_unit_of_work
+
+_stats = {}  # endpoint -> [requests, queries, max queries]
+_stats_lock = threading.Lock()
+
+
+def _record(endpoint, queries):
+    with _stats_lock:
+        entry = _stats.get(endpoint)
+        if entry is None:
+            _stats[endpoint] = [1, queries, queries]
+        else:
+            entry[0] += 1
+            entry[1] += queries
+            entry[2] = max(entry[2], queries)
+
+
+def query_stats():
+    """Return {endpoint: {requests, queries, avg, max}} for requests handled by this worker."""
+    with _stats_lock:
+        return {
+            endpoint: {"requests": n, "queries": q, "avg": round(q / n, 2), "max": m}
+            for endpoint, (n, q, m) in sorted(_stats.items())
+        }
+
+
+def reset_query_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def register(app):
+    """Register before/after/teardown hooks that manage g.db_unit."""
+
+    @app.before_request
+    def _begin_db_unit():
+        g.db_unit = begin_unit_of_work()
+
+    @app.after_request
+    def _commit_db_unit(response):
+        unit = g.get("db_unit")
+        if unit is not None:
+            if response.status_code < 500 and not unit.commit() and response.status_code < 400:
+                current_app.logger.error(
+                    "%s %s: database error in a handled request; rolled back instead of answering %s",
+                    request.method, request.path, response.status_code,
+                )
+                response = jsonify(error="Could not save changes")
+                response.status_code = 500
+            response.headers["X-DB-Queries"] = str(unit.query_count)
+            _record(request.endpoint or "<unmatched>", unit.query_count)
+        return response
+
+    @app.teardown_request
+    def _finish_db_unit(exc):
+        unit = g.pop("db_unit", None)
+        if unit is not None:
+            unit.finish()
+
+    if os.getenv("DB_QUERY_STATS") == "1":
+
+        @app.get("/api/debug/query-stats")
+        def get_query_stats():
+            return jsonify(query_stats())
@@ -0,0 +1,74 @@
+"""
+TrailFeathers - Streaming image uploads with bounded memory.
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+UploadRequest (the app's request class) has Werkzeug's multipart parser write each uploaded file into
+a db.blobs.SpooledBlob: kept in memory up to 256KB, then on disk, hashed and measured as it arrives,
+and cut off as soon as it passes the route's limit. Requests whose Content-Length is already over
+MAX_CONTENT_LENGTH (the app config) are refused before any of the body is read.
+
+receive_image() returns the spooled file with its media type sniffed from the magic bytes (the
+client's Content-Type is ignored); db.set_*_upload then copies it into the blob store in 64KB chunks.
+"""
+from flask import Request, request
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from db.blobs import BlobTooLarge, SpooledBlob
+
+# Multipart boundaries and part headers around the file
+MULTIPART_OVERHEAD = 64 * 1024
+
+_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+class UploadRejected(ValueError):
+    """Bad upload; status is the HTTP status to answer with."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class UploadRequest(Request):
+    """Request whose file uploads are spooled into SpooledBlobs of at most upload_limit bytes."""
+
+    upload_limit = None  # set by receive_image() before the form is parsed
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return SpooledBlob(limit=self.upload_limit)
+
+
+def sniff_image_type(head):
+    """Media type for an image's first bytes (JPEG, PNG, GIF, WebP), or None."""
+    for signature, media_type in _SIGNATURES:
+        if head.startswith(signature):
+            return media_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def receive_image(limit, field="file"):
+    """Return (SpooledBlob, media type) for the image in multipart field. Raises UploadRejected:
+    413 if larger than limit bytes, 415 if not JPEG/PNG/GIF/WebP, 400 if missing."""
+    too_large = UploadRejected(f"Image must be under {limit // (1024 * 1024)}MB.", 413)
+    if request.content_length is not None and request.content_length > limit + MULTIPART_OVERHEAD:
+        raise too_large  # don't read the body at all
+    request.upload_limit = limit
+    try:
+        f = request.files.get(field)
+    except (BlobTooLarge, RequestEntityTooLarge):
+        raise too_large
+    if not f or not f.filename or not isinstance(f.stream, SpooledBlob) or not f.stream.size:
+        raise UploadRejected("Missing file.")
+    media_type = sniff_image_type(f.stream.head)
+    if media_type is None:
+        raise UploadRejected("Use JPEG, PNG, GIF, or WebP.", 415)
+    return f.stream, media_type
@@ -0,0 +1,304 @@
+"""
+TrailFeathers - Weather service: NWS (api.weather.gov) forecasts with shared caching and coalescing.
+Group: TrailFeathers
+Authors: Kim, Smith, Domst, and Snider
+Last updated: 3/13/26
+
+A forecast takes two NWS calls: /points/{lat},{lon} (maps a location to its grid forecast URL, which
+practically never changes) and the forecast itself. Both are cached (db.cache: per worker, or Redis
+when REDIS_URL is set):
+- grid points by lat/lon rounded to 2 decimals, for WEATHER_POINTS_TTL (default 1 day);
+- forecasts by grid forecast URL, fresh for as long as the response's Cache-Control max-age (or
+  Expires) allows, then served stale for up to WEATHER_STALE_SECONDS (default 1 hour) while one
+  background thread refreshes it.
+Concurrent misses for the same URL share one upstream request. Failures are remembered for
+WEATHER_ERROR_TTL seconds (default 60) so a down weather.gov does not stall every request for the
+full timeout. NWS_BASE_URL (default https://api.weather.gov) and WEATHER_HTTP_TIMEOUT (default 5s)
+can be overridden, e.g. to point at a local fake server.
+
+get_forecast_periods_many() fetches several locations at once on a thread pool (WEATHER_FETCH_WORKERS,
+default 8) and prefetch_forecasts() warms the cache without waiting. Each thread keeps its HTTP
+connection to weather.gov open between requests.
+"""
+import http.client
+import json
+import os
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+from db.cache import make_cache
+
+NWS_BASE_URL = os.getenv("NWS_BASE_URL", "https://api.weather.gov").rstrip("/")
+_HEADERS = {"User-Agent": "TrailFeathers/1.0 (https://github.com/trailfeathers)", "Accept": "application/geo+json"}
+_HTTP_TIMEOUT = float(os.getenv("WEATHER_HTTP_TIMEOUT", "5"))
+_POINTS_TTL = float(os.getenv("WEATHER_POINTS_TTL", str(24 * 3600)))
+_STALE_SECONDS = float(os.getenv("WEATHER_STALE_SECONDS", "3600"))
+_ERROR_TTL = float(os.getenv("WEATHER_ERROR_TTL", "60"))
+_DEFAULT_FORECAST_TTL = 900  # when NWS sends no usable Cache-Control/Expires
+
+_points_cache = make_cache("nws_points", maxsize=4096, ttl=_POINTS_TTL)
+_forecast_cache = make_cache("nws_forecast", maxsize=1024, ttl=_DEFAULT_FORECAST_TTL + _STALE_SECONDS)
+_error_cache = make_cache("nws_errors", maxsize=1024, ttl=_ERROR_TTL)
+
+_refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="nws-refresh")
+_fetch_executor = ThreadPoolExecutor(
+    max_workers=max(1, int(os.getenv("WEATHER_FETCH_WORKERS", "8"))), thread_name_prefix="nws-fetch"
+)
+_local = threading.local()  # per-thread keep-alive connections: (scheme, host) -> HTTP(S)Connection
+
+
+class _Flight:
+    __slots__ = ("done", "result")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+_inflight = {}  # key -> _Flight for upstream fetches in progress in this process
+_inflight_lock = threading.Lock()
+
+
+def _coalesced(key, fetch):
+    """Run fetch() once per key at a time; concurrent callers wait for and share its result."""
+    with _inflight_lock:
+        flight = _inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _inflight[key] = _Flight()
+    if not leader:
+        flight.done.wait(2 * _HTTP_TIMEOUT + 1)
+        return flight.result
+    try:
+        flight.result = fetch()
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        flight.done.set()
+    return flight.result
+
+
+def _freshness(headers):
+    """Seconds the response may be cached per Cache-Control (s-maxage / max-age) or Expires."""
+    cache_control = (headers.get("Cache-Control") or "").lower()
+    directives = {}
+    for part in cache_control.split(","):
+        name, _, value = part.strip().partition("=")
+        directives[name] = value.strip('"')
+    if "no-store" in directives or "no-cache" in directives:
+        return 0
+    for name in ("s-maxage", "max-age"):
+        if name in directives:
+            try:
+                return max(0, int(directives[name]))
+            except ValueError:
+                pass
+    expires = headers.get("Expires")
+    if expires:
+        try:
+            expires_at = parsedate_to_datetime(expires)
+            date = headers.get("Date")
+            now = parsedate_to_datetime(date) if date else datetime.now(expires_at.tzinfo)
+            return max(0, int((expires_at - now).total_seconds()))
+        except (TypeError, ValueError):
+            return 0
+    return _DEFAULT_FORECAST_TTL
+
+
+def _connection(scheme, host):
+    """This thread's open connection to host, and whether it was reused (vs newly created)."""
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get((scheme, host))
+    if conn is not None:
+        return conn, True
+    cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+    conn = conns[(scheme, host)] = cls(host, timeout=_HTTP_TIMEOUT)
+    return conn, False
+
+
+def _drop_connection(scheme, host):
+    conn = getattr(_local, "conns", {}).pop((scheme, host), None)
+    if conn is not None:
+        conn.close()
+
+
+def _get_json(url, redirects=2):
+    """GET url over a kept-alive connection; return (json, freshness seconds) or (None, 0) on any error."""
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    while True:
+        conn, reused = _connection(parts.scheme, parts.netloc)
+        try:
+            conn.request("GET", path, headers=_HEADERS)
+            resp = conn.getresponse()
+            body = resp.read()
+        except (http.client.HTTPException, OSError):
+            _drop_connection(parts.scheme, parts.netloc)
+            if reused:
+                continue  # the server closed an idle keep-alive connection; retry once on a new one
+            return None, 0
+        break
+    if resp.will_close:
+        _drop_connection(parts.scheme, parts.netloc)
+    if resp.status in (301, 302, 307, 308) and redirects and resp.headers.get("Location"):
+        return _get_json(urllib.parse.urljoin(url, resp.headers["Location"]), redirects - 1)
+    if resp.status != 200:
+        return None, 0
+    try:
+        return json.loads(body.decode()), _freshness(resp.headers)
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return None, 0
+
+
+def forecast_key(lat, lon):
+    """Return 'lat,lon' rounded to 2 decimals (~1 km), or None if not valid coordinates."""
+    try:
+        lat_f = float(lat)
+        lon_f = float(lon)
+    except (TypeError, ValueError):
+        return None
+    if not (-90 <= lat_f <= 90 and -180 <= lon_f <= 180):
+        return None
+    return f"{lat_f:.2f},{lon_f:.2f}"
+
+
+def _forecast_url(point):
+    """Grid forecast URL for a rounded 'lat,lon', from cache or /points."""
+    url = _points_cache.get(point)
+    if url:
+        return url
+
+    def fetch():
+        data, _ = _get_json(f"{NWS_BASE_URL}/points/{point}")
+        found = ((data or {}).get("properties") or {}).get("forecast") or ""
+        found = found.strip()
+        if found:
+            _points_cache.set(point, found)
+        return found or None
+
+    return _coalesced(f"points:{point}", fetch)
+
+
+def _fetch_forecast(url):
+    """Fetch and cache one grid forecast. Returns its periods, or None (and remembers the failure)."""
+    data, fresh_for = _get_json(url)
+    periods = ((data or {}).get("properties") or {}).get("periods") or []
+    if not periods:
+        _error_cache.set(url, True)
+        return None
+    entry = {"periods": periods, "fresh_until": time.time() + fresh_for}
+    _forecast_cache.set(url, entry, ttl=fresh_for + _STALE_SECONDS)
+    return periods
+
+
+def _refresh_in_background(url):
+    if _error_cache.get(url):
+        return  # keep serving stale until the error backoff ends
+    with _inflight_lock:
+        if url in _inflight:
+            return
+    _refresh_executor.submit(_coalesced, url, lambda: _fetch_forecast(url))
+
+
+def _periods_for_point(point):
+    if _error_cache.get(point):
+        return None
+    url = _forecast_url(point)
+    if not url:
+        _error_cache.set(point, True)
+        return None
+    entry = _forecast_cache.get(url)
+    if entry is not None:
+        if entry["fresh_until"] <= time.time():
+            _refresh_in_background(url)
+        return entry["periods"]
+    if _error_cache.get(url):
+        return None
+    return _coalesced(url, lambda: _fetch_forecast(url))
+
+
+def get_forecast_periods(lat, lon):
+    """Return the NWS forecast periods for lat/lon, or None if invalid coordinates or unavailable.
+    Stale entries are returned immediately and refreshed in the background."""
+    point = forecast_key(lat, lon)
+    return _periods_for_point(point) if point else None
+
+
+def get_forecast_periods_many(keys):
+    """Fetch forecasts for several forecast_key() values concurrently (each distinct key once).
+    Returns {key: periods or None}; keys not done within the HTTP timeout map to None."""
+    keys = {k for k in keys if k}
+    futures = {k: _fetch_executor.submit(_periods_for_point, k) for k in keys}
+    wait(futures.values(), timeout=2 * _HTTP_TIMEOUT + 1)
+    return {k: f.result() if f.done() and not f.exception() else None for k, f in futures.items()}
+
+
+def prefetch_forecasts(keys):
+    """Warm the cache for forecast_key() values in the background; returns without waiting."""
+    for k in {k for k in keys if k}:
+        _fetch_executor.submit(_periods_for_point, k)
+
+
+def _parse_trip_date(trip_date):
+    if not trip_date:
+        return None
+    if hasattr(trip_date, "isoformat") and not isinstance(trip_date, str):
+        return trip_date.date() if isinstance(trip_date, datetime) else trip_date
+    try:
+        return datetime.strptime(str(trip_date).strip()[:10], "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def _period_date(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).date()
+
+
+def pick_forecast_period(periods, trip_date):
+    """Return the period covering trip_date if in range, else the first period, as the API dict:
+    for_date, is_trip_date, temperature, temperatureUnit, shortForecast, detailedForecast, periodName."""
+    trip_date = _parse_trip_date(trip_date)
+    chosen = periods[0]
+    is_trip_date = False
+    if trip_date:
+        for p in periods:
+            start_s = (p.get("startTime") or "").strip()
+            end_s = (p.get("endTime") or "").strip()
+            if not start_s:
+                continue
+            try:
+                start_d = _period_date(start_s)
+            except (ValueError, TypeError):
+                continue
+            try:
+                end_d = _period_date(end_s) if end_s else start_d
+            except (ValueError, TypeError):
+                end_d = start_d
+            if start_d <= trip_date <= end_d:
+                chosen = p
+                is_trip_date = True
+                break
+    for_date = trip_date.isoformat() if trip_date else (chosen.get("startTime") or "")[:10]
+    return {
+        "for_date": for_date,
+        "is_trip_date": is_trip_date,
+        "temperature": chosen.get("temperature"),
+        "temperatureUnit": chosen.get("temperatureUnit") or "F",
+        "shortForecast": chosen.get("shortForecast") or "",
+        "detailedForecast": chosen.get("detailedForecast") or "",
+        "periodName": chosen.get("name") or "",
+    }
+
+
+def forecast_for_date(lat, lon, trip_date):
+    """Forecast for lat/lon picked for trip_date (see pick_forecast_period), or None on error."""
+    periods = get_forecast_periods(lat, lon)
+    if not periods:
+        return None
+    return pick_forecast_period(periods, trip_date)